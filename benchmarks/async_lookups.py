@@ -0,0 +1,58 @@
+"""Load benchmark of the location lookup at increasing concurrency, to
+compare the scaling of the WSGI and ASGI servers with the same number of
+worker processes, e.g.:
+
+    gunicorn moziotest.wsgi -w 4 -b 127.0.0.1:8000
+    uvicorn moziotest.asgi:application --workers 4 --port 8001
+
+Usage:
+    python -m benchmarks.async_lookups [url] [seconds]
+"""
+import asyncio
+import sys
+import time
+from urllib.parse import urlsplit
+
+URL = 'http://127.0.0.1:8000/api/v1/polygons?lat=10&lng=10'
+CONCURRENCY_LEVELS = (1, 4, 16, 64, 256)
+
+
+async def request(host, port, target):
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(
+        'GET {} HTTP/1.0\r\nHost: {}\r\nAccept: application/json\r\n'
+        '\r\n'.format(target, host).encode('ascii'))
+    response = await reader.read()
+    writer.close()
+    status_line = response.split(b'\r\n', 1)[0]
+    if status_line.split(b' ')[1:2] != [b'200']:
+        raise RuntimeError(status_line)
+
+
+async def client(url, deadline, latencies):
+    parts = urlsplit(url)
+    target = parts.path + ('?' + parts.query if parts.query else '')
+    while time.time() < deadline:
+        start = time.time()
+        await request(parts.hostname, parts.port or 80, target)
+        latencies.append(time.time() - start)
+
+
+def main(url=URL, seconds=10):
+    loop = asyncio.get_event_loop()
+    print('{:>11} {:>10} {:>10}'.format('concurrency', 'req/s', 'p50 ms'))
+    for concurrency in CONCURRENCY_LEVELS:
+        latencies = []
+        deadline = time.time() + seconds
+        loop.run_until_complete(asyncio.gather(*[
+            client(url, deadline, latencies) for _ in range(concurrency)
+        ]))
+        latencies.sort()
+        print('{:>11} {:>10.1f} {:>10.2f}'.format(
+            concurrency, len(latencies) / float(seconds),
+            latencies[len(latencies) // 2] * 1000 if latencies else 0))
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:3]
+    main(*args[:1] + [int(arg) for arg in args[1:]])
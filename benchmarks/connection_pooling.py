@@ -0,0 +1,53 @@
+"""Load benchmark of ProviderPolygonByLocationView with the database
+connection settings: a new connection per request (CONN_MAX_AGE=0), the
+persistent connections with health checks and the in-process pool.
+
+The requests go through the WSGI handler from several threads during the
+given seconds, see benchmarks/load.py. The location cache and the
+spatial index are disabled so every request queries the database.
+
+Usage:
+    python -m benchmarks.connection_pooling [threads] [seconds]
+"""
+import os
+import sys
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "moziotest.settings")
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.db import connections  # noqa: E402
+
+from benchmarks.load import run_load  # noqa: E402
+from moziotest.db.backends.postgis.base import close_pools  # noqa: E402
+
+PATH = '/api/v1/polygons?lat=10&lng=10'
+CONFIGURATIONS = (
+    ('no persistence', {'CONN_MAX_AGE': 0, 'POOL': None}),
+    ('persistent', {'CONN_MAX_AGE': 60, 'POOL': None}),
+    ('pool', {'CONN_MAX_AGE': 0, 'POOL': {'MIN_SIZE': 1, 'MAX_SIZE': 16}}),
+)
+
+
+def configure(options):
+    connections.close_all()
+    close_pools()
+    connections.databases['default'].update(options)
+
+
+def main(threads=8, seconds=10):
+    settings.POLYGONS_LOCATION_CACHE = {}
+    settings.POLYGONS_SPATIAL_INDEX = False
+    for label, options in CONFIGURATIONS:
+        configure(options)
+        result = run_load([PATH], threads, seconds)
+        print('{:<16} {:>10.1f} req/s {:>10.2f} p50 ms'.format(
+            label, result.requests_per_second,
+            result.as_dict()['p50_ms']))
+    close_pools()
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:3]])
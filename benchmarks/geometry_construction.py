@@ -0,0 +1,91 @@
+"""Benchmark of the construction of the Polygon of a write request, comparing
+the former str(dict) GeoJSON round trip with the construction from arrays
+(alone and with the validation of GeometrySerializer) and from WKB and TWKB
+bodies.
+
+Usage:
+    python -m benchmarks.geometry_construction [vertices]
+"""
+import math
+import os
+import sys
+import timeit
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "moziotest.settings")
+django.setup()
+
+from django.contrib.gis.geos import GEOSGeometry  # noqa: E402
+
+from polygons.parsers import WKBParser, TWKBParser  # noqa: E402
+from polygons.serializers import GeometrySerializer  # noqa: E402
+from polygons.utils import get_polygon_obj, parse_ring  # noqa: E402
+
+
+def build_geometry(vertices):
+    ring = [
+        [int(round(math.cos(2 * math.pi * i / vertices) * 80)),
+         int(round(math.sin(2 * math.pi * i / vertices) * 170))]
+        for i in range(vertices)
+    ]
+    ring.append(ring[0])
+    return {'type': 'Polygon', 'coordinates': [ring]}
+
+
+def encode_varint(value):
+    encoded = bytearray()
+    while value > 0x7f:
+        encoded.append((value & 0x7f) | 0x80)
+        value >>= 7
+    encoded.append(value)
+    return encoded
+
+
+def encode_twkb(geometry):
+    """Function to encode a Polygon of one ring as TWKB with precision 0"""
+    ring = geometry['coordinates'][0]
+    data = bytearray([3, 0]) + encode_varint(1) + encode_varint(len(ring))
+    previous = [0, 0]
+    for point in ring:
+        for dimension in range(2):
+            delta = point[dimension] - previous[dimension]
+            data += encode_varint((delta << 1) ^ (delta >> 63))
+            previous[dimension] = point[dimension]
+    return bytes(data)
+
+
+def legacy_path(geometry):
+    return GEOSGeometry(str(dict(geometry)), srid=4326)
+
+
+def arrays_path(geometry):
+    return get_polygon_obj({
+        'coordinates': [parse_ring(ring) for ring in geometry['coordinates']]
+    })
+
+
+def serializer_path(geometry):
+    serializer = GeometrySerializer(data=geometry)
+    serializer.is_valid(raise_exception=True)
+    return get_polygon_obj(serializer.validated_data)
+
+
+def main(vertices=50000, repeat=5):
+    geometry = build_geometry(vertices)
+    wkb = bytes(legacy_path(geometry).wkb)
+    twkb = encode_twkb(geometry)
+    cases = (
+        ('str(dict)', lambda: legacy_path(geometry)),
+        ('arrays', lambda: arrays_path(geometry)),
+        ('serializer', lambda: serializer_path(geometry)),
+        ('wkb', lambda: WKBParser().read_geometry(wkb)),
+        ('twkb', lambda: TWKBParser().read_geometry(twkb)),
+    )
+    for label, case in cases:
+        best = min(timeit.repeat(case, number=1, repeat=repeat))
+        print('{:<12} {:>10.2f} ms'.format(label, best * 1000))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:2]])
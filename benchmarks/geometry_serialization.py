@@ -0,0 +1,58 @@
+"""Benchmark of the geometry read path of ProviderPolygonSerializer,
+comparing the conversion of the GEOS objects with the precomputed GeoJSON
+column spliced by FragmentJSONRenderer.
+
+Usage:
+    python -m benchmarks.geometry_serialization [polygons] [vertices]
+"""
+import math
+import os
+import sys
+import timeit
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "moziotest.settings")
+django.setup()
+
+from django.contrib.gis.geos import Polygon  # noqa: E402
+
+from moziotest.renderers import FragmentJSONRenderer  # noqa: E402
+from polygons.models import ProviderPolygon  # noqa: E402
+from polygons.serializers import ProviderPolygonSerializer  # noqa: E402
+
+
+def build_polygons(count, vertices):
+    ring = [
+        (math.cos(2 * math.pi * i / vertices) * 50,
+         math.sin(2 * math.pi * i / vertices) * 50)
+        for i in range(vertices)
+    ]
+    ring.append(ring[0])
+    polygons = []
+    for pk in range(count):
+        instance = ProviderPolygon(
+            pk=pk, name='polygon', price='10.00',
+            geom=Polygon(ring, srid=4326)
+        )
+        instance.update_geojson()
+        polygons.append(instance)
+    return polygons
+
+
+def render(polygons, precomputed):
+    serializer = ProviderPolygonSerializer(polygons, many=True)
+    serializer.child.precomputed_geometry = precomputed
+    return FragmentJSONRenderer().render(serializer.data)
+
+
+def main(count=20, vertices=5000, repeat=5):
+    polygons = build_polygons(count, vertices)
+    for label, precomputed in (('geos', False), ('precomputed', True)):
+        best = min(timeit.repeat(
+            lambda: render(polygons, precomputed), number=1, repeat=repeat))
+        print('{:<12} {:>10.2f} ms'.format(label, best * 1000))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:3]])
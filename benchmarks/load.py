@@ -0,0 +1,93 @@
+"""Local load generator calling the WSGI handler from several threads, so the
+requests go through the middlewares and the connections are opened and
+closed by the request_started/request_finished signals as in a server.
+"""
+import threading
+import time
+
+from django.core.handlers.wsgi import WSGIHandler
+from django.db import connections
+from django.test import RequestFactory
+
+
+def percentile(values, fraction):
+    """Function to get a percentile of sorted values by nearest rank"""
+    if not values:
+        return 0.0
+    rank = int(round(fraction * len(values)))
+    return values[min(len(values) - 1, max(0, rank - 1))]
+
+
+class LoadResult(object):
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.latencies = []
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def add(self, latencies, errors):
+        with self._lock:
+            self.latencies.extend(latencies)
+            self.errors += errors
+
+    @property
+    def requests_per_second(self):
+        return len(self.latencies) / float(self.seconds)
+
+    def as_dict(self):
+        latencies = sorted(self.latencies)
+        return {
+            'requests': len(latencies),
+            'errors': self.errors,
+            'requests_per_second': round(self.requests_per_second, 1),
+            'p50_ms': round(percentile(latencies, 0.50) * 1000, 3),
+            'p95_ms': round(percentile(latencies, 0.95) * 1000, 3),
+            'p99_ms': round(percentile(latencies, 0.99) * 1000, 3),
+        }
+
+
+def build_environ(path):
+    return RequestFactory().get(
+        path, HTTP_HOST='localhost', HTTP_ACCEPT='application/json'
+    ).environ
+
+
+def run_client(handler, environs, deadline, result):
+    latencies = []
+    errors = []
+
+    def start_response(status, headers):
+        if not status.startswith('2'):
+            errors.append(status)
+
+    index = 0
+    while time.time() < deadline:
+        environ = environs[index % len(environs)]
+        index += 1
+        start = time.time()
+        b''.join(handler(dict(environ), start_response))
+        latencies.append(time.time() - start)
+    connections.close_all()
+    result.add(latencies, len(errors))
+
+
+def run_load(paths, threads=8, seconds=10, handler=None):
+    """Function to request the paths in turn from every thread during the
+    given seconds
+
+    :return: LoadResult
+    """
+    handler = handler or WSGIHandler()
+    environs = [build_environ(path) for path in paths]
+    result = LoadResult(seconds)
+    deadline = time.time() + seconds
+    workers = [
+        threading.Thread(
+            target=run_client, args=(handler, environs, deadline, result))
+        for _ in range(threads)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return result
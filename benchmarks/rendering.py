@@ -0,0 +1,61 @@
+"""Benchmark of the rendering of polygon list responses, comparing DRF's
+JSONRenderer (standard library json), FragmentJSONRenderer and
+FastJSONRenderer (orjson), with the geometries built from the GEOS objects
+(nested lists of coordinates) or the precomputed GeoJSON fragments. The
+data is serialized once, only the rendering is timed.
+
+Usage:
+    python -m benchmarks.rendering [polygons] [vertices]
+"""
+import os
+import sys
+import timeit
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "moziotest.settings")
+django.setup()
+
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from benchmarks.geometry_serialization import build_polygons  # noqa: E402
+from moziotest.renderers import (  # noqa: E402
+    FastJSONRenderer, FragmentJSONRenderer
+)
+from polygons.serializers import ProviderPolygonSerializer  # noqa: E402
+
+CASES = (
+    ('json', JSONRenderer, False),
+    ('fragment', FragmentJSONRenderer, False),
+    ('fast', FastJSONRenderer, False),
+    ('fragment', FragmentJSONRenderer, True),
+    ('fast', FastJSONRenderer, True),
+)
+
+
+def serialize(polygons, precomputed):
+    serializer = ProviderPolygonSerializer(polygons, many=True)
+    serializer.child.precomputed_geometry = precomputed
+    return {'next': None, 'previous': None, 'results': serializer.data}
+
+
+def main(count=20, vertices=5000, repeat=5):
+    polygons = build_polygons(count, vertices)
+    data = {
+        precomputed: serialize(polygons, precomputed)
+        for precomputed in (False, True)
+    }
+    baseline = None
+    for label, renderer_class, precomputed in CASES:
+        renderer = renderer_class()
+        page = data[precomputed]
+        best = min(timeit.repeat(
+            lambda: renderer.render(page), number=1, repeat=repeat))
+        baseline = baseline or best
+        print('{:<10} {:<12} {:>10.2f} ms {:>8.1f}x'.format(
+            label, 'precomputed' if precomputed else 'geos',
+            best * 1000, baseline / best))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:3]])
@@ -0,0 +1,90 @@
+"""Seeding of the providers and polygons used by the benchmarks.
+
+Every provider gets polygons shaped as circles of the given number of
+vertices, centered in a small region (REGION) so the service areas of the
+providers overlap as in a city. The previous benchmark data, the users with
+an email of EMAIL_DOMAIN, is deleted first. The polygons are inserted with
+the bulk importer so the indexes and caches are kept in sync.
+
+Usage:
+    python -m benchmarks.seed [providers] [polygons] [vertices]
+"""
+import math
+import os
+import random
+import sys
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "moziotest.settings")
+django.setup()
+
+from faker import Faker  # noqa: E402
+from mixer.backend.django import mixer  # noqa: E402
+
+from polygons.importer import import_polygons  # noqa: E402
+from users.models import User  # noqa: E402
+
+EMAIL_DOMAIN = 'benchmark.example.com'
+# (min lat, min lng, max lat, max lng) of the centers of the polygons.
+REGION = (40.5, -74.2, 40.9, -73.7)
+MIN_RADIUS = 0.01
+MAX_RADIUS = 0.1
+
+
+def build_feature(name, price, center, radius, vertices):
+    ring = [
+        [center[0] + math.cos(2 * math.pi * i / vertices) * radius,
+         center[1] + math.sin(2 * math.pi * i / vertices) * radius]
+        for i in range(vertices)
+    ]
+    ring.append(ring[0])
+    return {
+        'type': 'Feature',
+        'properties': {'name': name, 'price': price},
+        'geometry': {'type': 'Polygon', 'coordinates': [ring]},
+    }
+
+
+def random_point(rng):
+    return rng.uniform(REGION[0], REGION[2]), rng.uniform(REGION[1], REGION[3])
+
+
+def get_providers():
+    return User.objects.filter(
+        email__endswith='@' + EMAIL_DOMAIN).order_by('id')
+
+
+def seed(providers=50, polygons=2000, vertices=64, random_seed=0):
+    """Function to replace the benchmark data
+
+    :return: list of the created providers
+    """
+    rng = random.Random(random_seed)
+    fake = Faker()
+    fake.seed(random_seed)
+    get_providers().delete()
+    users = [
+        mixer.blend(
+            User, email='provider{}@{}'.format(i, EMAIL_DOMAIN),
+            name=fake.company(), phone_number=fake.numerify('###-###-####'),
+            language='en', currency='usd'
+        )
+        for i in range(providers)
+    ]
+    for i, user in enumerate(users):
+        count = polygons // providers + (i < polygons % providers)
+        features = [
+            build_feature(
+                fake.street_name(), '{:.2f}'.format(rng.uniform(5, 100)),
+                random_point(rng), rng.uniform(MIN_RADIUS, MAX_RADIUS),
+                vertices
+            )
+            for _ in range(count)
+        ]
+        import_polygons(features, user)
+    return users
+
+
+if __name__ == '__main__':
+    seed(*[int(arg) for arg in sys.argv[1:4]])
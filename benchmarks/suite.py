@@ -0,0 +1,193 @@
+"""Benchmark suite of the API endpoints and the geometry code paths.
+
+The endpoints are driven by the local load generator (benchmarks/load.py)
+with the data of benchmarks/seed.py, reporting the requests per second and
+the p50/p95/p99 latencies. The micro-benchmarks time get_polygon_obj,
+GeometrySerializer, ProviderPolygonSerializer.get_geometry and the rendering
+of a page by JSONRenderer and FastJSONRenderer. The results
+are saved as JSON, named by the commit by default, and two result files can
+be compared to spot regressions.
+
+Usage:
+    python -m benchmarks.suite [--seed] [--threads N] [--seconds N]
+        [--output FILE]
+    python -m benchmarks.suite --compare BASE.json NEW.json
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+import timeit
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "moziotest.settings")
+django.setup()
+
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from benchmarks import seed as seeding  # noqa: E402
+from benchmarks.geometry_construction import (  # noqa: E402
+    build_geometry, serializer_path
+)
+from benchmarks.geometry_serialization import build_polygons  # noqa: E402
+from benchmarks.load import run_load  # noqa: E402
+from benchmarks.rendering import serialize  # noqa: E402
+from moziotest.renderers import FastJSONRenderer  # noqa: E402
+from polygons.models import ProviderPolygon  # noqa: E402
+from polygons.serializers import (  # noqa: E402
+    GeometrySerializer, ProviderPolygonSerializer
+)
+from polygons.utils import get_polygon_obj  # noqa: E402
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+SAMPLE_PATHS = 50
+MICRO_VERTICES = (100, 10000)
+# Metrics where a lower value is better, the other ones are throughputs.
+LOWER_IS_BETTER = ('p50_ms', 'p95_ms', 'p99_ms', 'best_ms', 'errors')
+
+
+def get_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            stderr=subprocess.STDOUT
+        ).decode('ascii').strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def get_endpoint_paths(rng):
+    """Function to get sample paths of every endpoint with the benchmark
+    data
+
+    :return: dict of endpoint name to list of paths
+    """
+    providers = list(seeding.get_providers().values_list('id', flat=True))
+    if not providers:
+        raise SystemExit('No benchmark data, run with --seed first.')
+    polygons = list(ProviderPolygon.objects.filter(
+        user__in=providers).values_list('user_id', 'id')[:SAMPLE_PATHS])
+    paths = {
+        'location_lookup': [
+            '/api/v1/polygons?lat={}&lng={}'.format(
+                *seeding.random_point(rng))
+            for _ in range(SAMPLE_PATHS)
+        ],
+        'provider_polygons': [
+            '/api/v1/users/{}/polygons'.format(rng.choice(providers))
+            for _ in range(SAMPLE_PATHS)
+        ],
+        'provider_polygon_detail': [
+            '/api/v1/users/{}/polygons/{}'.format(user_id, pk)
+            for user_id, pk in polygons
+        ],
+        'users': ['/api/v1/users'],
+    }
+    return paths
+
+
+def run_endpoints(threads, seconds, rng):
+    results = {}
+    for name, paths in sorted(get_endpoint_paths(rng).items()):
+        results[name] = run_load(paths, threads, seconds).as_dict()
+        print('{:<28} {requests_per_second:>10.1f} req/s '
+              'p50 {p50_ms:>8.2f} p95 {p95_ms:>8.2f} p99 {p99_ms:>8.2f} ms'
+              .format(name, **results[name]))
+    return results
+
+
+def time_best(case, repeat=5):
+    return round(min(timeit.repeat(case, number=1, repeat=repeat)) * 1000, 3)
+
+
+def run_micro():
+    results = {}
+    for vertices in MICRO_VERTICES:
+        geometry = build_geometry(vertices)
+        serializer = GeometrySerializer(data=geometry)
+        serializer.is_valid(raise_exception=True)
+        validated_data = serializer.validated_data
+        polygon, = build_polygons(1, vertices)
+        precomputed_serializer = ProviderPolygonSerializer(polygon)
+        geos_serializer = ProviderPolygonSerializer(polygon)
+        geos_serializer.precomputed_geometry = False
+        geos_page = serialize([polygon], False)
+        precomputed_page = serialize([polygon], True)
+        cases = {
+            'get_polygon_obj': lambda: get_polygon_obj(validated_data),
+            'geometry_serializer': lambda: serializer_path(geometry),
+            'get_geometry_precomputed':
+                lambda: precomputed_serializer.get_geometry(polygon),
+            'get_geometry_geos': lambda: geos_serializer.get_geometry(polygon),
+            'render_json_geos': lambda: JSONRenderer().render(geos_page),
+            'render_fast_geos': lambda: FastJSONRenderer().render(geos_page),
+            'render_fast_precomputed':
+                lambda: FastJSONRenderer().render(precomputed_page),
+        }
+        for label, case in sorted(cases.items()):
+            name = '{}[{}]'.format(label, vertices)
+            results[name] = {'best_ms': time_best(case)}
+            print('{:<40} {:>10.3f} ms'.format(
+                name, results[name]['best_ms']))
+    return results
+
+
+def compare(base_path, new_path):
+    """Function to print the change of every metric between two results"""
+    with open(base_path) as base_file, open(new_path) as new_file:
+        base, new = json.load(base_file), json.load(new_file)
+    for group in ('endpoints', 'micro'):
+        for name in sorted(set(base[group]) & set(new[group])):
+            for metric, value in sorted(new[group][name].items()):
+                base_value = base[group][name].get(metric)
+                if not base_value or metric == 'requests':
+                    continue
+                change = (value - base_value) / float(base_value) * 100
+                worse = (change > 0) == (metric in LOWER_IS_BETTER)
+                print('{:<40} {:<20} {:>10} {:>10} {:>+8.1f}%{}'.format(
+                    name, metric, base_value, value, change,
+                    ' !' if worse and abs(change) > 10 else ''))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--seed', action='store_true',
+                        help='replace the benchmark data before running')
+    parser.add_argument('--providers', type=int, default=50)
+    parser.add_argument('--polygons', type=int, default=2000)
+    parser.add_argument('--vertices', type=int, default=64)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--seconds', type=int, default=10)
+    parser.add_argument('--output')
+    parser.add_argument('--compare', nargs=2, metavar=('BASE', 'NEW'))
+    args = parser.parse_args(argv)
+    if args.compare:
+        compare(*args.compare)
+        return
+    if args.seed:
+        seeding.seed(args.providers, args.polygons, args.vertices)
+    commit = get_commit()
+    results = {
+        'commit': commit,
+        'timestamp': int(time.time()),
+        'threads': args.threads,
+        'seconds': args.seconds,
+        'endpoints': run_endpoints(
+            args.threads, args.seconds, random.Random(0)),
+        'micro': run_micro(),
+    }
+    output = args.output or os.path.join(
+        RESULTS_DIR, '{}.json'.format(commit))
+    if not os.path.isdir(os.path.dirname(os.path.abspath(output))):
+        os.makedirs(os.path.dirname(os.path.abspath(output)))
+    with open(output, 'w') as output_file:
+        json.dump(results, output_file, indent=2, sort_keys=True)
+    print('Results saved in {}'.format(output))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1 @@
+pytest_plugins = ['moziotest.pytest_plugin']
@@ -0,0 +1,18 @@
+"""
+ASGI config for moziotest project.
+
+It exposes the ASGI callable as a module-level variable named
+``application``. The location and batch lookups are answered by the async
+implementation of polygons/async_views.py, the other requests by the WSGI
+application run in a thread pool, e.g.:
+
+    uvicorn moziotest.asgi:application --workers 4
+"""
+
+from asgiref.wsgi import WsgiToAsgi
+
+from moziotest.wsgi import application as wsgi_application
+
+from polygons.async_views import AsyncLookupApplication
+
+application = AsyncLookupApplication(WsgiToAsgi(wsgi_application))
@@ -0,0 +1,75 @@
+"""Token authentication with a cache of the token to user lookups.
+
+The (user, token) pairs are kept in the shared cache named by BACKEND or,
+if there is none, in a local LRU tier whose entries expire after TIMEOUT
+seconds. The signals connected in users/models.py invalidate the entries
+when a token or its user changes. They reach the shared cache of every
+process, so a local tier is never used along with it; without a shared
+cache the local tiers of other processes are only bounded by TIMEOUT.
+Every lookup gets its own copy of the cached user.
+"""
+import copy
+
+from django.conf import settings
+from django.core.cache import caches
+
+from rest_framework.authentication import TokenAuthentication
+
+from .cache import LRUCache
+
+DEFAULTS = {
+    'MAX_ENTRIES': 10000,
+    'TIMEOUT': 60,
+    'BACKEND': None,
+}
+KEY_PREFIX = 'auth:token:'
+
+_local_cache = None
+
+
+def get_setting(name):
+    config = getattr(settings, 'AUTH_TOKEN_CACHE', None) or {}
+    return config.get(name, DEFAULTS[name])
+
+
+def get_local_cache():
+    global _local_cache
+    if _local_cache is None:
+        _local_cache = LRUCache(
+            get_setting('MAX_ENTRIES'), get_setting('TIMEOUT'))
+    return _local_cache
+
+
+def get_shared_cache():
+    backend = get_setting('BACKEND')
+    return caches[backend] if backend else None
+
+
+def invalidate_token(key):
+    get_local_cache().delete(key)
+    shared_cache = get_shared_cache()
+    if shared_cache is not None:
+        shared_cache.delete(KEY_PREFIX + key)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """TokenAuthentication which only joins Token and User on a cache miss"""
+
+    def authenticate_credentials(self, key):
+        shared_cache = get_shared_cache()
+        if shared_cache is not None:
+            credentials = shared_cache.get(KEY_PREFIX + key)
+            if credentials is None:
+                credentials = super(
+                    CachedTokenAuthentication, self
+                ).authenticate_credentials(key)
+                shared_cache.set(
+                    KEY_PREFIX + key, credentials, get_setting('TIMEOUT'))
+            return credentials
+        credentials = get_local_cache().get(key)
+        if credentials is None:
+            credentials = super(
+                CachedTokenAuthentication, self).authenticate_credentials(key)
+            get_local_cache().set(key, credentials)
+        user, token = credentials
+        return copy.copy(user), token
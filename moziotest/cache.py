@@ -0,0 +1,96 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
+
+
+class LRUCache(object):
+    """Thread-safe in-process cache which evicts the least recently used
+    entries above max_entries, and the entries older than timeout seconds
+    when given.
+    """
+    def __init__(self, max_entries, timeout=None):
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value, expires = self._data[key]
+            except KeyError:
+                return default
+            if expires is not None and expires < time.time():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        expires = time.time() + self.timeout if self.timeout else None
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def delete_matching(self, predicate):
+        """Method to delete the entries whose key matches the predicate"""
+        with self._lock:
+            for key in [key for key in self._data if predicate(key)]:
+                del self._data[key]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+def get_shared_cache(alias):
+    """Function to get a Django cache seen by every process, as the versions
+    kept in it must be bumped for all of them
+
+    :return: cache
+    :except: ImproperlyConfigured if the cache is local to the process
+    """
+    cache = caches[alias]
+    if isinstance(cache, LocMemCache):
+        raise ImproperlyConfigured(
+            'The cache "{}" is local to the process, use a backend shared '
+            'by every process.'.format(alias)
+        )
+    return cache
+
+
+def get_cache_version(cache, key):
+    """Function to get a version kept in a cache, starting from the current
+    time so an evicted version never goes back to a value already used by
+    stale entries
+
+    :return: int
+    """
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, int(time.time() * 1000), None)
+        version = cache.get(key)
+    return version
+
+
+def bump_cache_version(cache, key):
+    """Function to bump a version kept in a cache, so the entries keyed by
+    the previous one are not read again
+    """
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, int(time.time() * 1000), None)
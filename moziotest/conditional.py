@@ -0,0 +1,97 @@
+import hashlib
+from calendar import timegm
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework.mixins import RetrieveModelMixin
+
+
+class ConditionalGetMixin(object):
+    """Mixin for the generic views to answer GET requests with ETag and
+    Last-Modified headers, computed by a single aggregate query of
+    max(updated_at) and the count of rows, so a request with a matching
+    If-None-Match (or If-Modified-Since) header is answered with status 304
+    NOT MODIFIED before fetching and serializing the instances.
+
+    Deleting a row of a list only changes its count, so the lists are sent
+    with the ETag only.
+    """
+    def get_conditional_queryset(self):
+        """Method to get the rows the response depends on, the instance
+        looked up by the detail views or the filtered queryset of the lists
+
+        :return: queryset
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        if isinstance(self, RetrieveModelMixin):
+            lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+            queryset = queryset.filter(**{
+                self.lookup_field: self.kwargs[lookup_url_kwarg]
+            })
+        return queryset
+
+    def get_etag_key(self, request):
+        """Method to get the parts of the request which change the
+        response besides the rows, e.g. query params and Accept header
+
+        :return: string
+        """
+        return '{}|{}'.format(
+            request.get_full_path(), request.META.get('HTTP_ACCEPT', ''))
+
+    def get_validators(self, request):
+        """Method to compute the ETag and the Last-Modified timestamp
+
+        :return: tuple (etag, last_modified) or (None, None) if there is
+        nothing to validate (e.g. not found instance)
+        """
+        validators = self.get_conditional_queryset().order_by().aggregate(
+            last_modified=Max('updated_at'), count=Count('pk'))
+        last_modified = validators['last_modified']
+        if isinstance(self, RetrieveModelMixin) and not validators['count']:
+            return None, None
+        etag = self.build_etag(
+            request, validators['count'],
+            last_modified.isoformat() if last_modified else ''
+        )
+        if not isinstance(self, RetrieveModelMixin) or not last_modified:
+            return etag, None
+        return etag, timegm(last_modified.utctimetuple())
+
+    def build_etag(self, request, *parts):
+        """Method to build a strong ETag of the request and the given parts
+        which identify the state of the rows
+
+        :return: quoted ETag
+        """
+        etag = hashlib.md5('|'.join(
+            [self.get_etag_key(request)] + [str(part) for part in parts]
+        ).encode('utf-8')).hexdigest()
+        return '"{}"'.format(etag)
+
+    @staticmethod
+    def set_validators(response, etag, last_modified):
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def get(self, request, *args, **kwargs):
+        """Rewriting method to answer with status 304 NOT MODIFIED if the
+        validators of the request match
+
+        :return: Response of the view with the validator headers
+        """
+        etag, last_modified = self.get_validators(request)
+        if etag is None:
+            return super(ConditionalGetMixin, self).get(
+                request, *args, **kwargs)
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = super(ConditionalGetMixin, self).get(
+                request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            self.set_validators(response, etag, last_modified)
+        return response
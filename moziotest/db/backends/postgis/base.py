@@ -0,0 +1,102 @@
+"""PostGIS backend with health checks of the persistent connections and an
+optional in-process pool of connections.
+
+Options of the database settings besides the Django ones:
+
+    HEALTH_CHECKS: check a persistent connection is usable before its first
+        use in every request, replacing it if the server closed it.
+    POOL: dict with the MIN_SIZE and MAX_SIZE of a pool of connections
+        shared by the threads of the process, the connections closed by
+        Django go back to the pool. Once MAX_SIZE connections are in use the
+        extra ones are opened and closed as without pool.
+"""
+import threading
+
+from django.contrib.gis.db.backends.postgis.base import (
+    DatabaseWrapper as PostGISDatabaseWrapper
+)
+from psycopg2 import pool
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(alias, options, conn_params):
+    """Function to get the pool of connections of a database, created on the
+    first call
+
+    :return: ThreadedConnectionPool
+    """
+    with _pools_lock:
+        if alias not in _pools:
+            _pools[alias] = pool.ThreadedConnectionPool(
+                options.get('MIN_SIZE', 1), options['MAX_SIZE'],
+                **conn_params
+            )
+        return _pools[alias]
+
+
+def close_pools():
+    with _pools_lock:
+        for connection_pool in _pools.values():
+            connection_pool.closeall()
+        _pools.clear()
+
+
+class DatabaseWrapper(PostGISDatabaseWrapper):
+
+    def __init__(self, *args, **kwargs):
+        super(DatabaseWrapper, self).__init__(*args, **kwargs)
+        self.health_check_needed = False
+        self.pooled_connection = None
+        # Pool the connection came from, close_pools may have replaced it.
+        self.connection_pool = None
+
+    def get_new_connection(self, conn_params):
+        options = self.settings_dict.get('POOL')
+        if not options:
+            return super(DatabaseWrapper, self).get_new_connection(
+                conn_params)
+        connection_pool = get_pool(self.alias, options, conn_params)
+        try:
+            connection = connection_pool.getconn()
+        except pool.PoolError:
+            return super(DatabaseWrapper, self).get_new_connection(
+                conn_params)
+        self.pooled_connection = connection
+        self.connection_pool = connection_pool
+        options = self.settings_dict['OPTIONS']
+        self.isolation_level = options.get(
+            'isolation_level', connection.isolation_level)
+        if self.isolation_level != connection.isolation_level:
+            connection.set_session(isolation_level=self.isolation_level)
+        return connection
+
+    def _close(self):
+        if self.connection is None or (
+                self.connection is not self.pooled_connection):
+            return super(DatabaseWrapper, self)._close()
+        connection_pool = self.connection_pool
+        self.pooled_connection = None
+        self.connection_pool = None
+        with self.wrap_database_errors:
+            try:
+                connection_pool.putconn(
+                    self.connection, close=bool(self.errors_occurred))
+            except pool.PoolError:
+                # The pool was closed by close_pools.
+                self.connection.close()
+
+    def close_if_unusable_or_obsolete(self):
+        super(DatabaseWrapper, self).close_if_unusable_or_obsolete()
+        # Called when a request starts and finishes, the check is deferred
+        # to the first use so the requests without queries do not pay it.
+        self.health_check_needed = bool(self.settings_dict.get(
+            'HEALTH_CHECKS'))
+
+    def ensure_connection(self):
+        if self.health_check_needed:
+            self.health_check_needed = False
+            if self.connection is not None and not self.is_usable():
+                self.close()
+        super(DatabaseWrapper, self).ensure_connection()
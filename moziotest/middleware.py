@@ -0,0 +1,92 @@
+import hashlib
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from rest_framework.permissions import SAFE_METHODS
+
+from . import profiling
+from .cache import get_shared_cache
+from .routers import use_replicas
+
+PIN_COOKIE_NAME = 'use_primary'
+PIN_KEY_PREFIX = 'replicas:pin'
+
+
+class ReplicaRoutingMiddleware(object):
+    """Middleware to send the reads of the safe requests to the replicas.
+
+    A client which made a successful write is pinned to the primary database
+    for DATABASE_REPLICA_STICKY_SECONDS seconds so it reads its own writes
+    while the replicas catch up, identified by a cookie and, if
+    DATABASE_REPLICA_PIN_CACHE names a cache shared by every process, by its
+    Authorization header for the clients which do not keep cookies.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    @staticmethod
+    def get_pin_cache():
+        alias = getattr(settings, 'DATABASE_REPLICA_PIN_CACHE', None)
+        return get_shared_cache(alias) if alias else None
+
+    @staticmethod
+    def get_pin_key(request):
+        authorization = request.META.get('HTTP_AUTHORIZATION')
+        if not authorization:
+            return None
+        return '{}:{}'.format(
+            PIN_KEY_PREFIX,
+            hashlib.sha1(authorization.encode('utf-8')).hexdigest()
+        )
+
+    def is_pinned(self, request):
+        if request.COOKIES.get(PIN_COOKIE_NAME):
+            return True
+        cache = self.get_pin_cache()
+        key = self.get_pin_key(request)
+        return (
+            cache is not None and key is not None and
+            cache.get(key) is not None
+        )
+
+    def pin(self, request, response):
+        sticky_seconds = settings.DATABASE_REPLICA_STICKY_SECONDS
+        cache = self.get_pin_cache()
+        key = self.get_pin_key(request)
+        if cache is not None and key is not None:
+            cache.set(key, True, sticky_seconds)
+        response.set_cookie(
+            PIN_COOKIE_NAME, '1', max_age=sticky_seconds, httponly=True)
+
+    def __call__(self, request):
+        is_safe = request.method in SAFE_METHODS
+        use_replicas(is_safe and not self.is_pinned(request))
+        try:
+            response = self.get_response(request)
+        finally:
+            use_replicas(False)
+        if not is_safe and response.status_code < 400:
+            self.pin(request, response)
+        return response
+
+
+class ProfilingMiddleware(object):
+    """Middleware to profile the requests if PROFILING_ENABLED, sending the
+    figures as Server-Timing headers and observing them in the histograms
+    of moziotest/profiling.py. It is removed from the chain when disabled.
+    """
+    def __init__(self, get_response):
+        if not profiling.is_enabled():
+            raise MiddlewareNotUsed
+        profiling.install()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        profile = profiling.start_profile()
+        try:
+            response = self.get_response(request)
+        finally:
+            profiling.finish_profile(
+                profile, profiling.get_view_name(request))
+        response['Server-Timing'] = profiling.build_server_timing(profile)
+        return response
@@ -0,0 +1,48 @@
+from rest_framework.pagination import CursorPagination
+
+
+class InstanceList(list):
+    """List of model instances supporting the subset of the queryset API
+    used by CursorPagination, for the results which do not come from the
+    database (e.g. the in-process spatial index).
+    """
+    def order_by(self, *fields):
+        instances = InstanceList(self)
+        for field in reversed(fields):
+            instances.sort(
+                key=lambda instance: getattr(instance, field.lstrip('-')),
+                reverse=field.startswith('-')
+            )
+        return instances
+
+    def filter(self, **kwargs):
+        (lookup, value), = kwargs.items()
+        field, operator = lookup.rsplit('__', 1)
+        value = int(value)
+        if operator == 'gt':
+            return InstanceList(
+                instance for instance in self
+                if getattr(instance, field) > value
+            )
+        return InstanceList(
+            instance for instance in self if getattr(instance, field) < value
+        )
+
+
+class IdCursorPagination(CursorPagination):
+    """Keyset pagination by id, the position of the last item is encoded in
+    an opaque cursor so every page is fetched with an indexed range query
+    (WHERE id > position LIMIT n) without OFFSET nor COUNT(*).
+    """
+    ordering = 'id'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if isinstance(queryset, list):
+            queryset = InstanceList(queryset)
+        return super(IdCursorPagination, self).paginate_queryset(
+            queryset, request, view)
+
+
+class DescendingIdCursorPagination(IdCursorPagination):
+    """Keyset pagination by id, from newer to older"""
+    ordering = '-id'
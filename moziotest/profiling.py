@@ -0,0 +1,268 @@
+"""Opt-in profiling of the requests, enabled by the PROFILING_ENABLED setting.
+
+ProfilingMiddleware records for every request the number of queries and the
+SQL time, the time spent in the serializers (validation and representation)
+and in the renderers and the peak of memory. The figures are sent as
+Server-Timing headers and observed in histograms by view, exposed in the
+Prometheus text format by metrics_view. The histograms are kept by every
+process, so every worker has to be scraped.
+
+The peak of memory is the growth of the maximum resident set size of the
+process (getrusage) while the request is processed. It is measured per
+process, so the requests served at once by other threads of the worker are
+counted too, and a request which stays under the previous maximum grows it
+by 0.
+
+The serializers and renderers are only instrumented when the middleware is
+loaded with the profiling enabled, otherwise the middleware is removed from
+the chain, so there is no overhead in the builds where it is disabled.
+"""
+import functools
+import sys
+import threading
+import time
+from collections import OrderedDict, defaultdict
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+from django.conf import settings
+from django.db import connections
+from django.http import Http404, HttpResponse
+from rest_framework import renderers, serializers
+
+from .renderers import FastJSONRenderer, FragmentJSONRenderer
+
+TIME_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0
+)
+COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200)
+MEMORY_BUCKETS = tuple(2 ** power * 1024 for power in range(6, 18, 2))
+
+_state = threading.local()
+_install_lock = threading.Lock()
+_installed = False
+# (class, name, method defined by the class or None) of every instrumented
+# method, to be restored by uninstall.
+_instrumented = []
+
+
+def is_enabled():
+    return getattr(settings, 'PROFILING_ENABLED', False)
+
+
+class Profile(object):
+    """Figures of the request being processed by the current thread"""
+    def __init__(self):
+        self.timings = defaultdict(float)
+        self.active = set()
+        self.queries = 0
+        self.peak_memory = 0
+        self.queries_logged = {}
+        self.start_memory = 0
+        self.start = time.time()
+
+
+def get_profile():
+    return getattr(_state, 'profile', None)
+
+
+def instrument(cls, name, timing):
+    """Function to add the time spent in a method to a timing of the
+    profile, the nested calls (e.g. nested serializers) are counted once
+    """
+    method = getattr(cls, name)
+    _instrumented.append((cls, name, cls.__dict__.get(name)))
+
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        profile = get_profile()
+        if profile is None or timing in profile.active:
+            return method(*args, **kwargs)
+        profile.active.add(timing)
+        start = time.time()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            profile.timings[timing] += time.time() - start
+            profile.active.discard(timing)
+
+    setattr(cls, name, wrapper)
+
+
+def install():
+    """Function to instrument the serializers and renderers once"""
+    global _installed
+    with _install_lock:
+        if _installed:
+            return
+        instrument(serializers.BaseSerializer, 'is_valid', 'serializer')
+        instrument(serializers.Serializer, 'to_representation', 'serializer')
+        instrument(
+            serializers.ListSerializer, 'to_representation', 'serializer')
+        instrument(renderers.JSONRenderer, 'render', 'render')
+        instrument(FragmentJSONRenderer, 'render', 'render')
+        instrument(FastJSONRenderer, 'render', 'render')
+        instrument(renderers.BrowsableAPIRenderer, 'render', 'render')
+        _installed = True
+
+
+def uninstall():
+    """Function to restore the methods instrumented by install"""
+    global _installed
+    with _install_lock:
+        while _instrumented:
+            cls, name, method = _instrumented.pop()
+            if method is None:
+                delattr(cls, name)
+            else:
+                setattr(cls, name, method)
+        _installed = False
+
+
+class Histogram(object):
+    """Cumulative histogram of the observed values by view"""
+    def __init__(self, name, description, buckets):
+        self.name = name
+        self.description = description
+        self.buckets = buckets
+        self.series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, view, value):
+        with self._lock:
+            series = self.series.setdefault(
+                view, [0] * len(self.buckets) + [0, 0])
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self):
+        lines = [
+            '# HELP {} {}'.format(self.name, self.description),
+            '# TYPE {} histogram'.format(self.name),
+        ]
+        with self._lock:
+            series = sorted(self.series.items())
+        for view, values in series:
+            label = 'view="{}"'.format(
+                view.replace('\\', '\\\\').replace('"', '\\"'))
+            for bound, count in zip(self.buckets, values):
+                lines.append('{}_bucket{{{},le="{}"}} {}'.format(
+                    self.name, label, bound, count))
+            lines.append('{}_bucket{{{},le="+Inf"}} {}'.format(
+                self.name, label, values[-1]))
+            lines.append('{}_sum{{{}}} {}'.format(
+                self.name, label, values[-2]))
+            lines.append('{}_count{{{}}} {}'.format(
+                self.name, label, values[-1]))
+        return lines
+
+
+METRICS = OrderedDict((name, Histogram(name, description, buckets)) for (
+    name, description, buckets) in (
+    ('request_duration_seconds', 'Duration of the requests.', TIME_BUCKETS),
+    ('sql_duration_seconds', 'Time spent in SQL queries.', TIME_BUCKETS),
+    ('sql_queries', 'Number of SQL queries.', COUNT_BUCKETS),
+    ('serializer_duration_seconds', 'Time spent in serializers.',
+     TIME_BUCKETS),
+    ('render_duration_seconds', 'Time spent in renderers.', TIME_BUCKETS),
+    ('peak_memory_bytes', 'Growth of the maximum resident set size of the '
+     'process.', MEMORY_BUCKETS),
+))
+
+
+def get_max_rss():
+    """Function to get the maximum resident set size of the process
+
+    :return: bytes, 0 where getrusage is not available
+    """
+    if resource is None:
+        return 0
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in bytes by macOS and in KiB by the other systems.
+    return max_rss if sys.platform == 'darwin' else max_rss * 1024
+
+
+def start_profile():
+    """Function to start profiling the request of the current thread
+
+    :return: Profile
+    """
+    profile = Profile()
+    _state.profile = profile
+    for connection in connections.all():
+        profile.queries_logged[connection.alias] = (
+            connection.force_debug_cursor, len(connection.queries_log))
+        connection.force_debug_cursor = True
+    profile.start_memory = get_max_rss()
+    profile.start = time.time()
+    return profile
+
+
+def finish_profile(profile, view):
+    """Function to stop profiling the request of the current thread and
+    observe its figures in the histograms of the view
+    """
+    duration = time.time() - profile.start
+    profile.peak_memory = get_max_rss() - profile.start_memory
+    _state.profile = None
+    for connection in connections.all():
+        force_debug_cursor, logged = profile.queries_logged.get(
+            connection.alias, (False, 0))
+        connection.force_debug_cursor = force_debug_cursor
+        queries = list(connection.queries_log)[logged:]
+        profile.queries += len(queries)
+        profile.timings['sql'] += sum(
+            float(query['time']) for query in queries)
+    profile.timings['total'] = duration
+    for name, value in (
+            ('request_duration_seconds', duration),
+            ('sql_duration_seconds', profile.timings['sql']),
+            ('sql_queries', profile.queries),
+            ('serializer_duration_seconds', profile.timings['serializer']),
+            ('render_duration_seconds', profile.timings['render']),
+            ('peak_memory_bytes', profile.peak_memory)):
+        METRICS[name].observe(view, value)
+
+
+def build_server_timing(profile):
+    """Function to build the value of the Server-Timing header
+
+    :return: string
+    """
+    return ', '.join([
+        'sql;dur={:.2f};desc="{} queries"'.format(
+            profile.timings['sql'] * 1000, profile.queries),
+        'serializer;dur={:.2f}'.format(profile.timings['serializer'] * 1000),
+        'render;dur={:.2f}'.format(profile.timings['render'] * 1000),
+        'mem;desc="peak +{} KiB"'.format(profile.peak_memory // 1024),
+        'total;dur={:.2f}'.format(profile.timings['total'] * 1000),
+    ])
+
+
+def get_view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unknown'
+    view = getattr(match.func, 'cls', match.func)
+    return '{}.{}'.format(view.__module__, view.__name__)
+
+
+def metrics_view(request):
+    """View to expose the histograms in the Prometheus text format, not
+    found if the profiling is disabled
+    """
+    if not is_enabled():
+        raise Http404
+    lines = []
+    for histogram in METRICS.values():
+        lines.extend(histogram.render())
+    return HttpResponse(
+        '\n'.join(lines) + '\n',
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
@@ -0,0 +1,14 @@
+"""Pytest plugin of the query budgets (see moziotest/query_budget.py),
+loaded by the conftest.py of the project:
+
+    def test_list(self, query_budget):
+        with query_budget(3):
+            view(request)
+"""
+import pytest
+
+
+@pytest.fixture
+def query_budget():
+    from .query_budget import assert_max_queries
+    return assert_max_queries
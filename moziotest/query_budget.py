@@ -0,0 +1,132 @@
+"""Query budgets for the tests, to assert the number of queries made by a
+block of code regardless of the number of rows it handles, and to detect
+the N+1 patterns: the same query shape (the SQL without its literals)
+executed again for every row.
+
+    with assert_max_queries(3):
+        view(request)
+
+The query_budget fixture of moziotest/pytest_plugin.py gives
+assert_max_queries to the tests.
+"""
+import re
+from collections import Counter
+from contextlib import contextmanager
+
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+
+# A query shape executed more times is reported as an N+1 pattern.
+MAX_REPEATED_SHAPE = 2
+
+# Savepoints of the atomic blocks, they depend on the transaction the test
+# runs in and not on the code measured.
+IGNORED_QUERIES = re.compile(
+    r'^\s*(RELEASE |ROLLBACK TO )?SAVEPOINT\b', re.IGNORECASE)
+STRING_LITERALS = re.compile(r"'(?:[^']|'')*'")
+NUMBER_LITERALS = re.compile(r'\b\d+(?:\.\d+)?(?:e[+-]?\d+)?\b', re.IGNORECASE)
+VALUES_LIST = re.compile(r'([(\[])\s*\?(?:\s*,\s*\?)+\s*([)\]])')
+WHITESPACE = re.compile(r'\s+')
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def get_query_shape(sql):
+    """Function to get the SQL without its literals, lists of values
+    (e.g. IN lists) are reduced to a single item so the queries differing by
+    the number of ids have the same shape
+
+    :return: string
+    """
+    shape = STRING_LITERALS.sub('?', sql)
+    shape = NUMBER_LITERALS.sub('?', shape)
+    shape = VALUES_LIST.sub(r'\1?\2', shape)
+    return WHITESPACE.sub(' ', shape).strip()
+
+
+class QueryRecorder(object):
+    """Context manager to record the queries of the given database aliases,
+    all of them by default
+    """
+    def __init__(self, using=None):
+        self.using = using
+        self.contexts = []
+        self.queries = []
+
+    def __enter__(self):
+        aliases = self.using or [
+            connection.alias for connection in connections.all()]
+        self.contexts = [
+            CaptureQueriesContext(connections[alias]) for alias in aliases]
+        for context in self.contexts:
+            context.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        for context in self.contexts:
+            context.__exit__(exc_type, exc_value, traceback)
+        if exc_type is None:
+            self.queries = [
+                query['sql']
+                for context in self.contexts
+                for query in context.captured_queries
+                if not IGNORED_QUERIES.match(query['sql'])
+            ]
+
+    def __len__(self):
+        return len(self.queries)
+
+    def get_repeated(self, max_repeated=MAX_REPEATED_SHAPE):
+        """Method to get the query shapes executed more than max_repeated
+        times
+
+        :return: list of (shape, times) tuples, the most repeated first
+        """
+        return [
+            (shape, times) for shape, times in Counter(
+                get_query_shape(sql) for sql in self.queries).most_common()
+            if times > max_repeated
+        ]
+
+    def get_report(self):
+        return '\n'.join(
+            '{}. {}'.format(number, sql)
+            for number, sql in enumerate(self.queries, 1))
+
+    def check(self, max_queries=None, max_repeated=MAX_REPEATED_SHAPE):
+        """Method to check the recorded queries against the budget
+
+        :except: QueryBudgetExceeded if a query shape is repeated more than
+        max_repeated times (N+1 pattern) or there are more than max_queries
+        queries
+        """
+        repeated = self.get_repeated(max_repeated)
+        if repeated:
+            raise QueryBudgetExceeded(
+                'N+1 query pattern, repeated queries:\n{}\n\n'
+                'Queries:\n{}'.format('\n'.join(
+                    '{} times: {}'.format(times, shape)
+                    for shape, times in repeated), self.get_report())
+            )
+        if max_queries is not None and len(self) > max_queries:
+            raise QueryBudgetExceeded(
+                '{} queries executed, the budget is {}.\n\n'
+                'Queries:\n{}'.format(
+                    len(self), max_queries, self.get_report())
+            )
+
+
+@contextmanager
+def assert_max_queries(max_queries=None, max_repeated=MAX_REPEATED_SHAPE,
+                       using=None):
+    """Context manager to assert the queries of the block are within the
+    budget and do not follow an N+1 pattern
+
+    :return: QueryRecorder of the block
+    :except: QueryBudgetExceeded
+    """
+    with QueryRecorder(using) as recorder:
+        yield recorder
+    recorder.check(max_queries, max_repeated)
@@ -0,0 +1,107 @@
+import re
+import uuid
+from functools import partial
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Valid JSON but not valid JavaScript, escaped as DRF's JSONRenderer does.
+LINE_SEPARATORS = (
+    (b'\xe2\x80\xa8', b'\\u2028'),
+    (b'\xe2\x80\xa9', b'\\u2029'),
+)
+
+
+class RawJSON(object):
+    """Already encoded JSON value to be spliced as is in the response"""
+    __slots__ = ('fragment',)
+
+    def __init__(self, fragment):
+        self.fragment = fragment
+
+
+class FragmentJSONEncoder(JSONEncoder):
+    """Encoder which replaces every RawJSON value by a placeholder string,
+    keeping the fragments to be substituted after the encoding.
+    """
+    def __init__(self, fragments, marker, *args, **kwargs):
+        super(FragmentJSONEncoder, self).__init__(*args, **kwargs)
+        self.fragments = fragments
+        self.marker = marker
+
+    def default(self, obj):
+        if isinstance(obj, RawJSON):
+            self.fragments.append(obj.fragment)
+            return '{}:{}'.format(self.marker, len(self.fragments) - 1)
+        return super(FragmentJSONEncoder, self).default(obj)
+
+
+class FragmentJSONRenderer(JSONRenderer):
+    """JSONRenderer able to render RawJSON values without decoding them"""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        fragments = []
+        marker = uuid.uuid4().hex
+        self.encoder_class = partial(
+            FragmentJSONEncoder, fragments, marker)
+        ret = super(FragmentJSONRenderer, self).render(
+            data, accepted_media_type, renderer_context)
+        return splice_fragments(ret, marker, fragments)
+
+
+def splice_fragments(ret, marker, fragments):
+    """Function to replace the placeholders of the marker by the fragments
+
+    :return: bytes
+    """
+    if not fragments:
+        return ret
+    placeholder = re.compile(b'"' + marker.encode('ascii') + b':(\\d+)"')
+    return placeholder.sub(
+        lambda match: fragments[int(match.group(1))].encode('utf-8'), ret)
+
+
+class FastJSONRenderer(FragmentJSONRenderer):
+    """FragmentJSONRenderer encoding with orjson, which writes the lists of
+    coordinates and the NumPy arrays of coordinates natively instead of item
+    by item. The RawJSON values are spliced as in FragmentJSONRenderer, and
+    the dates and the rest of values orjson does not know (e.g. Decimal,
+    lazy strings) are encoded by DRF's JSONEncoder.
+
+    orjson only writes compact UTF-8, so the indented responses (e.g. of the
+    browsable API) and the ones with UNICODE_JSON or COMPACT_JSON disabled
+    are rendered by FragmentJSONRenderer, as all of them if orjson is not
+    installed.
+    """
+    options = orjson and (
+        orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS |
+        orjson.OPT_PASSTHROUGH_DATETIME
+    )
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return bytes()
+        renderer_context = renderer_context or {}
+        if orjson is None or self.ensure_ascii or not self.compact or (
+                self.get_indent(accepted_media_type, renderer_context)):
+            return super(FastJSONRenderer, self).render(
+                data, accepted_media_type, renderer_context)
+        fragments = []
+        marker = uuid.uuid4().hex
+        encoder = JSONEncoder()
+
+        def default(obj):
+            if not isinstance(obj, RawJSON):
+                return encoder.default(obj)
+            fragments.append(obj.fragment)
+            return '{}:{}'.format(marker, len(fragments) - 1)
+
+        ret = orjson.dumps(data, default=default, option=self.options)
+        for separator, escaped in LINE_SEPARATORS:
+            ret = ret.replace(separator, escaped)
+        return splice_fragments(ret, marker, fragments)
@@ -0,0 +1,67 @@
+"""Routing of the reads to the replicas of the default database.
+
+The reads are only sent to the replicas (DATABASE_REPLICAS) inside the safe
+requests marked by ReplicaRoutingMiddleware, everything else (writes, unsafe
+requests, management commands, shell) uses the primary database. The caches
+keyed by versions bumped by the writes are refilled from the primary database
+(see use_primary), a lagging replica would fill the new version with stale
+rows.
+"""
+import random
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+
+PRIMARY = 'default'
+
+_state = threading.local()
+
+
+def get_replicas():
+    return getattr(settings, 'DATABASE_REPLICAS', [])
+
+
+def use_replicas(enabled):
+    """Function to send the reads of the current thread to the replicas"""
+    _state.use_replicas = enabled
+
+
+def is_using_replicas():
+    return getattr(_state, 'use_replicas', False)
+
+
+@contextmanager
+def use_primary():
+    """Context manager to send the reads of the current thread to the
+    primary database, restoring the previous routing on exit
+    """
+    previous = is_using_replicas()
+    use_replicas(False)
+    try:
+        yield
+    finally:
+        use_replicas(previous)
+
+
+class ReplicaRouter(object):
+    """Database router sending the reads of the safe requests to a random
+    replica and the writes to the primary database
+    """
+    def db_for_read(self, model, **hints):
+        replicas = get_replicas()
+        if replicas and is_using_replicas():
+            return random.choice(replicas)
+        return PRIMARY
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = [PRIMARY] + list(get_replicas())
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == PRIMARY
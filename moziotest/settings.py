@@ -56,6 +56,7 @@ THIRD_PARTY_APPS = [
 INSTALLED_APPS = DJANGO_APPS + INTERNAL_APPS + THIRD_PARTY_APPS
 
 MIDDLEWARE = [
+    'moziotest.middleware.ProfilingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -64,6 +65,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'moziotest.middleware.ReplicaRoutingMiddleware',
 ]
 
 ROOT_URLCONF = 'moziotest.urls'
@@ -90,17 +92,72 @@ WSGI_APPLICATION = 'moziotest.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/1.11/ref/settings/#databases
 
+# The connections are kept open CONN_MAX_AGE seconds and checked before
+# their first use in every request, setting DATABASE_POOL_SIZE enables a pool
+# of connections shared by the threads of the process, see
+# moziotest/db/backends/postgis/base.py
+DATABASE_POOL_SIZE = int(os.environ.get('DATABASE_POOL_SIZE', 0))
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.contrib.gis.db.backends.postgis',
+        'ENGINE': 'moziotest.db.backends.postgis',
         'NAME': 'geodjango',
         'USER': 'geo',
         'PASSWORD': '123456',
         'HOST': 'localhost',
+        'CONN_MAX_AGE': int(os.environ.get('DATABASE_CONN_MAX_AGE', 60)),
+        'HEALTH_CHECKS': True,
+        'POOL': {
+            'MIN_SIZE': 1,
+            'MAX_SIZE': DATABASE_POOL_SIZE,
+        } if DATABASE_POOL_SIZE else None,
     }
 }
 
 
+def get_replica_database(replica):
+    """Function to get the settings of a replica of the default database
+    given as host[:port][/name]
+    """
+    address, _, name = replica.partition('/')
+    host, _, port = address.partition(':')
+    return dict(
+        DATABASES['default'],
+        HOST=host or DATABASES['default']['HOST'],
+        PORT=port,
+        NAME=name or DATABASES['default']['NAME'],
+        TEST={'MIRROR': 'default'},
+    )
+
+
+# Read replicas of the default database as a comma separated list of
+# host[:port][/name], the safe requests read from them, see
+# moziotest/routers.py and moziotest/middleware.py
+for index, replica in enumerate(
+        filter(None, os.environ.get('DATABASE_REPLICAS', '').split(','))):
+    DATABASES['replica_{}'.format(index)] = get_replica_database(replica)
+
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+
+DATABASE_ROUTERS = ['moziotest.routers.ReplicaRouter']
+
+# Profiling of the requests, see moziotest/profiling.py
+PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED') == 'true'
+
+# Seconds a client reads from the primary database after a write.
+DATABASE_REPLICA_STICKY_SECONDS = 5
+
+# Cache shared by every process to pin the clients by their Authorization
+# header besides the cookie, disabled when empty.
+DATABASE_REPLICA_PIN_CACHE = os.environ.get('DATABASE_REPLICA_PIN_CACHE')
+
+# Pool of asyncpg connections of every ASGI worker, see moziotest/asgi.py
+ASYNC_DATABASE_POOL = {
+    'MIN_SIZE': 1,
+    'MAX_SIZE': int(os.environ.get('ASYNC_DATABASE_POOL_SIZE', 10)),
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/1.11/ref/settings/#auth-password-validators
 
@@ -147,7 +204,52 @@ AUTH_USER_MODEL = 'users.User'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework.authentication.TokenAuthentication',
+        'moziotest.authentication.CachedTokenAuthentication',
     ),
-    'PAGE_SIZE': '20',
+    'DEFAULT_RENDERER_CLASSES': (
+        'moziotest.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'PAGE_SIZE': 20,
+}
+
+# Answer the location lookups from an in-process spatial index of the
+# polygons instead of querying PostGIS, see polygons/spatial_index.py
+POLYGONS_SPATIAL_INDEX = os.environ.get('POLYGONS_SPATIAL_INDEX') == 'true'
+
+# Seconds between the checks of the spatial index against the database, to
+# see the polygons written by other processes.
+POLYGONS_SPATIAL_INDEX_CHECK_INTERVAL = 5
+
+# Maximum number of points accepted by the batch location lookup.
+POLYGONS_MAX_BATCH_POINTS = 10000
+
+# Cache of the location lookups, see polygons/location_cache.py for the
+# options (GRID_SIZE, MAX_ENTRIES, BACKEND...), disabled when empty.
+POLYGONS_LOCATION_CACHE = {
+    'GRID_SIZE': 0.001,
+    'MAX_ENTRIES': 10000,
+    'BACKEND': os.environ.get('POLYGONS_LOCATION_CACHE_BACKEND'),
+}
+
+# Cache of the token authentication, see moziotest/authentication.py
+AUTH_TOKEN_CACHE = {
+    'MAX_ENTRIES': 10000,
+    'TIMEOUT': 60,
+    'BACKEND': os.environ.get('AUTH_TOKEN_CACHE_BACKEND'),
+}
+
+# Cache of the vector tiles, see polygons/tiles.py for the options,
+# disabled without a BACKEND, which must be shared by every process.
+POLYGONS_TILE_CACHE = {
+    'BACKEND': os.environ.get('POLYGONS_TILE_CACHE_BACKEND'),
+    'TIMEOUT': 3600,
+}
+
+# Cache of the pages of the polygons of every provider, see
+# polygons/provider_cache.py for the options, disabled without a BACKEND,
+# which must be shared by every process.
+POLYGONS_PROVIDER_CACHE = {
+    'BACKEND': os.environ.get('POLYGONS_PROVIDER_CACHE_BACKEND'),
+    'TIMEOUT': 300,
 }
@@ -1,3 +1,6 @@
+import os
+import tempfile
+
 from .settings import *
 
 DATABASES = {
@@ -7,4 +10,26 @@ DATABASES = {
     }
 }
 
+DATABASE_REPLICAS = []
+
+# Cache shared by the processes of the tests, for the caches which refuse a
+# cache local to the process.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(tempfile.gettempdir(), 'moziotest_cache'),
+    },
+}
+
 EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
+
+POLYGONS_SPATIAL_INDEX = False
+
+POLYGONS_LOCATION_CACHE = {}
+
+POLYGONS_TILE_CACHE = {}
+
+POLYGONS_PROVIDER_CACHE = {}
@@ -0,0 +1,38 @@
+"""Helpers shared by the test suites of the apps."""
+
+from django.db import connection, transaction
+
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+
+def get_view_queryset(view_class, path='/', **kwargs):
+    """Function to get the queryset a view would use for a GET request
+
+    :return: queryset built by the get_queryset method of the view
+    """
+    view = view_class()
+    view.request = Request(APIRequestFactory().get(path))
+    view.kwargs = kwargs
+    return view.get_queryset()
+
+
+def explain(queryset):
+    """Function to get the query plan of a queryset with the sequential
+    scans disabled, so the planner only falls back to them when there is no
+    index usable by the query whatever the size of the tables is.
+
+    :return: query plan as text
+    """
+    sql, params = queryset.query.sql_with_params()
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute('SET LOCAL enable_seqscan = off')
+        cursor.execute('EXPLAIN ' + sql, params)
+        return '\n'.join(row[0] for row in cursor.fetchall())
+
+
+def assert_no_seq_scan(queryset):
+    plan = explain(queryset)
+    assert 'Seq Scan' not in plan, (
+        'Should use an index instead of a sequential scan:\n' + plan)
+    return plan
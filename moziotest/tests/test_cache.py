@@ -0,0 +1,40 @@
+"""Testing the cache helpers"""
+
+import pytest
+
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+
+from .. import cache
+
+
+class TestCacheVersions(object):
+
+    @pytest.fixture(autouse=True)
+    def shared_cache(self):
+        caches['shared'].clear()
+        yield caches['shared']
+        caches['shared'].clear()
+
+    def test_get_cache_version(self, shared_cache):
+        version = cache.get_cache_version(shared_cache, 'version')
+
+        assert version > 0, 'Should start from the current time'
+        assert cache.get_cache_version(shared_cache, 'version') == version
+
+    def test_bump_cache_version(self, shared_cache):
+        version = cache.get_cache_version(shared_cache, 'version')
+        cache.bump_cache_version(shared_cache, 'version')
+
+        assert cache.get_cache_version(shared_cache, 'version') == version + 1
+
+    def test_bump_evicted_cache_version(self, shared_cache):
+        cache.bump_cache_version(shared_cache, 'version')
+
+        assert shared_cache.get('version') > 0, (
+            'Should start from the current time')
+
+    def test_get_shared_cache_refuses_local_backend(self):
+        assert cache.get_shared_cache('shared') is caches['shared']
+        with pytest.raises(ImproperlyConfigured):
+            cache.get_shared_cache('default')
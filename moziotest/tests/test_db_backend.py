@@ -0,0 +1,69 @@
+"""Testing the pool and the health checks of the database backend"""
+
+import pytest
+
+from django.db import connection
+
+from ..db.backends.postgis import base
+
+pytestmark = pytest.mark.django_db
+
+ALIAS = 'pool_test'
+
+
+class TestPooledDatabaseWrapper(object):
+
+    @pytest.fixture
+    def wrapper(self):
+        settings_dict = dict(
+            connection.settings_dict,
+            POOL={'MIN_SIZE': 1, 'MAX_SIZE': 2},
+            HEALTH_CHECKS=True,
+            CONN_MAX_AGE=None,
+        )
+        wrapper = base.DatabaseWrapper(settings_dict, ALIAS)
+        yield wrapper
+        wrapper.close()
+        base.close_pools()
+
+    def test_checkout(self, wrapper):
+        wrapper.ensure_connection()
+        connection_pool = base._pools[ALIAS]
+
+        assert wrapper.connection is wrapper.pooled_connection
+        assert wrapper.connection_pool is connection_pool
+        assert id(wrapper.connection) in connection_pool._rused
+
+    def test_return(self, wrapper):
+        wrapper.ensure_connection()
+        pooled_connection = wrapper.connection
+        wrapper.close()
+
+        assert wrapper.connection is None
+        assert pooled_connection in base._pools[ALIAS]._pool, (
+            'Should put the connection back in the pool')
+        wrapper.ensure_connection()
+        assert wrapper.connection is pooled_connection, (
+            'Should reuse the pooled connection')
+
+    def test_health_check_replaces_broken_connection(self, wrapper):
+        wrapper.ensure_connection()
+        broken_connection = wrapper.connection
+        # As if the server closed the connection between requests.
+        broken_connection.close()
+        wrapper.close_if_unusable_or_obsolete()
+        wrapper.ensure_connection()
+
+        assert wrapper.connection is not broken_connection
+        assert wrapper.is_usable()
+        assert broken_connection not in base._pools[ALIAS]._pool, (
+            'Should not put the broken connection back in the pool')
+
+    def test_close_after_close_pools(self, wrapper):
+        wrapper.ensure_connection()
+        base.close_pools()
+        wrapper.close()
+
+        assert wrapper.connection is None
+        assert ALIAS not in base._pools, (
+            'Should not create a pool to put the connection back')
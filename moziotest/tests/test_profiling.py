@@ -0,0 +1,98 @@
+"""Testing request profiling"""
+
+import pytest
+
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import Http404
+from django.test import RequestFactory
+from mixer.backend.django import mixer
+from rest_framework import renderers
+
+from users.views import UserView
+
+from .. import profiling
+from ..middleware import ProfilingMiddleware
+
+pytestmark = pytest.mark.django_db
+
+
+class TestProfiling(object):
+
+    factory = RequestFactory()
+
+    @pytest.fixture(autouse=True)
+    def uninstall(self):
+        yield
+        profiling.uninstall()
+
+    def process(self, req):
+        def get_response(request):
+            response = UserView.as_view()(request)
+            return response.render()
+
+        return ProfilingMiddleware(get_response)(req)
+
+    def test_disabled_middleware_is_not_used(self, settings):
+        settings.PROFILING_ENABLED = False
+
+        with pytest.raises(MiddlewareNotUsed):
+            ProfilingMiddleware(lambda request: None)
+
+    def test_sends_server_timing(self, settings):
+        settings.PROFILING_ENABLED = True
+        mixer.cycle(3).blend('users.User')
+
+        resp = self.process(self.factory.get('/api/v1/users'))
+
+        assert resp.status_code == 200
+        assert 'sql;dur=' in resp['Server-Timing']
+        assert 'serializer;dur=' in resp['Server-Timing']
+        assert 'render;dur=' in resp['Server-Timing']
+
+    def test_uninstall_restores_methods(self, settings):
+        settings.PROFILING_ENABLED = True
+        render = renderers.JSONRenderer.render
+        ProfilingMiddleware(lambda request: None)
+        assert renderers.JSONRenderer.render != render
+
+        profiling.uninstall()
+        assert renderers.JSONRenderer.render == render
+
+    def test_counts_queries(self, settings):
+        settings.PROFILING_ENABLED = True
+
+        profile = profiling.start_profile()
+        list(mixer.cycle(2).blend('users.User'))
+        profiling.finish_profile(profile, 'test')
+
+        assert profile.queries >= 2
+
+    def test_exposes_metrics(self, settings):
+        settings.PROFILING_ENABLED = True
+        self.process(self.factory.get('/api/v1/users'))
+
+        resp = profiling.metrics_view(self.factory.get('/metrics'))
+
+        assert resp.status_code == 200
+        assert b'request_duration_seconds_bucket' in resp.content
+        assert b'sql_queries_count' in resp.content
+
+    def test_exposes_peak_memory(self, settings, monkeypatch):
+        settings.PROFILING_ENABLED = True
+        max_rss = iter([1024 * 1024, 3 * 1024 * 1024])
+        monkeypatch.setattr(profiling, 'get_max_rss', lambda: next(max_rss))
+        resp = self.process(self.factory.get('/api/v1/users'))
+
+        assert 'mem;desc="peak +2048 KiB"' in resp['Server-Timing']
+        resp = profiling.metrics_view(self.factory.get('/metrics'))
+        assert b'peak_memory_bytes_bucket' in resp.content
+        assert b'peak_memory_bytes_sum' in resp.content
+        series = profiling.METRICS['peak_memory_bytes'].series['unknown']
+        assert series[-2] >= 2 * 1024 * 1024, (
+            'Should observe the growth of the request')
+
+    def test_metrics_not_found_if_disabled(self, settings):
+        settings.PROFILING_ENABLED = False
+
+        with pytest.raises(Http404):
+            profiling.metrics_view(self.factory.get('/metrics'))
@@ -0,0 +1,90 @@
+"""Testing renderers"""
+
+import datetime
+import json
+from collections import OrderedDict
+from decimal import Decimal
+
+import pytest
+
+from django.utils import timezone
+from django.utils.translation import ugettext_lazy
+
+from .. import renderers
+from ..renderers import FastJSONRenderer, FragmentJSONRenderer, RawJSON
+
+
+class TestFastJSONRenderer(object):
+
+    data = OrderedDict([
+        ('name', 'Downtown'),
+        ('price', Decimal('10.50')),
+        ('created_at', datetime.datetime(2017, 7, 1, 12, 30)),
+        ('detail', ugettext_lazy('Not found.')),
+        ('geometry', {
+            'type': 'Polygon',
+            'coordinates': (((0.0, 0.0), (0.0, 50.5), (50.5, 0.0)),),
+        }),
+        ('fragment', RawJSON('{"type":"Polygon","coordinates":[[[1,2]]]}')),
+        (1, [RawJSON('[1,2]'), RawJSON('null')]),
+    ])
+
+    def test_renders_as_fragment_renderer(self):
+        rendered = FastJSONRenderer().render(self.data)
+
+        assert json.loads(rendered.decode('utf-8')) == json.loads(
+            FragmentJSONRenderer().render(self.data).decode('utf-8'))
+        assert b'"fragment":{"type":"Polygon"' in rendered, (
+            'Should splice the fragment as is')
+
+    def test_renders_none(self):
+        assert FastJSONRenderer().render(None) == b''
+
+    def test_escapes_line_separators(self):
+        rendered = FastJSONRenderer().render({'name': u'a\u2028b\u2029'})
+
+        assert rendered == b'{"name":"a\\u2028b\\u2029"}'
+
+    def test_indented_by_fragment_renderer(self):
+        rendered = FastJSONRenderer().render(
+            self.data, renderer_context={'indent': 4})
+
+        assert b'\n    "name": "Downtown"' in rendered
+
+    def test_renders_dates_as_drf(self):
+        data = {
+            'created_at': datetime.datetime(
+                2017, 7, 1, 12, 30, 15, 123456, tzinfo=timezone.utc),
+            'date': datetime.date(2017, 7, 1),
+            'time': datetime.time(12, 30, 15, 123456),
+        }
+        rendered = FastJSONRenderer().render(data)
+
+        assert json.loads(rendered.decode('utf-8')) == json.loads(
+            FragmentJSONRenderer().render(data).decode('utf-8'))
+        assert b'"2017-07-01T12:30:15.123Z"' in rendered
+
+    def test_ascii_by_fragment_renderer(self):
+        renderer = FastJSONRenderer()
+        renderer.ensure_ascii = True
+
+        assert renderer.render({'name': u'caf\xe9'}) == (
+            b'{"name":"caf\\u00e9"}')
+
+    def test_not_compact_by_fragment_renderer(self):
+        renderer = FastJSONRenderer()
+        renderer.compact = False
+
+        assert renderer.render({'name': 'Downtown'}) == (
+            b'{"name": "Downtown"}')
+
+    def test_without_orjson(self, monkeypatch):
+        monkeypatch.setattr(renderers, 'orjson', None)
+
+        rendered = FastJSONRenderer().render(self.data)
+
+        assert rendered == FragmentJSONRenderer().render(self.data)
+
+    def test_unknown_value(self):
+        with pytest.raises(TypeError):
+            FastJSONRenderer().render({'value': object()})
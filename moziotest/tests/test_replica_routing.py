@@ -0,0 +1,105 @@
+"""Testing replica routing"""
+
+import pytest
+
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from users.models import User
+
+from .. import routers
+from ..middleware import PIN_COOKIE_NAME, ReplicaRoutingMiddleware
+
+
+class TestReplicaRouting(object):
+
+    factory = RequestFactory()
+    router = routers.ReplicaRouter()
+
+    @pytest.fixture(autouse=True)
+    def replicas(self, settings):
+        settings.DATABASE_REPLICAS = ['replica']
+        settings.DATABASE_REPLICA_PIN_CACHE = 'shared'
+        caches['shared'].clear()
+        yield
+        routers.use_replicas(False)
+        caches['shared'].clear()
+
+    def process(self, req, status=200):
+        databases = []
+
+        def get_response(request):
+            databases.append(self.router.db_for_read(User))
+            return HttpResponse(status=status)
+
+        resp = ReplicaRoutingMiddleware(get_response)(req)
+        return databases[0], resp
+
+    def test_reads_from_primary_outside_requests(self):
+        assert self.router.db_for_read(User) == 'default'
+
+    def test_writes_to_primary(self):
+        routers.use_replicas(True)
+        assert self.router.db_for_read(User) == 'replica'
+        assert self.router.db_for_write(User) == 'default'
+
+    def test_safe_request_reads_from_replica(self):
+        database, _ = self.process(self.factory.get('/'))
+
+        assert database == 'replica'
+        assert self.router.db_for_read(User) == 'default', (
+            'Should read from primary after the request')
+
+    def test_unsafe_request_reads_from_primary(self):
+        database, resp = self.process(self.factory.post('/'))
+
+        assert database == 'default'
+        assert PIN_COOKIE_NAME in resp.cookies
+
+    def test_failed_write_does_not_pin(self):
+        _, resp = self.process(self.factory.post('/'), status=400)
+        assert PIN_COOKIE_NAME not in resp.cookies
+
+    def test_read_your_writes_by_cookie(self):
+        req = self.factory.get('/')
+        req.COOKIES[PIN_COOKIE_NAME] = '1'
+        database, _ = self.process(req)
+
+        assert database == 'default'
+
+    def test_read_your_writes_by_token(self):
+        self.process(self.factory.patch('/', HTTP_AUTHORIZATION='Token abc'))
+
+        database, _ = self.process(
+            self.factory.get('/', HTTP_AUTHORIZATION='Token abc'))
+        assert database == 'default'
+
+        database, _ = self.process(
+            self.factory.get('/', HTTP_AUTHORIZATION='Token xyz'))
+        assert database == 'replica'
+
+    def test_token_pin_needs_pin_cache(self, settings):
+        settings.DATABASE_REPLICA_PIN_CACHE = None
+        _, resp = self.process(
+            self.factory.patch('/', HTTP_AUTHORIZATION='Token abc'))
+
+        assert PIN_COOKIE_NAME in resp.cookies
+        database, _ = self.process(
+            self.factory.get('/', HTTP_AUTHORIZATION='Token abc'))
+        assert database == 'replica'
+
+    def test_pin_cache_refuses_local_backend(self, settings):
+        settings.DATABASE_REPLICA_PIN_CACHE = 'default'
+
+        with pytest.raises(ImproperlyConfigured):
+            self.process(
+                self.factory.get('/', HTTP_AUTHORIZATION='Token abc'))
+
+    def test_use_primary(self):
+        routers.use_replicas(True)
+        with routers.use_primary():
+            assert self.router.db_for_read(User) == 'default'
+        assert self.router.db_for_read(User) == 'replica', (
+            'Should restore the routing')
@@ -16,10 +16,13 @@ Including another URLconf
 from django.conf.urls import url, include
 from django.contrib import admin
 
+from moziotest.profiling import metrics_view
+
 urlpatterns = [
     url(r'^api/v1/users', include('users.urls')),
     url(r'^api/v1/polygons', include('polygons.urls')),
 
     url(r'^admin/', admin.site.urls),
     url(r'^api/v1/docs', include('rest_framework_docs.urls')),
+    url(r'^metrics$', metrics_view),
 ]
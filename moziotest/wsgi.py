@@ -14,3 +14,12 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "moziotest.settings")
 
 application = get_wsgi_application()
+
+# Load the in-process spatial index before serving any request.
+from polygons.spatial_index import warm_up  # noqa: E402
+warm_up()
+
+# Close the pooled connections opened while loading, so the workers forked
+# from this process do not share them.
+from moziotest.db.backends.postgis.base import close_pools  # noqa: E402
+close_pools()
@@ -0,0 +1,309 @@
+"""Async implementation of the location and batch lookups, served by the
+ASGI application of moziotest/asgi.py.
+
+The lookups run the queries of ProviderPolygonByLocationView and
+ProviderPolygonBatchLocationView on a pool of asyncpg connections, so a
+worker process waits on PostGIS for many requests at once. Only the requests
+answered with the same response are handled here: the first page of a point
+lookup (lat, lng and optionally detail) and the batch lookup, with the
+spatial index disabled. Both look up the exact point, the location cache of
+the Django view only keeps the responses of the cells where every point has
+the same polygons. The other ones (pages after the first, bbox, radius,
+nearest, tolerance, browsable API, polygons without precomputed GeoJSON) are
+passed to the Django application. The rows are serialized, paginated and
+rendered by the same classes as the Django views.
+"""
+import asyncio
+import json
+import math
+from collections import OrderedDict
+from urllib.parse import parse_qsl
+
+import asyncpg
+from django.conf import settings
+from rest_framework.pagination import Cursor
+
+from moziotest.pagination import IdCursorPagination
+from moziotest.renderers import FastJSONRenderer
+from users.models import User
+
+from .lookups import POINTS_IN_POLYGONS_QUERY, build_polygon_match
+from .mixins import FULL_DETAIL
+from .models import DETAIL_FIELDS, ProviderPolygon
+from .serializers import (
+    LocationBatchSerializer, ProviderPolygonWithNameSerializer
+)
+from .spatial_index import is_enabled
+
+LOCATION_PATH = '/api/v1/polygons'
+BATCH_PATH = '/api/v1/polygons/batch'
+LOCATION_PARAMS = {'lat', 'lng', 'detail'}
+
+LOCATION_SQL = """
+    SELECT polygon.id, polygon.name, polygon.price, polygon.{geojson_field},
+        polygon.created_at, polygon.updated_at, provider.name
+    FROM {polygon_table} AS polygon
+    JOIN {user_table} AS provider ON provider.id = polygon.user_id
+    WHERE ST_Contains(polygon.geom, ST_SetSRID(ST_MakePoint($1, $2), 4326))
+    ORDER BY polygon.id
+    LIMIT $3
+"""
+
+BATCH_SQL = POINTS_IN_POLYGONS_QUERY.format(
+    lats='$1',
+    lngs='$2',
+    polygon_table=ProviderPolygon._meta.db_table,
+    user_table=User._meta.db_table,
+)
+
+_pool = None
+
+
+async def create_pool():
+    database = settings.DATABASES['default']
+    options = settings.ASYNC_DATABASE_POOL
+    return await asyncpg.create_pool(
+        host=database.get('HOST') or None,
+        port=int(database['PORT']) if database.get('PORT') else None,
+        database=database['NAME'],
+        user=database.get('USER') or None,
+        password=database.get('PASSWORD') or None,
+        min_size=options['MIN_SIZE'],
+        max_size=options['MAX_SIZE'],
+    )
+
+
+def get_pool():
+    """Function to get the pool of connections of the worker, created on
+    the first call and shared by the requests awaiting it meanwhile
+
+    :return: future of the asyncpg pool
+    """
+    global _pool
+    if _pool is None:
+        _pool = asyncio.ensure_future(create_pool())
+    return _pool
+
+
+async def close_pool():
+    global _pool
+    if _pool is not None:
+        pool, _pool = await _pool, None
+        await pool.close()
+
+
+def get_location_params(query_string):
+    """Function to get the params of a point lookup handled by the async
+    path
+
+    :return: tuple (lat, lng, detail) or None to pass the request to the
+    Django application
+    """
+    params = dict(parse_qsl(query_string))
+    if not {'lat', 'lng'} <= set(params) <= LOCATION_PARAMS:
+        return None
+    detail = params.get('detail', FULL_DETAIL)
+    if detail not in DETAIL_FIELDS:
+        return None
+    try:
+        lat, lng = float(params['lat']), float(params['lng'])
+    except ValueError:
+        return None
+    if any(math.isnan(value) or math.isinf(value) for value in (lat, lng)):
+        return None
+    return lat, lng, detail
+
+
+def build_instance(row, detail):
+    """Function to build an unsaved polygon from a row of LOCATION_SQL, with
+    the provider and the precomputed GeoJSON of the level of detail, to be
+    serialized by ProviderPolygonWithNameSerializer without queries
+
+    :return: ProviderPolygon instance
+    """
+    pk, name, price, geojson, created_at, updated_at, provider_name = row
+    return ProviderPolygon(
+        pk=pk, name=name, price=price, created_at=created_at,
+        updated_at=updated_at, user=User(name=provider_name),
+        **{DETAIL_FIELDS[detail]: geojson}
+    )
+
+
+def build_absolute_uri(scope, query_string):
+    headers = dict(scope['headers'])
+    host = headers.get(b'host', b'').decode('latin-1')
+    if not host and scope.get('server'):
+        host = '{}:{}'.format(*scope['server'])
+    url = '{}://{}{}'.format(scope.get('scheme', 'http'), host, scope['path'])
+    return '{}?{}'.format(url, query_string) if query_string else url
+
+
+def build_next_url(scope, query_string, instance):
+    """Function to build the link of the next page with the cursor encoding
+    of IdCursorPagination
+
+    :return: absolute URL
+    """
+    paginator = IdCursorPagination()
+    paginator.base_url = build_absolute_uri(scope, query_string)
+    return paginator.encode_cursor(Cursor(
+        offset=0, reverse=False,
+        position=paginator._get_position_from_instance(
+            instance, (paginator.ordering,))
+    ))
+
+
+def render(data):
+    """Function to render the data with the JSON renderer of the Django
+    views, so both paths answer the same bytes
+
+    :return: bytes
+    """
+    return FastJSONRenderer().render(data, FastJSONRenderer.media_type)
+
+
+async def lookup_location(scope, query_string, lat, lng, detail):
+    """Function to answer the first page of a point lookup
+
+    :return: tuple (status, body) or None to pass the request to the Django
+    application if a precomputed geometry is missing, the serializer builds
+    it from the GEOS object
+    """
+    page_size = IdCursorPagination.page_size
+    pool = await get_pool()
+    rows = await pool.fetch(
+        LOCATION_SQL.format(
+            geojson_field=DETAIL_FIELDS[detail],
+            polygon_table=ProviderPolygon._meta.db_table,
+            user_table=User._meta.db_table,
+        ),
+        lat, lng, page_size + 1
+    )
+    if any(not row[3] for row in rows):
+        return None
+    instances = [build_instance(row, detail) for row in rows[:page_size]]
+    next_url = None
+    if len(rows) > page_size:
+        next_url = build_next_url(scope, query_string, instances[-1])
+    serializer = ProviderPolygonWithNameSerializer(
+        instances, many=True, context={'detail': detail})
+    return 200, render(OrderedDict([
+        ('next', next_url),
+        ('previous', None),
+        ('results', serializer.data),
+    ]))
+
+
+async def lookup_batch(body):
+    """Function to answer a batch lookup
+
+    :return: tuple (status, body)
+    """
+    try:
+        data = json.loads(body.decode('utf-8'))
+    except ValueError as exc:
+        return 400, render(
+            {'detail': 'JSON parse error - {}'.format(exc)})
+    serializer = LocationBatchSerializer(data=data)
+    if not serializer.is_valid():
+        return 400, render(serializer.errors)
+    points = serializer.validated_data['points']
+    matches = [[] for _ in points]
+    if points:
+        lats, lngs = zip(*points)
+        pool = await get_pool()
+        for idx, pk, price, name in await pool.fetch(
+                BATCH_SQL, list(lats), list(lngs)):
+            matches[idx - 1].append(build_polygon_match(pk, price, name))
+    return 200, render({
+        'results': [
+            {'lat': lat, 'lng': lng, 'polygons': polygons}
+            for (lat, lng), polygons in zip(points, matches)
+        ]
+    })
+
+
+async def read_body(receive):
+    body = b''
+    more_body = True
+    while more_body:
+        message = await receive()
+        body += message.get('body', b'')
+        more_body = message.get('more_body', False)
+    return body
+
+
+class AsyncLookupApplication(object):
+    """ASGI application answering the location and batch lookups, the other
+    requests are passed to the fallback application
+    """
+    def __init__(self, fallback):
+        self.fallback = fallback
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self.lifespan(receive, send)
+        response = None
+        if scope['type'] == 'http' and self.can_handle(scope):
+            response = await self.handle(scope, receive)
+        if response is None:
+            return await self.fallback(scope, receive, send)
+        status, body = response
+        headers = [
+            (b'content-type', FastJSONRenderer.media_type.encode('ascii')),
+            (b'content-length', str(len(body)).encode('ascii')),
+            (b'vary', b'Accept, Origin'),
+        ]
+        # Only the origins allowed to all are handled, see can_handle.
+        if b'origin' in dict(scope['headers']):
+            headers.append((b'access-control-allow-origin', b'*'))
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': headers,
+        })
+        await send({'type': 'http.response.body', 'body': body})
+
+    @staticmethod
+    def can_handle(scope):
+        """Method to choose the requests answered by the async path, it can
+        not read the body given the fallback would need it. The browsable
+        API, the indented JSON and the cross-origin requests not allowed to
+        all origins are left to the Django application and its middleware.
+        """
+        if is_enabled():
+            return False
+        headers = dict(scope['headers'])
+        accept = headers.get(b'accept', b'')
+        if b'text/html' in accept or b'indent' in accept:
+            return False
+        if b'origin' in headers and not getattr(
+                settings, 'CORS_ORIGIN_ALLOW_ALL', False):
+            return False
+        if scope['path'] == BATCH_PATH:
+            content_type = headers.get(b'content-type', b'')
+            return scope['method'] == 'POST' and content_type.startswith(
+                b'application/json')
+        return scope['path'] == LOCATION_PATH and scope['method'] == 'GET'
+
+    @staticmethod
+    async def handle(scope, receive):
+        if scope['path'] == BATCH_PATH:
+            return await lookup_batch(await read_body(receive))
+        query_string = scope['query_string'].decode('latin-1')
+        params = get_location_params(query_string)
+        if params is None:
+            return None
+        return await lookup_location(scope, query_string, *params)
+
+    @staticmethod
+    async def lifespan(receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await get_pool()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await close_pool()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
@@ -0,0 +1,78 @@
+"""Streaming export of all the polygons as GeoJSON or NDJSON.
+
+The rows are read with a server-side cursor (QuerySet.iterator) and the
+precomputed GeoJSON of every geometry is written as is, so the memory used
+does not depend on the number of polygons. The rows without it (e.g. written
+by QuerySet.update) get the GeoJSON built by PostGIS.
+"""
+import json
+
+from django.contrib.gis.db.models.functions import AsGeoJSON
+from django.db.models import Case, F, TextField, When
+
+from .models import ProviderPolygon
+
+FEATURES_PER_CHUNK = 100
+
+FORMATS = {
+    'geojson': 'application/geo+json',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+def get_export_queryset():
+    return ProviderPolygon.objects.order_by('id').annotate(
+        geometry=Case(
+            When(geojson='', then=AsGeoJSON('geom')),
+            default=F('geojson'),
+            output_field=TextField()
+        )
+    ).values_list('id', 'name', 'price', 'user_id', 'user__name', 'geometry')
+
+
+def build_feature(pk, name, price, user_id, provider_name, geojson):
+    properties = json.dumps({
+        'name': name,
+        'price': str(price),
+        'provider_id': user_id,
+        'provider_name': provider_name,
+    })
+    return '{{"type":"Feature","id":{},"geometry":{},"properties":{}}}'.format(
+        pk, geojson, properties)
+
+
+def iter_features(queryset=None):
+    """Function to get the features grouped in chunks of FEATURES_PER_CHUNK
+
+    :return: generator of lists of encoded features
+    """
+    if queryset is None:
+        queryset = get_export_queryset()
+    chunk = []
+    for row in queryset.iterator():
+        chunk.append(build_feature(*row))
+        if len(chunk) == FEATURES_PER_CHUNK:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def iter_ndjson(queryset=None):
+    for chunk in iter_features(queryset):
+        yield '\n'.join(chunk) + '\n'
+
+
+def iter_geojson(queryset=None):
+    yield '{"type":"FeatureCollection","features":['
+    separator = ''
+    for chunk in iter_features(queryset):
+        yield separator + ','.join(chunk)
+        separator = ','
+    yield ']}'
+
+
+def iter_export(output_format, queryset=None):
+    if output_format == 'ndjson':
+        return iter_ndjson(queryset)
+    return iter_geojson(queryset)
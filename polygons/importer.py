@@ -0,0 +1,145 @@
+"""Bulk import of polygons from GeoJSON features, NDJSON or WKB rows.
+
+Every feature is validated with the rules of ProviderPolygonSerializerToWrite
+and the valid ones are inserted in batches inside a single transaction.
+"""
+import json
+import time
+
+from django.contrib.gis.geos import GEOSGeometry, GEOSException
+from django.db import transaction
+from rest_framework.exceptions import ValidationError
+
+from .models import ProviderPolygon
+from .serializers import ProviderPolygonSerializerToWrite
+from .signals import invalidate_bulk_created
+from .utils import get_polygon_obj
+
+BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 100
+INVALID_ROW = (
+    'Should be a GeoJSON Feature or a "name<TAB>price<TAB>hex WKB" row.'
+)
+NOT_FEATURES = (
+    'Should be a GeoJSON FeatureCollection, a Feature or a list of Features.'
+)
+
+
+class ImportReport(object):
+    def __init__(self):
+        self.created = 0
+        self.rejected = 0
+        self.errors = []
+        self.seconds = 0.0
+
+    def reject(self, row, errors):
+        self.rejected += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'row': row, 'errors': errors})
+
+    @property
+    def rows_per_second(self):
+        rows = self.created + self.rejected
+        return rows / self.seconds if self.seconds else float(rows)
+
+    def as_dict(self):
+        return {
+            'created': self.created,
+            'rejected': self.rejected,
+            'seconds': round(self.seconds, 3),
+            'rows_per_second': round(self.rows_per_second, 1),
+            'errors': self.errors,
+        }
+
+
+def features_from_geojson(data):
+    """Function to get the features of a FeatureCollection, a Feature or a
+    list of them
+
+    :return: list of features
+    :except: ValidationError if the data is none of them
+    """
+    if isinstance(data, list):
+        return data
+    if isinstance(data, dict):
+        if data.get('type') == 'Feature':
+            return [data]
+        if isinstance(data.get('features'), list):
+            return data['features']
+    raise ValidationError({'non_field_errors': [NOT_FEATURES]})
+
+
+def feature_from_json(line):
+    """Function to decode a feature, a wrong line is kept as None to be
+    rejected by the import
+    """
+    try:
+        return json.loads(line)
+    except ValueError:
+        return None
+
+
+def features_from_ndjson(lines):
+    return [feature_from_json(line) for line in lines if line.strip()]
+
+
+def feature_from_wkb_row(line):
+    """Function to build a feature from a "name<TAB>price<TAB>hex WKB" row,
+    as exported from a shapefile, a wrong WKB leaves the geometry empty to be
+    rejected by the validation and a row without three columns is kept as
+    None to be rejected by the import.
+    """
+    columns = line.rstrip('\r\n').split('\t')
+    if len(columns) != 3:
+        return None
+    name, price, wkb = columns
+    try:
+        geom = GEOSGeometry(wkb.strip())
+        geometry = {'type': geom.geom_type, 'coordinates': geom.coords}
+    except (GEOSException, ValueError, TypeError):
+        geometry = None
+    return {
+        'type': 'Feature',
+        'properties': {'name': name, 'price': price},
+        'geometry': geometry,
+    }
+
+
+def features_from_wkb_rows(lines):
+    return [feature_from_wkb_row(line) for line in lines if line.strip()]
+
+
+def get_feature_data(feature):
+    return dict(feature.get('properties') or {}, geometry=feature.get(
+        'geometry'))
+
+
+def import_polygons(features, user, batch_size=BATCH_SIZE):
+    """Function to validate and insert the polygons of a user
+
+    :return: ImportReport with the created and rejected rows
+    """
+    started = time.time()
+    report = ImportReport()
+    polygons = []
+    for row, feature in enumerate(features, 1):
+        if not isinstance(feature, dict):
+            report.reject(row, {'non_field_errors': [INVALID_ROW]})
+            continue
+        serializer = ProviderPolygonSerializerToWrite(
+            data=get_feature_data(feature))
+        if not serializer.is_valid():
+            report.reject(row, serializer.errors)
+            continue
+        data = dict(serializer.validated_data)
+        geom = get_polygon_obj(data.pop('geometry'))
+        polygon = ProviderPolygon(user=user, geom=geom, **data)
+        polygon.update_geojson()
+        polygons.append(polygon)
+
+    with transaction.atomic():
+        ProviderPolygon.objects.bulk_create(polygons, batch_size=batch_size)
+    invalidate_bulk_created(user, polygons)
+    report.created = len(polygons)
+    report.seconds = time.time() - started
+    return report
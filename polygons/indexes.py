@@ -0,0 +1,12 @@
+from django.db.models import Index
+
+
+class GistIndex(Index):
+    """Index using the GiST access method, needed by the spatial lookups
+    (``&&``, ``ST_Contains``, ``<->``) on geometry columns.
+    """
+    suffix = 'gist'
+
+    def create_sql(self, model, schema_editor, using=''):
+        return super(GistIndex, self).create_sql(
+            model, schema_editor, using=' USING gist')
@@ -0,0 +1,162 @@
+"""Cache of the responses of the location lookups.
+
+The responses are cached by the cell of a grid of GRID_SIZE degrees which
+contains the point, so every request in the same cell shares the cached
+page. The lookups are made with the exact point, and the response is only
+cached if every point of the cell has the same polygons (no polygon edge
+crosses the cell). The responses are kept in the Django cache named by
+BACKEND, which must be shared by every process, or otherwise in a local LRU
+tier. A write of a polygon only invalidates the cells which intersect its
+bounding box: the shared cache bumps the version of the coarse tiles
+(COARSE_GRID_SIZE degrees) they belong to and the local tier drops them.
+The writes are only seen by the local tier of the process which made them,
+so its entries expire after LOCAL_TIMEOUT seconds; the local tier is not
+used with a shared cache, whose versions every process sees at once.
+"""
+import math
+
+from django.conf import settings
+
+from moziotest.cache import LRUCache, bump_cache_version
+from moziotest.cache import get_shared_cache as get_backend_cache
+
+DEFAULTS = {
+    'GRID_SIZE': 0.001,
+    'MAX_ENTRIES': 10000,
+    'LOCAL_TIMEOUT': 30,
+    'BACKEND': None,
+    'COARSE_GRID_SIZE': 1.0,
+    'MAX_INVALIDATED_TILES': 1000,
+    'TIMEOUT': 300,
+}
+KEY_PREFIX = 'polygons:location'
+GLOBAL_VERSION_KEY = KEY_PREFIX + ':version'
+
+_local_cache = None
+
+
+def get_setting(name):
+    config = getattr(settings, 'POLYGONS_LOCATION_CACHE', None) or {}
+    return config.get(name, DEFAULTS[name])
+
+
+def is_enabled():
+    return bool(getattr(settings, 'POLYGONS_LOCATION_CACHE', None))
+
+
+def get_local_cache():
+    global _local_cache
+    if _local_cache is None:
+        _local_cache = LRUCache(
+            get_setting('MAX_ENTRIES'), get_setting('LOCAL_TIMEOUT'))
+    return _local_cache
+
+
+def get_shared_cache():
+    backend = get_setting('BACKEND')
+    return get_backend_cache(backend) if backend else None
+
+
+def get_cell(lat, lng):
+    grid = get_setting('GRID_SIZE')
+    # Rounded before the floor, so e.g. 0.3 / 0.001 is not the cell 299.
+    return (
+        int(math.floor(round(lat / grid, 6))),
+        int(math.floor(round(lng / grid, 6)))
+    )
+
+
+def snap_cell(cell_x, cell_y):
+    grid = get_setting('GRID_SIZE')
+    return cell_x * grid, cell_y * grid
+
+
+def snap(lat, lng):
+    """Function to get the point of the cell which contains (lat, lng)"""
+    return snap_cell(*get_cell(lat, lng))
+
+
+def get_cell_bounds(lat, lng):
+    """Function to get the bounds of the cell which contains (lat, lng)
+
+    :return: tuple (min_x, min_y, max_x, max_y)
+    """
+    grid = get_setting('GRID_SIZE')
+    min_x, min_y = snap(lat, lng)
+    return min_x, min_y, min_x + grid, min_y + grid
+
+
+def get_tile(x, y):
+    coarse = get_setting('COARSE_GRID_SIZE')
+    return int(math.floor(x / coarse)), int(math.floor(y / coarse))
+
+
+def get_tile_version_key(tile):
+    return '{}:tile:{}:{}'.format(KEY_PREFIX, *tile)
+
+
+def get_shared_key(shared_cache, key):
+    cell_x, cell_y, page, detail = key
+    tile_key = get_tile_version_key(get_tile(*snap_cell(cell_x, cell_y)))
+    versions = shared_cache.get_many([GLOBAL_VERSION_KEY, tile_key])
+    return '{}:{}:{}:{}:{}:{}:{}'.format(
+        KEY_PREFIX, versions.get(GLOBAL_VERSION_KEY, 0),
+        versions.get(tile_key, 0), cell_x, cell_y, page, detail
+    )
+
+
+def get_key(lat, lng, page, detail):
+    cell_x, cell_y = get_cell(lat, lng)
+    return cell_x, cell_y, page or '', detail
+
+
+def get_response(key):
+    shared_cache = get_shared_cache()
+    if shared_cache is None:
+        return get_local_cache().get(key)
+    return shared_cache.get(get_shared_key(shared_cache, key))
+
+
+def set_response(key, data):
+    shared_cache = get_shared_cache()
+    if shared_cache is None:
+        get_local_cache().set(key, data)
+        return
+    shared_cache.set(
+        get_shared_key(shared_cache, key), data, get_setting('TIMEOUT'))
+
+
+def invalidate_extent(extent):
+    """Function to drop the cached responses of the cells which intersect
+    the bounding box (xmin, ymin, xmax, ymax) of a polygon
+    """
+    grid = get_setting('GRID_SIZE')
+    # Extended by a cell, so the cells are matched by their min corner.
+    min_x, min_y, max_x, max_y = extent
+    min_x, min_y = min_x - grid, min_y - grid
+
+    def in_extent(key):
+        x, y = snap_cell(key[0], key[1])
+        return min_x <= x <= max_x and min_y <= y <= max_y
+
+    get_local_cache().delete_matching(in_extent)
+    shared_cache = get_shared_cache()
+    if shared_cache is None:
+        return
+    (min_tile_x, min_tile_y), (max_tile_x, max_tile_y) = (
+        get_tile(min_x, min_y), get_tile(max_x, max_y))
+    tiles_count = (max_tile_x - min_tile_x + 1) * (max_tile_y - min_tile_y + 1)
+    if tiles_count > get_setting('MAX_INVALIDATED_TILES'):
+        bump_cache_version(shared_cache, GLOBAL_VERSION_KEY)
+        return
+    for tile_x in range(min_tile_x, max_tile_x + 1):
+        for tile_y in range(min_tile_y, max_tile_y + 1):
+            bump_cache_version(
+                shared_cache, get_tile_version_key((tile_x, tile_y)))
+
+
+def invalidate_all():
+    get_local_cache().clear()
+    shared_cache = get_shared_cache()
+    if shared_cache is not None:
+        bump_cache_version(shared_cache, GLOBAL_VERSION_KEY)
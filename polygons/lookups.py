@@ -0,0 +1,193 @@
+"""Set based and distance lookups of the polygons."""
+import math
+from collections import defaultdict
+
+from django.contrib.gis.geos import Point
+from django.db import connections, router
+from django.db.models.expressions import RawSQL
+
+from users.models import User
+
+from .models import ProviderPolygon
+from .spatial_index import is_enabled, provider_polygon_index
+
+# Lowest length in meters of a degree of latitude.
+METERS_PER_DEGREE = 110574.0
+
+# Candidates fetched by find_nearest for every polygon requested.
+NEAREST_CANDIDATES_FACTOR = 4
+
+# Formatted with the placeholders of the lats and lngs arrays of the driver.
+POINTS_IN_POLYGONS_QUERY = """
+    SELECT points.idx, polygon.id, polygon.price, provider.name
+    FROM unnest({lats}::float8[], {lngs}::float8[])
+        WITH ORDINALITY AS points(x, y, idx)
+    JOIN {polygon_table} AS polygon ON ST_Contains(
+        polygon.geom, ST_SetSRID(ST_MakePoint(points.x, points.y), 4326))
+    JOIN {user_table} AS provider ON provider.id = polygon.user_id
+    ORDER BY points.idx, polygon.id
+"""
+
+POINTS_IN_POLYGONS_SQL = POINTS_IN_POLYGONS_QUERY.format(
+    lats='%s',
+    lngs='%s',
+    polygon_table=ProviderPolygon._meta.db_table,
+    user_table=User._meta.db_table,
+)
+
+PRICES_AT_POINTS_SQL = """
+    SELECT points.idx, min(polygon.price), max(polygon.price),
+        count(DISTINCT polygon.user_id),
+        (array_agg(polygon.id ORDER BY polygon.price, polygon.id))[1],
+        (array_agg(provider.name ORDER BY polygon.price, polygon.id))[1]
+    FROM unnest(%s::float8[], %s::float8[])
+        WITH ORDINALITY AS points(x, y, idx)
+    JOIN {polygon_table} AS polygon ON ST_Contains(
+        polygon.geom, ST_SetSRID(ST_MakePoint(points.x, points.y), 4326))
+    JOIN {user_table} AS provider ON provider.id = polygon.user_id
+    GROUP BY points.idx
+""".format(
+    polygon_table=ProviderPolygon._meta.db_table,
+    user_table=User._meta.db_table,
+)
+
+
+def build_polygon_match(pk, price, provider_name):
+    return {'id': pk, 'price': str(price), 'provider_name': provider_name}
+
+
+def find_polygons_by_points(points):
+    """Function to get the polygons which contain every point, using the
+    in-process spatial index if enabled, otherwise a single query joining
+    the unnested points with the polygons table.
+
+    :param points: list of (lat, lng) pairs
+    :return: list with the matches of every point in the same order
+    """
+    if is_enabled():
+        results = []
+        for lat, lng in points:
+            polygons = provider_polygon_index.query_point(Point(lat, lng))
+            results.append([
+                build_polygon_match(obj.pk, obj.price, obj.user.name)
+                for obj in polygons
+            ])
+        return results
+    matches = defaultdict(list)
+    if points:
+        lats, lngs = zip(*points)
+        connection = connections[router.db_for_read(ProviderPolygon)]
+        with connection.cursor() as cursor:
+            cursor.execute(POINTS_IN_POLYGONS_SQL, [list(lats), list(lngs)])
+            for idx, pk, price, provider_name in cursor.fetchall():
+                matches[idx - 1].append(
+                    build_polygon_match(pk, price, provider_name))
+    return [matches[idx] for idx in range(len(points))]
+
+
+def build_price_stats(min_price=None, max_price=None, providers_count=0,
+                      cheapest=None):
+    return {
+        'min_price': None if min_price is None else str(min_price),
+        'max_price': None if max_price is None else str(max_price),
+        'providers_count': providers_count,
+        'cheapest': cheapest,
+    }
+
+
+def get_prices_by_points(points):
+    """Function to get the price statistics of the polygons which contain
+    every point, aggregated by the in-process spatial index if enabled,
+    otherwise by a single grouped query, without fetching any geometry.
+
+    :param points: list of (lat, lng) pairs
+    :return: list with the statistics of every point in the same order
+    """
+    if is_enabled():
+        results = []
+        for lat, lng in points:
+            polygons = provider_polygon_index.query_point(Point(lat, lng))
+            if not polygons:
+                results.append(build_price_stats())
+                continue
+            cheapest = min(polygons, key=lambda obj: (obj.price, obj.pk))
+            results.append(build_price_stats(
+                cheapest.price,
+                max(obj.price for obj in polygons),
+                len(set(obj.user_id for obj in polygons)),
+                build_polygon_match(
+                    cheapest.pk, cheapest.price, cheapest.user.name)
+            ))
+        return results
+    stats = {}
+    if points:
+        lats, lngs = zip(*points)
+        connection = connections[router.db_for_read(ProviderPolygon)]
+        with connection.cursor() as cursor:
+            cursor.execute(PRICES_AT_POINTS_SQL, [list(lats), list(lngs)])
+            for row in cursor.fetchall():
+                idx, min_price, max_price, providers_count, pk, name = row
+                stats[idx - 1] = build_price_stats(
+                    min_price, max_price, providers_count,
+                    build_polygon_match(pk, min_price, name)
+                )
+    return [
+        stats.get(idx) or build_price_stats() for idx in range(len(points))
+    ]
+
+
+def get_radius_degrees(point, radius):
+    """Function to get an upper bound in degrees of a distance in meters
+    around a point, to be used to filter by the spatial index. The points
+    are built as Point(lat, lng) so the latitude is the x coordinate
+    """
+    lat = min(abs(point.x) + radius / METERS_PER_DEGREE, 89.0)
+    return radius / (METERS_PER_DEGREE * math.cos(math.radians(lat)))
+
+
+def filter_by_distance(queryset, point, radius):
+    """Function to filter the polygons within radius meters of a point, the
+    geometry index filters by the bound in degrees and ST_DWithin on
+    geography checks the exact distance, flipping the coordinates given they
+    are stored as (lat, lng)
+
+    :return: filtered queryset
+    """
+    geom_column = '"{}"."geom"'.format(ProviderPolygon._meta.db_table)
+    return queryset.filter(
+        geom__dwithin=(point, get_radius_degrees(point, radius))
+    ).extra(
+        where=[
+            'ST_DWithin(ST_FlipCoordinates({})::geography, '
+            'ST_SetSRID(ST_MakePoint(%s, %s), 4326)::geography, '
+            '%s)'.format(geom_column)
+        ],
+        params=[point.y, point.x, radius]
+    )
+
+
+def find_nearest(queryset, point, k):
+    """Function to get the candidates to the k polygons nearest to a point,
+    the GiST index finds them ordering by the <-> operator in degrees, the
+    exact distance in meters on geography is annotated as distance. The
+    distance in degrees does not keep the order of the one in meters, so
+    NEAREST_CANDIDATES_FACTOR times k candidates are fetched, to be sorted
+    by distance and trimmed to k
+
+    :return: sliced queryset
+    """
+    geom_column = '"{}"."geom"'.format(ProviderPolygon._meta.db_table)
+    polygons = queryset.annotate(
+        knn_distance=RawSQL(
+            '{} <-> ST_SetSRID(ST_MakePoint(%s, %s), 4326)'.format(
+                geom_column),
+            [point.x, point.y]
+        ),
+        distance=RawSQL(
+            'ST_Distance(ST_FlipCoordinates({})::geography, '
+            'ST_SetSRID(ST_MakePoint(%s, %s), 4326)::geography)'.format(
+                geom_column),
+            [point.y, point.x]
+        )
+    ).order_by('knn_distance')
+    return polygons[:k * NEAREST_CANDIDATES_FACTOR]
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from polygons.export import FORMATS, iter_export
+
+
+class Command(BaseCommand):
+    help = 'Export all the polygons as a GeoJSON FeatureCollection or NDJSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--format', dest='output_format', choices=sorted(FORMATS),
+            default='geojson'
+        )
+        parser.add_argument(
+            '--output', help='File to write, the standard output by default'
+        )
+
+    def handle(self, *args, **options):
+        chunks = iter_export(options['output_format'])
+        if options['output'] is None:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
+            return
+        with open(options['output'], 'w') as output:
+            for chunk in chunks:
+                output.write(chunk)
@@ -0,0 +1,55 @@
+import io
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.exceptions import ValidationError
+
+from polygons.importer import (
+    BATCH_SIZE, features_from_geojson, features_from_ndjson,
+    features_from_wkb_rows, import_polygons
+)
+from users.models import User
+
+READERS = {
+    'geojson': lambda content: features_from_geojson(json.loads(content)),
+    'ndjson': lambda content: features_from_ndjson(content.splitlines()),
+    'wkb': lambda content: features_from_wkb_rows(content.splitlines()),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Import the polygons of a user from a GeoJSON FeatureCollection, '
+        'NDJSON features or "name<TAB>price<TAB>hex WKB" rows'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--user', type=int, required=True)
+        parser.add_argument(
+            '--format', dest='input_format', choices=sorted(READERS),
+            default='geojson'
+        )
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(pk=options['user'])
+        except User.DoesNotExist:
+            raise CommandError('User {} does not exist.'.format(
+                options['user']))
+        with io.open(options['path'], encoding='utf-8') as source:
+            content = source.read()
+        try:
+            features = READERS[options['input_format']](content)
+        except ValueError as exc:
+            raise CommandError('Parse error - {}'.format(exc))
+        except ValidationError as exc:
+            raise CommandError(' '.join(exc.detail['non_field_errors']))
+        report = import_polygons(features, user, options['batch_size'])
+        for error in report.errors:
+            self.stderr.write('Row {row} rejected: {errors}'.format(**error))
+        self.stdout.write(
+            'Created {created}, rejected {rejected} in {seconds}s '
+            '({rows_per_second} rows/s)'.format(**report.as_dict())
+        )
@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import django.contrib.gis.db.models.fields
+from django.db import migrations, models
+import polygons.indexes
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polygons', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='providerpolygon',
+            name='geom',
+            field=django.contrib.gis.db.models.fields.PolygonField(spatial_index=False, srid=4326),
+        ),
+        migrations.AddIndex(
+            model_name='providerpolygon',
+            index=polygons.indexes.GistIndex(fields=['geom'], name='polygons_geom_gist_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='providerpolygon',
+            index=models.Index(fields=['user', '-id'], name='polygons_user_id_desc_idx'),
+        ),
+    ]
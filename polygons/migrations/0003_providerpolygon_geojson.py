@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+from polygons.utils import build_geojson
+
+
+def backfill_geojson(apps, schema_editor):
+    """Function to encode the GeoJSON of the existing rows as
+    ProviderPolygon.update_geojson does for the new ones
+    """
+    ProviderPolygon = apps.get_model('polygons', 'ProviderPolygon')
+    polygons = ProviderPolygon.objects.using(schema_editor.connection.alias)
+    for polygon in polygons.only('geom').iterator():
+        polygons.filter(pk=polygon.pk).update(
+            geojson=build_geojson(polygon.geom))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polygons', '0002_provider_polygon_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='providerpolygon',
+            name='geojson',
+            field=models.TextField(default='', editable=False),
+        ),
+        migrations.RunPython(backfill_geojson, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+from polygons.utils import build_geojson
+
+# Tolerances of the medium and low levels of polygons.models.DETAIL_LEVELS.
+MEDIUM_TOLERANCE = 0.5
+LOW_TOLERANCE = 2.0
+
+
+def backfill_detail_levels(apps, schema_editor):
+    ProviderPolygon = apps.get_model('polygons', 'ProviderPolygon')
+    polygons = ProviderPolygon.objects.using(schema_editor.connection.alias)
+    for polygon in polygons.only('geom').iterator():
+        polygons.filter(pk=polygon.pk).update(
+            geojson_medium=build_geojson(polygon.geom, MEDIUM_TOLERANCE),
+            geojson_low=build_geojson(polygon.geom, LOW_TOLERANCE),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polygons', '0003_providerpolygon_geojson'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='providerpolygon',
+            name='geojson_low',
+            field=models.TextField(default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='providerpolygon',
+            name='geojson_medium',
+            field=models.TextField(default='', editable=False),
+        ),
+        migrations.RunPython(
+            backfill_detail_levels, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """The AlterField(spatial_index=False) of 0002 does not drop the GiST
+    index PostGIS created with the table in 0001, so geom had two of them
+    once polygons_geom_gist_idx was added.
+    """
+
+    dependencies = [
+        ('polygons', '0004_providerpolygon_detail_levels'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            'DROP INDEX IF EXISTS polygons_providerpolygon_geom_id',
+            reverse_sql=(
+                'CREATE INDEX IF NOT EXISTS polygons_providerpolygon_geom_id '
+                'ON polygons_providerpolygon USING GIST (geom)'
+            ),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations
+
+from polygons.utils import build_geojson
+
+
+def backfill_geojson(apps, schema_editor):
+    """Function to encode the GeoJSON of the existing rows as
+    ProviderPolygon.update_geojson does for the new ones
+    """
+    ProviderPolygon = apps.get_model('polygons', 'ProviderPolygon')
+    polygons = ProviderPolygon.objects.using(schema_editor.connection.alias)
+    for polygon in polygons.only('geom').iterator():
+        polygons.filter(pk=polygon.pk).update(
+            geojson=build_geojson(polygon.geom))
+
+
+class Migration(migrations.Migration):
+    """The rows backfilled by ST_AsGeoJSON in an earlier version of 0003
+    format the numbers unlike json.dumps (e.g. 10 and 10.0), so the same
+    geometry gave different responses and ETags.
+    """
+
+    dependencies = [
+        ('polygons', '0005_drop_implicit_geom_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_geojson, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.db import migrations
+
+from polygons.utils import build_geojson
+
+# Tolerances of the medium and low levels of polygons.models.DETAIL_LEVELS.
+MEDIUM_TOLERANCE = 0.5
+LOW_TOLERANCE = 2.0
+
+
+def recompute_detail_levels(apps, schema_editor):
+    ProviderPolygon = apps.get_model('polygons', 'ProviderPolygon')
+    polygons = ProviderPolygon.objects.using(schema_editor.connection.alias)
+    for polygon in polygons.only('geom').iterator():
+        polygons.filter(pk=polygon.pk).update(
+            geojson_medium=build_geojson(polygon.geom, MEDIUM_TOLERANCE),
+            geojson_low=build_geojson(polygon.geom, LOW_TOLERANCE),
+        )
+
+
+class Migration(migrations.Migration):
+    """The medium and low levels were simplified by 0.0001 and 0.001
+    degrees, which do not drop any vertex of the polygons of whole degrees.
+    """
+
+    dependencies = [
+        ('polygons', '0006_backfill_geojson'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            recompute_detail_levels, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,54 @@
+from rest_framework.exceptions import ValidationError
+
+from .models import DETAIL_LEVELS, DETAIL_FIELDS
+
+FULL_DETAIL = DETAIL_LEVELS[0][0]
+
+
+class DetailLevelMixin(object):
+    """Mixin for the views which serve polygons to choose the level of
+    detail of the geometries by the detail (name of a level) or tolerance
+    (in degrees) query params, full detail by default.
+    """
+    def get_detail_level(self):
+        """Method to get the level of detail requested, the coarsest level
+        whose tolerance does not exceed the requested tolerance
+
+        :return: name of a level of DETAIL_LEVELS
+        :except: ValidationError if the query params are not valid
+        """
+        query_params = self.request.query_params
+        detail = query_params.get('detail', None)
+        tolerance = query_params.get('tolerance', None)
+        if detail is not None:
+            if detail not in DETAIL_FIELDS:
+                raise ValidationError({'detail': [
+                    'Should be one of: {}.'.format(
+                        ', '.join(name for name, _, _ in DETAIL_LEVELS))
+                ]})
+            return detail
+        if tolerance is not None:
+            try:
+                tolerance = float(tolerance)
+            except ValueError:
+                raise ValidationError({'tolerance': [
+                    'A valid number is required.'
+                ]})
+            levels = [
+                name for name, level_tolerance, _ in DETAIL_LEVELS
+                if level_tolerance <= tolerance
+            ]
+            return levels[-1] if levels else FULL_DETAIL
+        return FULL_DETAIL
+
+    def defer_other_levels(self, queryset):
+        """Method to avoid fetching the GeoJSON of the levels not served"""
+        detail = self.get_detail_level()
+        return queryset.defer(*[
+            field for name, field in DETAIL_FIELDS.items() if name != detail
+        ])
+
+    def get_serializer_context(self):
+        context = super(DetailLevelMixin, self).get_serializer_context()
+        context['detail'] = self.get_detail_level()
+        return context
@@ -1,13 +1,133 @@
 from django.contrib.gis.db import models
+from django.db.models.signals import pre_save, post_save, post_delete
 
 from users.models import User
 
+from .indexes import GistIndex
+from .utils import build_geojson
+from .signals import (
+    index_provider_polygon, unindex_provider_polygon, refresh_indexed_provider,
+    record_previous_extent, invalidate_location_cache,
+    invalidate_location_cache_provider, invalidate_tile_cache,
+    invalidate_tile_cache_provider, invalidate_provider_cache
+)
+
+# Levels of detail of the geometries served by the read endpoints, as
+# (name, simplification tolerance in degrees, GeoJSON field). The written
+# coordinates are whole degrees, so lower tolerances would not drop any
+# vertex.
+DETAIL_LEVELS = (
+    ('full', 0, 'geojson'),
+    ('medium', 0.5, 'geojson_medium'),
+    ('low', 2.0, 'geojson_low'),
+)
+DETAIL_FIELDS = {name: field for name, _, field in DETAIL_LEVELS}
+
 
 class ProviderPolygon(models.Model):
     name = models.CharField(max_length=100)
     price = models.DecimalField(max_digits=10, decimal_places=2)
     user = models.ForeignKey(User, related_name='polygons')
-    geom = models.PolygonField(srid=4326)
+    geom = models.PolygonField(srid=4326, spatial_index=False)
+    # GeoJSON of geom, and of geom simplified for every DETAIL_LEVELS, kept
+    # in sync on save to be served without building GEOS objects on every
+    # read (see ProviderPolygonSerializer).
+    geojson = models.TextField(editable=False, default='')
+    geojson_medium = models.TextField(editable=False, default='')
+    geojson_low = models.TextField(editable=False, default='')
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Spatial index used by the location lookups.
+            GistIndex(fields=['geom'], name='polygons_geom_gist_idx'),
+            # Polygons of a user from newer to older (ProviderPolygonView).
+            models.Index(
+                fields=['user', '-id'], name='polygons_user_id_desc_idx'),
+        ]
+
+    def update_geojson(self):
+        for _, tolerance, field in DETAIL_LEVELS:
+            setattr(self, field, build_geojson(self.geom, tolerance))
+
+    def save(self, *args, **kwargs):
+        self.update_geojson()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'geom' in update_fields:
+            kwargs['update_fields'] = set(update_fields) | set(
+                DETAIL_FIELDS.values())
+        super(ProviderPolygon, self).save(*args, **kwargs)
+
+
+# Funcs to keep the in-process spatial index in sync.
+post_save.connect(
+    index_provider_polygon,
+    sender=ProviderPolygon,
+    dispatch_uid="polygons.models.provider_polygon_post_save"
+)
+post_delete.connect(
+    unindex_provider_polygon,
+    sender=ProviderPolygon,
+    dispatch_uid="polygons.models.provider_polygon_post_delete"
+)
+post_save.connect(
+    refresh_indexed_provider,
+    sender=User,
+    dispatch_uid="polygons.models.user_post_save"
+)
+
+
+# Funcs to invalidate the cached location lookups.
+pre_save.connect(
+    record_previous_extent,
+    sender=ProviderPolygon,
+    dispatch_uid="polygons.models.provider_polygon_pre_save_location_cache"
+)
+post_save.connect(
+    invalidate_location_cache,
+    sender=ProviderPolygon,
+    dispatch_uid="polygons.models.provider_polygon_post_save_location_cache"
+)
+post_delete.connect(
+    invalidate_location_cache,
+    sender=ProviderPolygon,
+    dispatch_uid="polygons.models.provider_polygon_post_delete_location_cache"
+)
+post_save.connect(
+    invalidate_location_cache_provider,
+    sender=User,
+    dispatch_uid="polygons.models.user_post_save_location_cache"
+)
+
+
+# Funcs to invalidate the cached vector tiles.
+post_save.connect(
+    invalidate_tile_cache,
+    sender=ProviderPolygon,
+    dispatch_uid="polygons.models.provider_polygon_post_save_tile_cache"
+)
+post_delete.connect(
+    invalidate_tile_cache,
+    sender=ProviderPolygon,
+    dispatch_uid="polygons.models.provider_polygon_post_delete_tile_cache"
+)
+post_save.connect(
+    invalidate_tile_cache_provider,
+    sender=User,
+    dispatch_uid="polygons.models.user_post_save_tile_cache"
+)
+
+
+# Funcs to invalidate the cached pages of the polygons of the provider.
+post_save.connect(
+    invalidate_provider_cache,
+    sender=ProviderPolygon,
+    dispatch_uid="polygons.models.provider_polygon_post_save_provider_cache"
+)
+post_delete.connect(
+    invalidate_provider_cache,
+    sender=ProviderPolygon,
+    dispatch_uid="polygons.models.provider_polygon_post_delete_provider_cache"
+)
@@ -0,0 +1,71 @@
+from django.conf import settings
+from django.contrib.gis.geos import GEOSGeometry, GEOSException, Polygon
+from django.utils import six
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser, JSONParser
+
+from .importer import features_from_ndjson, features_from_wkb_rows
+from .twkb import read_twkb_polygon
+
+
+class GeoJSONParser(JSONParser):
+    media_type = 'application/geo+json'
+
+
+class LinesParser(BaseParser):
+    """Parser of a body with a feature per line, the subclasses define
+    parse_lines(lines) to get the features of the lines
+    """
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        try:
+            lines = stream.read().decode(encoding).splitlines()
+            return self.parse_lines(lines)
+        except ValueError as exc:
+            raise ParseError('Parse error - %s' % six.text_type(exc))
+
+
+class NDJSONParser(LinesParser):
+    media_type = 'application/x-ndjson'
+
+    def parse_lines(self, lines):
+        return features_from_ndjson(lines)
+
+
+class WKBRowsParser(LinesParser):
+    """Parser of "name<TAB>price<TAB>hex WKB" rows"""
+    media_type = 'text/tab-separated-values'
+
+    def parse_lines(self, lines):
+        return features_from_wkb_rows(lines)
+
+
+class GeometryParser(BaseParser):
+    """Parser of a binary geometry body, the other fields of the polygon
+    (name, price) are received by query params. The subclasses define
+    read_geometry(data) to get the GEOS geometry of the body.
+    """
+    def parse(self, stream, media_type=None, parser_context=None):
+        request = (parser_context or {}).get('request')
+        data = request.query_params.dict() if request is not None else {}
+        try:
+            data['geometry'] = self.read_geometry(stream.read())
+        except (GEOSException, ValueError) as exc:
+            raise ParseError('Parse error - %s' % six.text_type(exc))
+        return data
+
+
+class WKBParser(GeometryParser):
+    media_type = 'application/wkb'
+
+    def read_geometry(self, data):
+        return GEOSGeometry(six.memoryview(data), srid=4326)
+
+
+class TWKBParser(GeometryParser):
+    media_type = 'application/twkb'
+
+    def read_geometry(self, data):
+        return Polygon(*read_twkb_polygon(data), srid=4326)
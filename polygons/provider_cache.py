@@ -0,0 +1,76 @@
+"""Cache of the rendered pages of the polygons of every provider.
+
+The pages are kept as rendered JSON in the Django cache named by the BACKEND
+option of POLYGONS_PROVIDER_CACHE, which must be shared by every process (the
+cache is disabled without it), keyed by the provider, the version of its
+set of polygons and the URL of the page. Every write or delete of a polygon
+bumps the version of its provider, so the stale pages are not read again and
+expire after TIMEOUT seconds.
+"""
+import hashlib
+
+from django.conf import settings
+from moziotest.cache import (
+    bump_cache_version, get_cache_version, get_shared_cache
+)
+from moziotest.renderers import FastJSONRenderer
+
+DEFAULTS = {
+    'BACKEND': None,
+    'TIMEOUT': 300,
+}
+KEY_PREFIX = 'polygons:provider'
+
+
+def get_setting(name):
+    config = getattr(settings, 'POLYGONS_PROVIDER_CACHE', None) or {}
+    return config.get(name, DEFAULTS[name])
+
+
+def is_enabled():
+    return bool(get_setting('BACKEND'))
+
+
+def get_cache():
+    return get_shared_cache(get_setting('BACKEND'))
+
+
+def get_version_key(user_id):
+    return '{}:{}:version'.format(KEY_PREFIX, user_id)
+
+
+def get_version(user_id):
+    """Function to get the version of the polygons of a provider
+
+    :return: int
+    """
+    return get_cache_version(get_cache(), get_version_key(user_id))
+
+
+def bump_version(user_id):
+    bump_cache_version(get_cache(), get_version_key(user_id))
+
+
+def get_key(user_id, url):
+    return '{}:{}:{}:{}'.format(
+        KEY_PREFIX, user_id, get_version(user_id),
+        hashlib.md5(url.encode('utf-8')).hexdigest()
+    )
+
+
+def get_page(key):
+    """Function to get a rendered page
+
+    :return: JSON string or None on a miss
+    """
+    return get_cache().get(key)
+
+
+def set_page(key, data):
+    """Function to render the data of a page and cache it
+
+    :return: JSON string
+    """
+    page = FastJSONRenderer().render(data).decode('utf-8')
+    get_cache().set(key, page, get_setting('TIMEOUT'))
+    return page
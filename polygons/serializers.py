@@ -1,51 +1,127 @@
+import math
+
+from django.conf import settings
+from django.contrib.gis.geos import GEOSGeometry
 from rest_framework import serializers
 
-from .models import ProviderPolygon
+from moziotest.renderers import RawJSON
+
+from .models import ProviderPolygon, DETAIL_LEVELS
 from .utils import (
-    get_polygon_obj, build_geometry_json_response, lists_matches
+    get_polygon_obj, build_geometry_json_response, parse_ring, rings_matches,
+    coordinates_in_range
 )
 
+NOT_POLYGON_MESSAGE = 'The value of this field should be "Polygon".'
+NOT_NUMBER_MESSAGE = 'A valid number is required.'
+OUT_OF_RANGE_MESSAGE = (
+    'Every coordinate should be a latitude between -90 and 90 and a '
+    'longitude between -180 and 180.'
+)
+
+
+def to_finite_float(value):
+    """Function to get a coordinate as a finite float, with the rule of the
+    number params of ProviderPolygonByLocationView
+
+    :return: float
+    :except: ValidationError if it is a boolean or not a finite number
+    """
+    if isinstance(value, bool):
+        raise serializers.ValidationError(NOT_NUMBER_MESSAGE)
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        number = float('nan')
+    if math.isnan(number) or math.isinf(number):
+        raise serializers.ValidationError(NOT_NUMBER_MESSAGE)
+    return number
+
+
+class CoordinatesField(serializers.ListField):
+    """List of rings of [x, y] integer coordinates, every ring is parsed at
+    once into a NumPy array when it is well formed, otherwise the nested
+    ListField children validate item by item to report the errors.
+    """
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('child', serializers.ListField(
+            child=serializers.ListField(child=serializers.IntegerField())
+        ))
+        super(CoordinatesField, self).__init__(*args, **kwargs)
+
+    def to_internal_value(self, data):
+        if isinstance(data, list) and all(
+                isinstance(ring, list) for ring in data):
+            rings = [parse_ring(ring) for ring in data]
+            if all(ring is not None for ring in rings):
+                return rings
+        rings = []
+        for ring in super(CoordinatesField, self).to_internal_value(data):
+            array = parse_ring(ring)
+            rings.append(ring if array is None else array)
+        return rings
+
 
 class GeometrySerializer(serializers.Serializer):
     type = serializers.CharField()
-    coordinates = serializers.ListField(
-        child=serializers.ListField(
-            child=serializers.ListField(
-                child=serializers.IntegerField()
-            )
-        )
-    )
+    coordinates = CoordinatesField()
+
+    def to_internal_value(self, data):
+        # Geometries parsed from WKB/TWKB bodies follow the same rules.
+        if isinstance(data, GEOSGeometry):
+            if data.geom_type != 'Polygon':
+                raise serializers.ValidationError(
+                    {'type': [NOT_POLYGON_MESSAGE]})
+            data = {
+                'type': data.geom_type,
+                'coordinates': [ring.array.tolist() for ring in data],
+            }
+        return super(GeometrySerializer, self).to_internal_value(data)
 
     @staticmethod
     def validate_type(value):
         if value == 'Polygon':
             return value
-        raise serializers.ValidationError(
-            'The value of this field should be "Polygon".'
-        )
+        raise serializers.ValidationError(NOT_POLYGON_MESSAGE)
 
     @staticmethod
     def validate_coordinates(value):
-        if len(value) is not 1:
+        if len(value) != 1:
             raise serializers.ValidationError(
                 'This field should follows GeoJSON object structure.'
             )
-        coords_list = value[0]
-        if len(coords_list) < 4:
+        ring = value[0]
+        if len(ring) < 4:
             raise serializers.ValidationError(
                 'A Polygon should has at least 4 vertex points.'
             )
-        for coord in coords_list:
-            if len(coord) is not 2:
-                raise serializers.ValidationError(
-                    'Every coordinate should has 2 values.'
-                )
-        if not lists_matches(coords_list[0], coords_list[-1]):
+        if getattr(ring, 'shape', (0, 0))[1:] != (2,):
+            # Pairs of integers not parsed in an array are too large.
+            if all(len(point) == 2 for point in ring):
+                raise serializers.ValidationError(OUT_OF_RANGE_MESSAGE)
+            raise serializers.ValidationError(
+                'Every coordinate should has 2 values.'
+            )
+        if not coordinates_in_range(ring):
+            raise serializers.ValidationError(OUT_OF_RANGE_MESSAGE)
+        if not rings_matches(ring):
             raise serializers.ValidationError(
                 'First and last value coordinates should match.'
             )
         return value
 
+    @staticmethod
+    def validate(attrs):
+        polygon_obj = get_polygon_obj(attrs)
+        if not polygon_obj.valid:
+            reason = polygon_obj.valid_reason
+            if reason.startswith('Self-intersection'):
+                message = 'The Polygon should not be self-intersecting.'
+            else:
+                message = 'The Polygon is not valid: {}.'.format(reason)
+            raise serializers.ValidationError({'coordinates': [message]})
+        return dict(attrs, polygon=polygon_obj)
+
 
 class ProviderPolygonSerializerToWrite(serializers.ModelSerializer):
     geometry = GeometrySerializer(write_only=True)
@@ -79,6 +155,9 @@ class ProviderPolygonSerializerToWrite(serializers.ModelSerializer):
 
 class ProviderPolygonSerializer(serializers.ModelSerializer):
     geometry = serializers.SerializerMethodField(read_only=True)
+    # Serve the precomputed GeoJSON columns as raw fragments of the response,
+    # set to False to build the geometry from the GEOS object instead.
+    precomputed_geometry = True
 
     class Meta:
         model = ProviderPolygon
@@ -86,9 +165,19 @@ class ProviderPolygonSerializer(serializers.ModelSerializer):
             'id', 'name', 'price', 'geometry', 'created_at', 'updated_at'
         )
 
-    @staticmethod
-    def get_geometry(instance):
-        return build_geometry_json_response(instance.geom.coords)
+    def get_geometry(self, instance):
+        """Method to get the geometry at the level of detail of the context
+        (see DetailLevelMixin), full detail by default
+        """
+        detail = self.context.get('detail', DETAIL_LEVELS[0][0])
+        _, tolerance, field = next(
+            level for level in DETAIL_LEVELS if level[0] == detail)
+        if self.precomputed_geometry and getattr(instance, field):
+            return RawJSON(getattr(instance, field))
+        geom = instance.geom
+        if tolerance:
+            geom = geom.simplify(tolerance, preserve_topology=True)
+        return build_geometry_json_response(geom.coords)
 
 
 class ProviderPolygonWithNameSerializer(ProviderPolygonSerializer):
@@ -100,3 +189,37 @@ class ProviderPolygonWithNameSerializer(ProviderPolygonSerializer):
     @staticmethod
     def get_provider_name(value):
         return value.user.name
+
+
+class ProviderPolygonWithDistanceSerializer(
+        ProviderPolygonWithNameSerializer):
+    distance = serializers.FloatField(read_only=True)
+
+    class Meta(ProviderPolygonWithNameSerializer.Meta):
+        fields = ProviderPolygonWithNameSerializer.Meta.fields + ('distance',)
+
+
+class LocationSerializer(serializers.Serializer):
+    lat = serializers.FloatField()
+    lng = serializers.FloatField()
+
+
+class LocationBatchSerializer(serializers.Serializer):
+    points = serializers.ListField()
+
+    @staticmethod
+    def validate_points(value):
+        max_points = settings.POLYGONS_MAX_BATCH_POINTS
+        if len(value) > max_points:
+            raise serializers.ValidationError(
+                'Ensure this field has no more than {} points.'.format(
+                    max_points)
+            )
+        points = []
+        for point in value:
+            if not isinstance(point, (list, tuple)) or len(point) != 2:
+                raise serializers.ValidationError(
+                    'Every point should be a [lat, lng] pair.'
+                )
+            points.append(tuple(to_finite_float(value) for value in point))
+        return points
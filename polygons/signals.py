@@ -0,0 +1,76 @@
+from . import location_cache, provider_cache, tiles
+from .spatial_index import (
+    envelopes_union, is_enabled, provider_polygon_index
+)
+
+
+def index_provider_polygon(sender, instance=None, **kwargs):
+    if is_enabled():
+        # Fetch the provider now so the lookups do not hit the database.
+        instance.user
+        provider_polygon_index.add(instance)
+
+
+def unindex_provider_polygon(sender, instance=None, **kwargs):
+    if is_enabled():
+        provider_polygon_index.remove(instance.pk)
+
+
+def refresh_indexed_provider(sender, instance=None, **kwargs):
+    if is_enabled():
+        provider_polygon_index.update_provider(instance)
+
+
+def record_previous_extent(sender, instance=None, **kwargs):
+    caches_enabled = location_cache.is_enabled() or tiles.is_cache_enabled()
+    if caches_enabled and instance.pk:
+        previous = sender.objects.filter(pk=instance.pk).only('geom').first()
+        instance._previous_extent = previous and previous.geom.extent
+
+
+def invalidate_location_cache(sender, instance=None, **kwargs):
+    if location_cache.is_enabled():
+        location_cache.invalidate_extent(instance.geom.extent)
+        previous_extent = getattr(instance, '_previous_extent', None)
+        if previous_extent:
+            location_cache.invalidate_extent(previous_extent)
+
+
+def invalidate_location_cache_provider(sender, instance=None, **kwargs):
+    if location_cache.is_enabled():
+        location_cache.invalidate_all()
+
+
+def invalidate_tile_cache(sender, instance=None, **kwargs):
+    if tiles.is_cache_enabled():
+        tiles.invalidate_extent(instance.geom.extent)
+        previous_extent = getattr(instance, '_previous_extent', None)
+        if previous_extent:
+            tiles.invalidate_extent(previous_extent)
+
+
+def invalidate_tile_cache_provider(sender, instance=None, **kwargs):
+    if tiles.is_cache_enabled():
+        tiles.invalidate_all()
+
+
+def invalidate_provider_cache(sender, instance=None, **kwargs):
+    if provider_cache.is_enabled():
+        provider_cache.bump_version(instance.user_id)
+
+
+def invalidate_bulk_created(user, polygons):
+    """Function to invalidate the index and caches once for the polygons of
+    a user inserted by bulk_create, which does not send post_save
+    """
+    if not polygons:
+        return
+    if is_enabled():
+        provider_polygon_index.mark_stale()
+    extent = envelopes_union(polygon.geom.extent for polygon in polygons)
+    if location_cache.is_enabled():
+        location_cache.invalidate_extent(extent)
+    if tiles.is_cache_enabled():
+        tiles.invalidate_extent(extent)
+    if provider_cache.is_enabled():
+        provider_cache.bump_version(user.pk)
@@ -0,0 +1,251 @@
+"""In-process spatial index of the ProviderPolygon geometries.
+
+Point lookups are answered by a Sort-Tile-Recursive (STR) packed R-tree
+built over the bounding boxes of the polygons, the candidates found in the
+tree are confirmed with an exact containment check against the prepared
+geometry of every polygon. The index is enabled with the
+POLYGONS_SPATIAL_INDEX setting and kept in sync by the signals connected in
+polygons/models.py.
+
+The signals are only received by the process which made the write, so every
+POLYGONS_SPATIAL_INDEX_CHECK_INTERVAL seconds the index compares the version
+of the data in the database (count and last update of the polygons, last
+update of the providers) with the loaded one and is loaded again if they
+differ, bounding how long the writes of other processes are not seen.
+"""
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Count, Max
+
+NODE_CAPACITY = 10
+MAX_PENDING = 64
+
+
+def is_enabled():
+    return getattr(settings, 'POLYGONS_SPATIAL_INDEX', False)
+
+
+def get_check_interval():
+    return getattr(settings, 'POLYGONS_SPATIAL_INDEX_CHECK_INTERVAL', 5)
+
+
+def get_database_version():
+    """Function to get the version of the indexed data in the database, it
+    changes on every insert, update or delete of a polygon and on every
+    update of a provider
+
+    :return: tuple
+    """
+    from users.models import User
+    from .models import ProviderPolygon
+    polygons = ProviderPolygon.objects.order_by().aggregate(
+        count=Count('pk'), updated_at=Max('updated_at'))
+    users = User.objects.order_by().aggregate(updated_at=Max('updated_at'))
+    return polygons['count'], polygons['updated_at'], users['updated_at']
+
+
+def envelope_contains(envelope, x, y):
+    return envelope[0] <= x <= envelope[2] and envelope[1] <= y <= envelope[3]
+
+
+def envelopes_union(envelopes):
+    min_x, min_y, max_x, max_y = zip(*envelopes)
+    return min(min_x), min(min_y), max(max_x), max(max_y)
+
+
+class STRTree(object):
+    """Static R-tree packed with the Sort-Tile-Recursive algorithm.
+
+    Every node is a tuple ``(envelope, entries, is_leaf)`` where entries is a
+    tuple of ``(envelope, child)``, children of the leaves are the values
+    given to build the tree.
+    """
+    def __init__(self, items, node_capacity=NODE_CAPACITY):
+        self.node_capacity = node_capacity
+        self.size = len(items)
+        self.root = None
+        level, is_leaf = list(items), True
+        while level:
+            nodes = self._pack(level, is_leaf)
+            if len(nodes) == 1:
+                self.root = nodes[0]
+                break
+            level, is_leaf = [(node[0], node) for node in nodes], False
+
+    def _pack(self, entries, is_leaf):
+        """Method to group the entries of a level in nodes, sorting them
+        in vertical slices by the x center and then by the y center
+
+        :return: list of nodes of the upper level
+        """
+        capacity = self.node_capacity
+        nodes_count = int(math.ceil(len(entries) / float(capacity)))
+        slice_size = int(math.ceil(math.sqrt(nodes_count))) * capacity
+        entries = sorted(entries, key=lambda entry: entry[0][0] + entry[0][2])
+        nodes = []
+        for i in range(0, len(entries), slice_size):
+            vertical_slice = sorted(
+                entries[i:i + slice_size],
+                key=lambda entry: entry[0][1] + entry[0][3]
+            )
+            for j in range(0, len(vertical_slice), capacity):
+                group = tuple(vertical_slice[j:j + capacity])
+                envelope = envelopes_union([entry[0] for entry in group])
+                nodes.append((envelope, group, is_leaf))
+        return nodes
+
+    def query_point(self, x, y):
+        """Method to get the values whose envelope contains the point (x, y)
+
+        :return: list of values
+        """
+        if self.root is None:
+            return []
+        found = []
+        stack = [self.root]
+        while stack:
+            _, entries, is_leaf = stack.pop()
+            for envelope, child in entries:
+                if envelope_contains(envelope, x, y):
+                    if is_leaf:
+                        found.append(child)
+                    else:
+                        stack.append(child)
+        return found
+
+
+class ProviderPolygonIndex(object):
+    """Index of the ProviderPolygon instances, with the user (provider)
+    already fetched, by the bounding box of their geometries.
+
+    The STR tree is static, so polygons saved after the last build are kept
+    in a pending map checked linearly until there are more than MAX_PENDING
+    of them and the tree is packed again.
+    """
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._entries = {}
+        self._pending = {}
+        self._tree = STRTree([])
+        self.loaded = False
+        self.version = None
+        self.checked_at = 0
+
+    @staticmethod
+    def _entry(instance):
+        return instance.geom.prepared, instance
+
+    def _rebuild(self):
+        self._tree = STRTree([
+            (instance.geom.extent, pk)
+            for pk, (_, instance) in self._entries.items()
+        ])
+        self._pending = {}
+
+    def load(self, queryset=None):
+        """Method to (re)build the index from the database"""
+        if queryset is None:
+            from .models import ProviderPolygon
+            queryset = ProviderPolygon.objects.all().select_related('user')
+        # Read before the rows, so a write made while loading is seen as a
+        # new version by the next check.
+        version = get_database_version()
+        entries = {
+            instance.pk: self._entry(instance)
+            for instance in queryset.iterator()
+        }
+        with self._lock:
+            self._entries = entries
+            self._rebuild()
+            self.loaded = True
+            self.version = version
+            self.checked_at = time.time()
+
+    def refresh(self):
+        """Method to load the index if it is not loaded yet, or if the data
+        in the database changed since it was loaded and the last check is
+        older than POLYGONS_SPATIAL_INDEX_CHECK_INTERVAL seconds
+        """
+        if not self.loaded:
+            self.load()
+            return
+        if time.time() - self.checked_at < get_check_interval():
+            return
+        self.checked_at = time.time()
+        if get_database_version() != self.version:
+            self.load()
+
+    def mark_stale(self):
+        """Method to check the index against the database on the next
+        lookup, e.g. after a bulk insert which does not add the polygons
+        """
+        self.checked_at = 0
+
+    def clear(self):
+        with self._lock:
+            self._entries = {}
+            self._pending = {}
+            self._tree = STRTree([])
+            self.loaded = False
+            self.version = None
+
+    def add(self, instance):
+        """Method to add or replace a polygon, it is a no-op until the index
+        is loaded given the load will read it from the database.
+        """
+        if not self.loaded:
+            return
+        with self._lock:
+            self._entries[instance.pk] = self._entry(instance)
+            self._pending[instance.pk] = instance.geom.extent
+            if len(self._pending) > MAX_PENDING:
+                self._rebuild()
+
+    def remove(self, pk):
+        with self._lock:
+            self._entries.pop(pk, None)
+            self._pending.pop(pk, None)
+
+    def update_provider(self, user):
+        """Method to replace the cached user of the polygons it owns"""
+        with self._lock:
+            for _, instance in self._entries.values():
+                if instance.user_id == user.pk:
+                    instance.user = user
+
+    def query_point(self, point):
+        """Method to get the polygons which contain the point, ordered by id
+        as the database lookup does.
+
+        :return: list of ProviderPolygon instances
+        """
+        self.refresh()
+        x, y = point.x, point.y
+        with self._lock:
+            candidates = set(self._tree.query_point(x, y))
+            candidates.update(
+                pk for pk, envelope in self._pending.items()
+                if envelope_contains(envelope, x, y)
+            )
+            entries = [self._entries.get(pk) for pk in candidates]
+        polygons = [
+            entry[1] for entry in entries
+            if entry is not None and entry[0].contains(point)
+        ]
+        return sorted(polygons, key=lambda instance: instance.pk)
+
+
+provider_polygon_index = ProviderPolygonIndex()
+
+
+def warm_up():
+    """Function to load the index at worker startup when it is enabled,
+    closing the connections used so they are not shared with forked workers.
+    """
+    if is_enabled():
+        provider_polygon_index.load()
+        connections.close_all()
@@ -0,0 +1,197 @@
+"""Testing async views"""
+
+import asyncio
+import datetime
+import json
+from decimal import Decimal
+
+import pytest
+from mixer.backend.django import mixer
+
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from moziotest.pagination import IdCursorPagination
+
+from .. import async_views, views
+from ..models import ProviderPolygon
+from ..serializers import ProviderPolygonWithNameSerializer
+from .test_serializers import TestDataCases
+
+
+class TestAsyncViews(object):
+
+    def scope(self, path, method='GET', headers=()):
+        return {
+            'type': 'http',
+            'path': path,
+            'method': method,
+            'scheme': 'http',
+            'headers': list(headers),
+        }
+
+    def test_get_location_params(self):
+        assert async_views.get_location_params('lat=10.5&lng=2') == (
+            10.5, 2.0, 'full')
+        assert async_views.get_location_params(
+            'lat=10&lng=2&detail=low') == (10.0, 2.0, 'low')
+
+    def test_get_location_params_fallback(self):
+        assert async_views.get_location_params('lat=10') is None
+        assert async_views.get_location_params(
+            'lat=10&lng=2&cursor=cD0x') is None
+        assert async_views.get_location_params(
+            'lat=10&lng=2&detail=lowest') is None
+        assert async_views.get_location_params('lat=nan&lng=2') is None
+
+    def test_next_url_decoded_by_cursor_pagination(self):
+        scope = self.scope(
+            '/api/v1/polygons', headers=[(b'host', b'example.com')])
+        url = async_views.build_next_url(
+            scope, 'lat=10&lng=2', ProviderPolygon(pk=21))
+        assert url.startswith('http://example.com/api/v1/polygons?cursor=')
+
+        request = Request(APIRequestFactory().get(url))
+        cursor = IdCursorPagination().decode_cursor(request)
+        assert cursor.position == '21'
+        assert not cursor.reverse
+
+    def test_build_instance(self):
+        created_at = datetime.datetime(2017, 8, 1, tzinfo=timezone.utc)
+        row = (
+            1, 'Downtown', Decimal('10.50'), '{"type":"Polygon"}',
+            created_at, created_at, 'John Doe'
+        )
+        instance = async_views.build_instance(row, 'low')
+        data = json.loads(async_views.render(
+            ProviderPolygonWithNameSerializer(
+                instance, context={'detail': 'low'}).data).decode('utf-8'))
+
+        assert data == {
+            'id': 1,
+            'name': 'Downtown',
+            'price': '10.50',
+            'geometry': {'type': 'Polygon'},
+            'created_at': '2017-08-01T00:00:00Z',
+            'updated_at': '2017-08-01T00:00:00Z',
+            'provider_name': 'John Doe',
+        }
+
+    def test_can_handle(self):
+        can_handle = async_views.AsyncLookupApplication.can_handle
+        assert can_handle(self.scope('/api/v1/polygons'))
+        assert can_handle(self.scope(
+            '/api/v1/polygons/batch', 'POST',
+            [(b'content-type', b'application/json')]))
+        assert not can_handle(self.scope(
+            '/api/v1/polygons', headers=[(b'accept', b'text/html')]))
+        assert not can_handle(self.scope(
+            '/api/v1/polygons',
+            headers=[(b'accept', b'application/json; indent=4')]))
+        assert not can_handle(self.scope('/api/v1/polygons/export'))
+
+
+# The asyncpg connections do not see the rows of the transaction of the test.
+@pytest.mark.django_db(transaction=True)
+class TestAsyncLookups(TestDataCases):
+
+    api_factory = APIRequestFactory()
+
+    @pytest.fixture(autouse=True)
+    def loop(self):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        yield loop
+        loop.run_until_complete(async_views.close_pool())
+        loop.close()
+        asyncio.set_event_loop(None)
+
+    def lookup_location(self, loop, query_string):
+        scope = {
+            'type': 'http',
+            'path': async_views.LOCATION_PATH,
+            'scheme': 'http',
+            'headers': [(b'host', b'testserver')],
+        }
+        params = async_views.get_location_params(query_string)
+        return loop.run_until_complete(
+            async_views.lookup_location(scope, query_string, *params))
+
+    def test_lookup_location_as_django_view(self, loop):
+        mixer.blend(ProviderPolygon, geom=str(self.data_geometries_valid))
+        mixer.blend(ProviderPolygon, geom=str({
+            'type': 'Polygon',
+            'coordinates': [[[60, 0], [60, 10], [70, 10], [70, 0], [60, 0]]]
+        }))
+        status, body = self.lookup_location(loop, 'lat=10&lng=10')
+        resp = views.ProviderPolygonByLocationView.as_view()(
+            self.api_factory.get('/', {'lat': '10', 'lng': '10'}))
+        resp.render()
+
+        assert status == 200
+        assert len(json.loads(body.decode('utf-8'))['results']) == 1
+        assert body == resp.content, (
+            'Should answer the same bytes as the Django view')
+
+    def test_lookup_location_pages_as_django_view(self, loop, monkeypatch):
+        monkeypatch.setattr(IdCursorPagination, 'page_size', 1)
+        mixer.cycle(2).blend(
+            ProviderPolygon, geom=str(self.data_geometries_valid))
+        status, body = self.lookup_location(
+            loop, 'lat=10&lng=10&detail=low')
+        resp = views.ProviderPolygonByLocationView.as_view()(
+            self.api_factory.get(async_views.LOCATION_PATH, {
+                'lat': '10', 'lng': '10', 'detail': 'low'}))
+        resp.render()
+
+        assert json.loads(body.decode('utf-8'))['next']
+        assert body == resp.content, (
+            'Should answer the same bytes and next link as the Django view')
+
+    def test_lookup_location_without_geojson(self, loop):
+        obj = mixer.blend(
+            ProviderPolygon, geom=str(self.data_geometries_valid))
+        ProviderPolygon.objects.filter(pk=obj.pk).update(geojson='')
+
+        assert self.lookup_location(loop, 'lat=10&lng=10') is None, (
+            'Should pass the request to the Django application')
+
+    def test_lookup_batch(self, loop):
+        obj = mixer.blend(
+            ProviderPolygon, geom=str(self.data_geometries_valid))
+        body = json.dumps({'points': [[10, 10], [-10, -10]]})
+        status, body = loop.run_until_complete(
+            async_views.lookup_batch(body.encode('utf-8')))
+
+        assert status == 200
+        results = json.loads(body.decode('utf-8'))['results']
+        assert [result['lat'] for result in results] == [10, -10]
+        assert [polygon['id'] for polygon in results[0]['polygons']] == [
+            obj.pk]
+        assert results[1]['polygons'] == []
+
+    def test_lookup_batch_as_django_view(self, loop):
+        mixer.blend(ProviderPolygon, geom=str(self.data_geometries_valid))
+        data = {'points': [[10, 10], [10.5, -10]]}
+        status, body = loop.run_until_complete(
+            async_views.lookup_batch(json.dumps(data).encode('utf-8')))
+        resp = views.ProviderPolygonBatchLocationView.as_view()(
+            self.api_factory.post('/', data, format='json'))
+        resp.render()
+
+        assert status == 200
+        assert body == resp.content, (
+            'Should answer the same bytes as the Django view')
+
+    def test_lookup_batch_invalid(self, loop):
+        status, body = loop.run_until_complete(
+            async_views.lookup_batch(b'{"points": [[10]]}'))
+
+        resp = views.ProviderPolygonBatchLocationView.as_view()(
+            self.api_factory.post('/', {'points': [[10]]}, format='json'))
+        resp.render()
+
+        assert status == 400
+        assert 'points' in json.loads(body.decode('utf-8'))
+        assert body == resp.content
@@ -0,0 +1,58 @@
+"""Testing bulk import"""
+
+import pytest
+from mixer.backend.django import mixer
+
+from django.contrib.gis.geos import Point
+from django.core.cache import caches
+
+from users.models import User
+
+from .. import importer, provider_cache, tiles
+from ..spatial_index import provider_polygon_index
+from .test_serializers import TestDataCases
+
+pytestmark = pytest.mark.django_db
+
+
+class TestImportPolygons(TestDataCases):
+
+    @pytest.fixture(autouse=True)
+    def shared_cache(self):
+        caches['shared'].clear()
+        yield
+        caches['shared'].clear()
+
+    def features(self, size):
+        return [{
+            'type': 'Feature',
+            'properties': {'name': 'Downtown', 'price': '10.50'},
+            'geometry': self.data_geometries_valid,
+        }] * size
+
+    def test_invalidates_once(self, settings, monkeypatch):
+        settings.POLYGONS_PROVIDER_CACHE = {'BACKEND': 'shared'}
+        settings.POLYGONS_TILE_CACHE = {'BACKEND': 'shared'}
+        user = mixer.blend(User)
+        bumps, extents = [], []
+        monkeypatch.setattr(provider_cache, 'bump_version', bumps.append)
+        monkeypatch.setattr(tiles, 'invalidate_extent', extents.append)
+        report = importer.import_polygons(self.features(5), user)
+
+        assert report.created == 5
+        assert bumps == [user.pk], 'Should bump the provider version once'
+        assert extents == [(0, 0, 50, 50)], (
+            'Should invalidate the union of the extents once')
+
+    def test_spatial_index_sees_imported_polygons(self, settings):
+        settings.POLYGONS_SPATIAL_INDEX = True
+        user = mixer.blend(User)
+        provider_polygon_index.load()
+        try:
+            importer.import_polygons(self.features(2), user)
+            polygons = provider_polygon_index.query_point(
+                Point(10, 10, srid=4326))
+        finally:
+            provider_polygon_index.clear()
+
+        assert len(polygons) == 2, 'Should reload the stale index'
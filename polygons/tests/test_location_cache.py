@@ -0,0 +1,98 @@
+"""Testing location cache"""
+
+import pytest
+from mixer.backend.django import mixer
+
+from django.core.cache import caches
+from rest_framework.test import APIRequestFactory
+
+from .. import location_cache, views
+from ..models import ProviderPolygon
+from .test_serializers import TestDataCases
+
+pytestmark = pytest.mark.django_db
+
+
+class TestLocationCache(TestDataCases):
+
+    api_factory = APIRequestFactory()
+    tested_view = views.ProviderPolygonByLocationView
+
+    @pytest.fixture(autouse=True)
+    def enable_cache(self, settings):
+        settings.POLYGONS_LOCATION_CACHE = {'GRID_SIZE': 0.5}
+        location_cache._local_cache = None
+        yield
+        location_cache._local_cache = None
+
+    def get_names(self, path):
+        resp = self.tested_view.as_view()(self.api_factory.get(path))
+        return [polygon['name'] for polygon in resp.data['results']]
+
+    def test_snap_to_grid(self):
+        assert location_cache.snap(10.7, -0.3) == (10.5, -0.5)
+
+    def test_get_request_served_from_cache(self):
+        obj = mixer.blend(
+            ProviderPolygon, name='Old', geom=str(self.data_geometries_valid))
+        assert self.get_names('/?lat=10&lng=10') == ['Old']
+        ProviderPolygon.objects.filter(pk=obj.pk).update(name='New')
+        assert self.get_names('/?lat=10&lng=10') == ['Old'], (
+            'Should return the cached response')
+
+    def test_save_invalidates_cells_in_extent(self):
+        obj = mixer.blend(
+            ProviderPolygon, name='Old', geom=str(self.data_geometries_valid))
+        self.get_names('/?lat=10&lng=10')
+        self.get_names('/?lat=60&lng=60')
+        obj.name = 'New'
+        obj.save()
+        assert self.get_names('/?lat=10&lng=10') == ['New']
+        key = (120, 120, '', 'full')
+        assert key in location_cache.get_local_cache()._data, (
+            'Should keep the cells outside of the polygon')
+
+    def test_get_request_not_cached_in_cell_with_edge(self):
+        obj = mixer.blend(
+            ProviderPolygon, name='Old', geom=str(self.data_geometries_valid))
+        assert self.get_names('/?lat=49.9&lng=10') == ['Old']
+        ProviderPolygon.objects.filter(pk=obj.pk).update(name='New')
+        assert self.get_names('/?lat=49.9&lng=10') == ['New'], (
+            'Should not cache the cells crossed by a polygon edge')
+
+    def test_save_invalidates_cells_intersecting_extent(self):
+        self.get_names('/?lat=-0.2&lng=10')
+        mixer.blend(
+            ProviderPolygon, name='New', geom=str(self.data_geometries_valid))
+        key = location_cache.get_key(-0.2, 10, None, 'full')
+        assert key not in location_cache.get_local_cache()._data, (
+            'Should drop the cells whose min corner is out of the extent')
+
+    def test_get_request_float_point_near_edge(self):
+        mixer.blend(
+            ProviderPolygon, name='Edge', geom=str(self.data_geometries_valid))
+        # The cell of the inner point has its corner (0, 10) on the edge.
+        assert self.get_names('/?lat=0.1&lng=10.2') == ['Edge'], (
+            'Should find the polygon of a point just inside the edge')
+        assert self.get_names('/?lat=-0.1&lng=10.2') == [], (
+            'Should not find the polygon of a point just outside the edge')
+        assert self.get_names('/?lat=0.1&lng=10.2') == ['Edge']
+
+    def test_shared_cache_without_local_tier(self, settings):
+        settings.POLYGONS_LOCATION_CACHE = {
+            'GRID_SIZE': 0.5, 'BACKEND': 'shared'}
+        caches['shared'].clear()
+        obj = mixer.blend(
+            ProviderPolygon, name='Old', geom=str(self.data_geometries_valid))
+        assert self.get_names('/?lat=10&lng=10') == ['Old']
+        assert len(location_cache.get_local_cache()) == 0, (
+            'Should not keep the responses in the local tier')
+        # A write of another process only bumps the shared versions.
+        ProviderPolygon.objects.filter(pk=obj.pk).update(name='New')
+        assert self.get_names('/?lat=10&lng=10') == ['Old']
+        location_cache.bump_cache_version(
+            caches['shared'], location_cache.GLOBAL_VERSION_KEY)
+
+        assert self.get_names('/?lat=10&lng=10') == ['New'], (
+            'Should see the versions bumped by other processes')
+        caches['shared'].clear()
@@ -1,8 +1,14 @@
 """Testing models"""
 
+import json
+from importlib import import_module
+
 import pytest
 from mixer.backend.django import mixer
 
+from django.apps import apps
+from django.db import connection
+
 from ..models import ProviderPolygon
 from .test_serializers import TestDataCases
 
@@ -22,3 +28,26 @@ class TestProviderPolygon(TestDataCases):
             ProviderPolygon, geom=geometries)
         assert isinstance(obj, ProviderPolygon), (
             'Should create an instance of ProviderPolygon model')
+
+    def test_save_precomputes_geojson(self):
+        geometries = str(self.data_geometries_valid)
+        obj = mixer.blend(ProviderPolygon, geom=geometries)
+        assert json.loads(obj.geojson) == self.data_geometries_valid, (
+            'Should keep the GeoJSON of the geometry in sync on save')
+
+    def test_save_precomputes_detail_levels(self):
+        geometries = str(self.data_geometries_valid)
+        obj = mixer.blend(ProviderPolygon, geom=geometries)
+        assert json.loads(obj.geojson_low)['type'] == 'Polygon'
+        assert json.loads(obj.geojson_medium)['type'] == 'Polygon'
+
+    def test_backfill_as_save(self):
+        migration = import_module('polygons.migrations.0006_backfill_geojson')
+        obj = mixer.blend(
+            ProviderPolygon, geom=str(self.data_geometries_valid))
+        ProviderPolygon.objects.filter(pk=obj.pk).update(geojson='')
+        with connection.schema_editor() as schema_editor:
+            migration.backfill_geojson(apps, schema_editor)
+
+        assert ProviderPolygon.objects.get(pk=obj.pk).geojson == (
+            obj.geojson), 'Should encode the GeoJSON as the save does'
@@ -0,0 +1,110 @@
+"""Testing provider cache"""
+
+import json
+
+import pytest
+from mixer.backend.django import mixer
+
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.test import APIRequestFactory
+
+from users import views as users_views
+from users.models import User
+
+from .. import provider_cache
+from ..models import ProviderPolygon
+from .test_serializers import TestDataCases
+
+pytestmark = pytest.mark.django_db
+
+
+class TestProviderCache(TestDataCases):
+
+    api_factory = APIRequestFactory()
+    tested_view = users_views.ProviderPolygonView
+
+    @pytest.fixture(autouse=True)
+    def enable_cache(self, settings):
+        settings.POLYGONS_PROVIDER_CACHE = {'BACKEND': 'shared'}
+        caches['shared'].clear()
+        yield
+        caches['shared'].clear()
+
+    def get_names(self, pk=1):
+        resp = self.tested_view.as_view()(self.api_factory.get('/'), pk=pk)
+        resp.render()
+        data = json.loads(resp.content.decode('utf-8'))
+        return [polygon['name'] for polygon in data['results']]
+
+    def test_get_request_served_from_cache(self):
+        user = mixer.blend(User, pk=1)
+        obj = mixer.blend(
+            ProviderPolygon, user=user, name='Old',
+            geom=str(self.data_geometries_valid))
+        assert self.get_names() == ['Old']
+        ProviderPolygon.objects.filter(pk=obj.pk).update(name='New')
+        assert self.get_names() == ['Old'], (
+            'Should return the cached page')
+
+    def test_save_bumps_version(self):
+        user = mixer.blend(User, pk=1)
+        obj = mixer.blend(
+            ProviderPolygon, user=user, name='Old',
+            geom=str(self.data_geometries_valid))
+        version = provider_cache.get_version(1)
+        assert self.get_names() == ['Old']
+        obj.name = 'New'
+        obj.save()
+
+        assert provider_cache.get_version(1) > version
+        assert self.get_names() == ['New']
+
+    def test_delete_bumps_version(self):
+        user = mixer.blend(User, pk=1)
+        obj = mixer.blend(
+            ProviderPolygon, user=user, geom=str(self.data_geometries_valid))
+        assert len(self.get_names()) == 1
+        obj.delete()
+        assert self.get_names() == []
+
+    def test_other_provider_not_invalidated(self):
+        mixer.blend(User, pk=1)
+        other = mixer.blend(User, pk=2)
+        version = provider_cache.get_version(1)
+        mixer.blend(
+            ProviderPolygon, user=other, geom=str(self.data_geometries_valid))
+        assert provider_cache.get_version(1) == version
+
+    def test_etag_from_version(self):
+        user = mixer.blend(User, pk=1)
+        mixer.blend(
+            ProviderPolygon, user=user, geom=str(self.data_geometries_valid))
+        etag = self.tested_view.as_view()(
+            self.api_factory.get('/'), pk=1)['ETag']
+        resp = self.tested_view.as_view()(
+            self.api_factory.get('/', HTTP_IF_NONE_MATCH=etag), pk=1)
+        assert resp.status_code == 304, (
+            'Should return status 304 NOT MODIFIED')
+
+        mixer.blend(
+            ProviderPolygon, user=user, geom=str(self.data_geometries_valid))
+        resp = self.tested_view.as_view()(
+            self.api_factory.get('/', HTTP_IF_NONE_MATCH=etag), pk=1)
+        assert resp.status_code == 200, 'Should not answer 304 NOT MODIFIED'
+        assert resp['ETag'] != etag
+
+    def test_cache_hit_without_queries(self, query_budget):
+        user = mixer.blend(User, pk=1)
+        mixer.blend(
+            ProviderPolygon, user=user, geom=str(self.data_geometries_valid))
+        names = self.get_names()
+
+        with query_budget(0):
+            assert self.get_names() == names
+
+    def test_refuses_local_backend(self, settings):
+        settings.POLYGONS_PROVIDER_CACHE = {'BACKEND': 'default'}
+
+        with pytest.raises(ImproperlyConfigured):
+            provider_cache.get_version(1)
@@ -0,0 +1,132 @@
+"""Testing query budgets of the views"""
+
+import pytest
+from mixer.backend.django import mixer
+
+from rest_framework.test import APIRequestFactory
+
+from .. import views
+from ..models import ProviderPolygon
+from .test_serializers import TestDataCases
+
+pytestmark = pytest.mark.django_db
+
+# Budget of the endpoints, it holds for any number of rows or points.
+READ_BUDGET = 3
+# Number of rows (or points) of the tests, PAGE_SIZE is 20.
+SIZES = (1, 25)
+
+
+class TestViewQueries(TestDataCases):
+
+    api_factory = APIRequestFactory()
+
+    def blend_polygons(self, size):
+        # Every polygon belongs to another provider, so the provider names
+        # would be fetched row by row without the JOIN.
+        return mixer.cycle(size).blend(
+            ProviderPolygon, geom=str(self.data_geometries_valid))
+
+
+class TestProviderPolygonByLocationViewQueries(TestViewQueries):
+
+    tested_view = views.ProviderPolygonByLocationView
+
+    @pytest.mark.parametrize('size', SIZES)
+    @pytest.mark.parametrize('params', (
+        {},
+        {'lat': '10', 'lng': '10'},
+        {'lat': '10', 'lng': '10', 'detail': 'low'},
+        {'lat': '10', 'lng': '10', 'radius': '1000'},
+        {'lat': '10', 'lng': '10', 'nearest': '30'},
+        {'bbox': '0,0,60,60'},
+    ))
+    def test_get_request(self, size, params, query_budget):
+        self.blend_polygons(size)
+
+        with query_budget(READ_BUDGET):
+            resp = self.tested_view.as_view()(
+                self.api_factory.get('/', params))
+
+        assert resp.status_code == 200, 'Should return status 200 OK'
+        assert resp.data['results'], 'Should find the polygons'
+
+
+class TestProviderPolygonBatchLocationViewQueries(TestViewQueries):
+
+    tested_view = views.ProviderPolygonBatchLocationView
+
+    @pytest.mark.parametrize('size', SIZES)
+    def test_post_request(self, size, query_budget):
+        self.blend_polygons(size)
+        req = self.api_factory.post(
+            '/', {'points': [[10, 10 + i] for i in range(size)]},
+            format='json')
+
+        with query_budget(READ_BUDGET):
+            resp = self.tested_view.as_view()(req)
+
+        assert resp.status_code == 200, 'Should return status 200 OK'
+        assert len(resp.data['results']) == size
+
+
+class TestProviderPolygonPriceViewQueries(TestViewQueries):
+
+    tested_view = views.ProviderPolygonPriceView
+
+    @pytest.mark.parametrize('size', SIZES)
+    def test_get_request(self, size, query_budget):
+        self.blend_polygons(size)
+
+        with query_budget(READ_BUDGET):
+            resp = self.tested_view.as_view()(
+                self.api_factory.get('/', {'lat': '10', 'lng': '10'}))
+
+        assert resp.status_code == 200, 'Should return status 200 OK'
+        assert resp.data['providers_count'] == size
+
+    @pytest.mark.parametrize('size', SIZES)
+    def test_post_request(self, size, query_budget):
+        self.blend_polygons(size)
+        req = self.api_factory.post(
+            '/', {'points': [[10, 10 + i] for i in range(size)]},
+            format='json')
+
+        with query_budget(READ_BUDGET):
+            resp = self.tested_view.as_view()(req)
+
+        assert resp.status_code == 200, 'Should return status 200 OK'
+        assert len(resp.data['results']) == size
+
+
+class TestProviderPolygonExportViewQueries(TestViewQueries):
+
+    tested_view = views.ProviderPolygonExportView
+
+    @pytest.mark.parametrize('size', SIZES)
+    @pytest.mark.parametrize('output', ('geojson', 'ndjson'))
+    def test_get_request(self, size, output, query_budget):
+        self.blend_polygons(size)
+
+        with query_budget(READ_BUDGET):
+            resp = self.tested_view.as_view()(
+                self.api_factory.get('/', {'output': output}))
+            content = b''.join(resp.streaming_content)
+
+        assert resp.status_code == 200, 'Should return status 200 OK'
+        assert content
+
+
+class TestProviderPolygonTileViewQueries(TestViewQueries):
+
+    tested_view = views.ProviderPolygonTileView
+
+    @pytest.mark.parametrize('size', SIZES)
+    def test_get_request(self, size, query_budget):
+        self.blend_polygons(size)
+
+        with query_budget(READ_BUDGET):
+            resp = self.tested_view.as_view()(
+                self.api_factory.get('/'), z='0', x='0', y='0')
+
+        assert resp.status_code == 200, 'Should return status 200 OK'
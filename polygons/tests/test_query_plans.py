@@ -0,0 +1,69 @@
+"""Testing query plans of the views"""
+
+import pytest
+from mixer.backend.django import mixer
+
+from moziotest.testing import get_view_queryset, assert_no_seq_scan
+from users import views as users_views
+from users.models import User
+
+from .. import views
+from ..models import ProviderPolygon
+from .test_serializers import TestDataCases
+
+pytestmark = pytest.mark.django_db
+
+
+class TestQueryPlans(TestDataCases):
+
+    @pytest.fixture(autouse=True)
+    def polygons(self):
+        user = mixer.blend(User, pk=1)
+        mixer.cycle(5).blend(
+            ProviderPolygon, user=user, geom=str(self.data_geometries_valid))
+
+    def test_location_lookup_uses_gist_index(self):
+        queryset = get_view_queryset(
+            views.ProviderPolygonByLocationView, '/?lat=10&lng=10')
+        plan = assert_no_seq_scan(queryset)
+        assert 'polygons_geom_gist_idx' in plan
+
+    def test_bbox_lookup_uses_gist_index(self):
+        queryset = get_view_queryset(
+            views.ProviderPolygonByLocationView, '/?bbox=0,0,10,10')
+        plan = assert_no_seq_scan(queryset)
+        assert 'polygons_geom_gist_idx' in plan
+
+    def test_radius_lookup_uses_gist_index(self):
+        queryset = get_view_queryset(
+            views.ProviderPolygonByLocationView,
+            '/?lat=10&lng=10&radius=1000')
+        plan = assert_no_seq_scan(queryset)
+        assert 'polygons_geom_gist_idx' in plan
+
+    def test_nearest_lookup_uses_gist_index(self):
+        queryset = get_view_queryset(
+            views.ProviderPolygonByLocationView, '/?lat=10&lng=10&nearest=3')
+        plan = assert_no_seq_scan(queryset)
+        assert 'polygons_geom_gist_idx' in plan
+
+    def test_location_list(self):
+        assert_no_seq_scan(
+            get_view_queryset(views.ProviderPolygonByLocationView))
+
+    def test_provider_polygons_list_uses_user_index(self):
+        queryset = get_view_queryset(users_views.ProviderPolygonView, pk=1)
+        plan = assert_no_seq_scan(queryset)
+        assert 'polygons_user_id_desc_idx' in plan
+
+    def test_provider_polygon_detail(self):
+        queryset = get_view_queryset(
+            users_views.ProviderPolygonDetailView, pk_user=1)
+        assert_no_seq_scan(queryset.filter(pk=1))
+
+    def test_users_list(self):
+        assert_no_seq_scan(get_view_queryset(users_views.UserView))
+
+    def test_user_detail(self):
+        queryset = get_view_queryset(users_views.UserDetailView)
+        assert_no_seq_scan(queryset.filter(pk=1))
@@ -1,8 +1,12 @@
 """Testing serializers"""
 
+import json
+
 import pytest
 from mixer.backend.django import mixer
 
+from moziotest.renderers import FragmentJSONRenderer
+
 from .. import serializers
 from ..models import ProviderPolygon
 
@@ -89,6 +93,83 @@ class TestDataCases(object):
         ]
     }
 
+    data_geometries_self_intersecting = {
+        'type': 'Polygon',
+        'coordinates': [
+            [
+                [0, 0],
+                [50, 50],
+                [0, 50],
+                [50, 0],
+                [0, 0]
+            ]
+        ]
+    }
+
+    data_geometries_valid_extreme_values = {
+        'type': 'Polygon',
+        'coordinates': [
+            [
+                [-90, -180],
+                [-90, 180],
+                [90, 180],
+                [90, -180],
+                [-90, -180]
+            ]
+        ]
+    }
+
+    data_geometries_out_of_range = {
+        'type': 'Polygon',
+        'coordinates': [
+            [
+                [0, 0],
+                [0, 50],
+                [100, 50],
+                [100, 0],
+                [0, 0]
+            ]
+        ]
+    }
+
+    data_geometries_overflow = {
+        'type': 'Polygon',
+        'coordinates': [
+            [
+                [0, 0],
+                [0, 10 ** 400],
+                [50, 50],
+                [50, 0],
+                [0, 0]
+            ]
+        ]
+    }
+
+    data_geometries_booleans = {
+        'type': 'Polygon',
+        'coordinates': [
+            [
+                [0, 0],
+                [0, True],
+                [True, True],
+                [True, 0],
+                [0, 0]
+            ]
+        ]
+    }
+
+    data_geometries_too_few_points = {
+        'type': 'Polygon',
+        'coordinates': [
+            [
+                [0, 0],
+                [0, 0],
+                [0, 0],
+                [0, 0]
+            ]
+        ]
+    }
+
     data_geometries_valid = {
         'type': 'Polygon',
         'coordinates': [
@@ -209,3 +290,60 @@ class TestGeometrySerializer(TestDataCases):
         assert 'coordinates' in serializer.errors
         error_message = 'First and last value coordinates should match.'
         assert error_message in serializer.errors['coordinates']
+
+    def test_errors_message_self_intersecting(self):
+        serializer = self.serializer_class(
+            data=self.data_geometries_self_intersecting)
+        assert not serializer.is_valid(), 'Should not be a valid data'
+        error_message = 'The Polygon should not be self-intersecting.'
+        assert error_message in serializer.errors['coordinates']
+
+    def test_is_valid_extreme_values(self):
+        serializer = self.serializer_class(
+            data=self.data_geometries_valid_extreme_values)
+        assert serializer.is_valid(), (
+            'Should compare the first and last coordinates by value')
+
+    def test_errors_message_out_of_range(self):
+        for data in (self.data_geometries_out_of_range,
+                     self.data_geometries_overflow):
+            serializer = self.serializer_class(data=data)
+            assert not serializer.is_valid(), 'Should not be a valid data'
+            assert serializers.OUT_OF_RANGE_MESSAGE in (
+                serializer.errors['coordinates'])
+
+    def test_is_valid_booleans(self):
+        serializer = self.serializer_class(
+            data=self.data_geometries_booleans)
+        assert not serializer.is_valid(), (
+            'Should not accept booleans as coordinates')
+
+    def test_errors_message_not_valid(self):
+        serializer = self.serializer_class(
+            data=self.data_geometries_too_few_points)
+        assert not serializer.is_valid(), 'Should not be a valid data'
+        error_message, = serializer.errors['coordinates']
+        assert error_message.startswith('The Polygon is not valid: ')
+
+    def test_validated_data_has_polygon(self):
+        serializer = self.serializer_class(data=self.data_geometries_valid)
+        serializer.is_valid()
+        polygon = serializer.validated_data['polygon']
+        assert polygon.coords[0][2] == (50, 50)
+
+
+class TestProviderPolygonSerializer(TestDataCases):
+    serializer_class = serializers.ProviderPolygonSerializer
+
+    def render(self, serializer):
+        return json.loads(FragmentJSONRenderer().render(serializer.data))
+
+    def test_precomputed_geometry_matches_geos_geometry(self):
+        obj = mixer.blend(
+            ProviderPolygon, geom=str(self.data_geometries_valid))
+        precomputed = self.render(self.serializer_class(obj))
+        serializer = self.serializer_class(obj)
+        serializer.precomputed_geometry = False
+        assert precomputed == self.render(serializer), (
+            'Should render the same geometry from the GeoJSON column')
+        assert precomputed['geometry'] == self.data_geometries_valid
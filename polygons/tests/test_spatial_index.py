@@ -0,0 +1,81 @@
+"""Testing spatial index"""
+
+import pytest
+from mixer.backend.django import mixer
+
+from django.contrib.gis.geos import Point
+
+from ..models import ProviderPolygon
+from ..spatial_index import STRTree, ProviderPolygonIndex
+from .test_serializers import TestDataCases
+
+pytestmark = pytest.mark.django_db
+
+
+class TestSTRTree(object):
+
+    items = [
+        ((x, y, x + 1, y + 1), (x, y))
+        for x in range(0, 30, 2) for y in range(0, 30, 2)
+    ]
+
+    def test_query_point_inside_envelope(self):
+        tree = STRTree(self.items)
+        assert tree.query_point(4.5, 6.5) == [(4, 6)]
+
+    def test_query_point_outside_envelopes(self):
+        tree = STRTree(self.items)
+        assert tree.query_point(5.5, 6.5) == [], (
+            'Should not return values given no envelope contains the point')
+
+    def test_query_point_empty_tree(self):
+        tree = STRTree([])
+        assert tree.query_point(0, 0) == []
+
+
+class TestProviderPolygonIndex(TestDataCases):
+
+    def test_query_point_contained(self):
+        geometries = str(self.data_geometries_valid)
+        obj = mixer.blend(ProviderPolygon, geom=geometries)
+        index = ProviderPolygonIndex()
+        index.load()
+        assert index.query_point(Point(10, 10)) == [obj]
+
+    def test_query_point_not_contained(self):
+        mixer.blend(ProviderPolygon, geom=str(self.data_geometries_valid))
+        index = ProviderPolygonIndex()
+        index.load()
+        assert index.query_point(Point(60, 10)) == []
+
+    def test_add_and_remove_after_load(self):
+        index = ProviderPolygonIndex()
+        index.load()
+        geometries = str(self.data_geometries_valid)
+        obj = mixer.blend(ProviderPolygon, geom=geometries)
+        index.add(obj)
+        assert index.query_point(Point(10, 10)) == [obj]
+        index.remove(obj.pk)
+        assert index.query_point(Point(10, 10)) == [], (
+            'Should not return a polygon removed from the index')
+
+    def test_query_point_sees_writes_of_other_processes(self, settings):
+        settings.POLYGONS_SPATIAL_INDEX_CHECK_INTERVAL = 0
+        index = ProviderPolygonIndex()
+        index.load()
+        # Created without telling the index, as if by another process.
+        obj = mixer.blend(
+            ProviderPolygon, geom=str(self.data_geometries_valid))
+        assert index.query_point(Point(10, 10)) == [obj]
+
+        ProviderPolygon.objects.filter(pk=obj.pk).delete()
+        assert index.query_point(Point(10, 10)) == [], (
+            'Should not return a polygon deleted by another process')
+
+    def test_query_point_checks_database_by_interval(self, settings):
+        settings.POLYGONS_SPATIAL_INDEX_CHECK_INTERVAL = 60
+        index = ProviderPolygonIndex()
+        index.load()
+        mixer.blend(ProviderPolygon, geom=str(self.data_geometries_valid))
+        assert index.query_point(Point(10, 10)) == [], (
+            'Should not check the database before the interval')
@@ -0,0 +1,95 @@
+"""Testing vector tiles"""
+
+import pytest
+from mixer.backend.django import mixer
+
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.test import APIRequestFactory
+
+from .. import tiles, views
+from ..models import ProviderPolygon
+from .test_serializers import TestDataCases
+
+pytestmark = pytest.mark.django_db
+
+
+class TestTiles(object):
+
+    def test_tile_bounds_world(self):
+        bounds = tiles.get_tile_bounds(0, 0, 0)
+        assert bounds == (
+            -tiles.MERCATOR_BOUND, -tiles.MERCATOR_BOUND,
+            tiles.MERCATOR_BOUND, tiles.MERCATOR_BOUND
+        )
+
+    def test_lnglat_to_tile(self):
+        assert tiles.lnglat_to_tile(0, 0, 1) == (1, 1)
+        assert tiles.lnglat_to_tile(-180, 90, 1) == (0, 0)
+
+    def test_is_valid_tile(self):
+        assert tiles.is_valid_tile(1, 1, 1)
+        assert not tiles.is_valid_tile(1, 2, 0), (
+            'Should not be valid a tile out of the range of the zoom')
+
+
+class TestProviderPolygonTileView(TestDataCases):
+
+    api_factory = APIRequestFactory()
+    tested_view = views.ProviderPolygonTileView
+
+    # Polygon of lat 10 to 20 and lng -110 to -100, north-west of (0, 0).
+    data_geometry_north_west = (
+        'POLYGON((10 -110, 10 -100, 20 -100, 20 -110, 10 -110))')
+
+    @pytest.fixture
+    def tile_cache(self, settings):
+        settings.POLYGONS_TILE_CACHE = {'BACKEND': 'shared'}
+        cache = caches['shared']
+        cache.clear()
+        yield cache
+        cache.clear()
+
+    def get(self, z, x, y):
+        req = self.api_factory.get('/')
+        return self.tested_view.as_view()(req, z=z, x=x, y=y)
+
+    def test_get_request_tile(self):
+        mixer.blend(ProviderPolygon, geom=str(self.data_geometries_valid))
+        resp = self.get('1', '1', '0')
+
+        assert resp.status_code == 200, 'Should return status 200 OK'
+        assert resp['Content-Type'] == 'application/vnd.mapbox-vector-tile'
+        assert len(resp.content) > 0, 'Should encode the polygon in the tile'
+
+    def test_get_request_tile_lat_lng_axes(self):
+        mixer.blend(ProviderPolygon, geom=self.data_geometry_north_west)
+
+        assert len(self.get('1', '0', '0').content) > 0, (
+            'Should encode the polygon in the north-west tile')
+        assert len(self.get('1', '1', '1').content) == 0, (
+            'Should not encode the polygon in the south-east tile')
+
+    def test_get_request_tile_out_of_range(self):
+        resp = self.get('1', '2', '0')
+
+        assert resp.status_code == 404, 'Should return status 404 NOT FOUND'
+
+    def test_save_invalidates_cached_tile(self, tile_cache):
+        obj = mixer.blend(ProviderPolygon, geom=self.data_geometry_north_west)
+        x, y = tiles.lnglat_to_tile(-105, 15, 8)
+        other_x, other_y = tiles.lnglat_to_tile(105, 15, 8)
+        key = tiles.get_cache_key(tile_cache, 8, x, y)
+        other_key = tiles.get_cache_key(tile_cache, 8, other_x, other_y)
+        obj.save()
+        assert tiles.get_cache_key(tile_cache, 8, x, y) != key, (
+            'Should bump the version of the tiles of the polygon')
+        assert tiles.get_cache_key(
+            tile_cache, 8, other_x, other_y) == other_key, (
+            'Should not bump the version of the tiles out of the polygon')
+
+    def test_cache_refuses_local_backend(self, settings):
+        settings.POLYGONS_TILE_CACHE = {'BACKEND': 'default'}
+
+        with pytest.raises(ImproperlyConfigured):
+            tiles.get_tile(0, 0, 0)
@@ -0,0 +1,294 @@
+"""Testing views"""
+
+import json
+
+import pytest
+from mixer.backend.django import mixer
+
+from rest_framework.test import APIRequestFactory
+
+from users.models import User
+
+from .. import views
+from ..models import ProviderPolygon
+from .test_serializers import TestDataCases
+
+pytestmark = pytest.mark.django_db
+
+
+class TestProviderPolygonByLocationView(TestDataCases):
+
+    api_factory = APIRequestFactory()
+    tested_view = views.ProviderPolygonByLocationView
+
+    def get(self, path):
+        return self.tested_view.as_view()(self.api_factory.get(path))
+
+    def test_get_request_detail_level(self):
+        mixer.blend(ProviderPolygon, geom=str(self.data_geometries_valid))
+        resp = self.get('/?lat=10&lng=10&detail=low')
+
+        assert resp.status_code == 200, 'Should return status 200 OK'
+        assert len(resp.data['results']) == 1
+
+    def test_get_request_detail_level_simplifies(self):
+        # (10, 1) and (10, 21) are 1 degree off the edges of the square.
+        mixer.blend(ProviderPolygon, geom=str({
+            'type': 'Polygon',
+            'coordinates': [[
+                [0, 0], [10, 1], [20, 0], [20, 20], [10, 21], [0, 20], [0, 0]
+            ]]
+        }))
+
+        def get_ring(detail):
+            resp = self.get('/?lat=5&lng=5&detail={}'.format(detail))
+            resp.render()
+            results = json.loads(resp.content.decode('utf-8'))['results']
+            return results[0]['geometry']['coordinates'][0]
+
+        assert len(get_ring('full')) == 7
+        assert len(get_ring('medium')) == 7, (
+            'Should keep the vertices farther than the tolerance')
+        assert len(get_ring('low')) < 7, 'Should drop the vertices'
+
+    def test_get_request_detail_level_not_supported(self):
+        resp = self.get('/?detail=lowest')
+
+        assert 'detail' in resp.data
+        assert resp.status_code == 400, 'Should return status 400 BAD REQUEST'
+
+    def test_get_request_float_location(self):
+        mixer.blend(ProviderPolygon, geom=str(self.data_geometries_valid))
+        resp = self.get('/?lat=10.5&lng=49.75')
+
+        assert resp.status_code == 200, 'Should return status 200 OK'
+        assert len(resp.data['results']) == 1
+
+    def test_get_request_location_not_a_number(self):
+        resp = self.get('/?lat=ten&lng=10')
+
+        assert 'lat' in resp.data
+        assert resp.status_code == 400, 'Should return status 400 BAD REQUEST'
+
+    def test_get_request_bbox(self):
+        mixer.blend(ProviderPolygon, geom=str(self.data_geometries_valid))
+        resp = self.get('/?bbox=40,40,60,60')
+        assert len(resp.data['results']) == 1
+
+        resp = self.get('/?bbox=60,60,70,70')
+        assert len(resp.data['results']) == 0
+
+    def test_get_request_bbox_invalid(self):
+        resp = self.get('/?bbox=1,2,3')
+        assert 'bbox' in resp.data
+        assert resp.status_code == 400, 'Should return status 400 BAD REQUEST'
+
+        resp = self.get('/?bbox=10,10,0,0')
+        assert 'bbox' in resp.data
+        assert resp.status_code == 400, 'Should return status 400 BAD REQUEST'
+
+    def test_get_request_radius(self):
+        mixer.blend(ProviderPolygon, geom=str(self.data_geometries_valid))
+        resp = self.get('/?lat=51&lng=10&radius=200000')
+        assert len(resp.data['results']) == 1
+
+        resp = self.get('/?lat=51&lng=10&radius=1000')
+        assert len(resp.data['results']) == 0
+
+    def test_get_request_radius_not_positive(self):
+        resp = self.get('/?lat=10&lng=10&radius=0')
+
+        assert 'radius' in resp.data
+        assert resp.status_code == 400, 'Should return status 400 BAD REQUEST'
+
+    def test_get_request_nearest(self):
+        far = mixer.blend(
+            ProviderPolygon, geom=str(self.data_geometries_valid))
+        near = mixer.blend(ProviderPolygon, geom=str({
+            'type': 'Polygon',
+            'coordinates': [[[60, 0], [60, 10], [70, 10], [70, 0], [60, 0]]]
+        }))
+        resp = self.get('/?lat=58&lng=5&nearest=1')
+
+        assert resp.status_code == 200, 'Should return status 200 OK'
+        assert [polygon['id'] for polygon in resp.data['results']] == [
+            near.pk]
+
+        resp = self.get('/?lat=58&lng=5&nearest=2')
+        results = resp.data['results']
+        assert [polygon['id'] for polygon in results] == [near.pk, far.pk]
+        assert 0 < results[0]['distance'] < results[1]['distance']
+
+    def test_get_request_nearest_by_meters(self):
+        # 3 degrees of longitude east of the point at lat 60 are ~167 km,
+        # nearer than the 2 degrees of latitude north (~222 km).
+        east = mixer.blend(ProviderPolygon, geom=str({
+            'type': 'Polygon',
+            'coordinates': [[
+                [59.5, 3], [59.5, 4], [60.5, 4], [60.5, 3], [59.5, 3]
+            ]]
+        }))
+        mixer.blend(ProviderPolygon, geom=str({
+            'type': 'Polygon',
+            'coordinates': [[
+                [62, -0.5], [62, 0.5], [63, 0.5], [63, -0.5], [62, -0.5]
+            ]]
+        }))
+        resp = self.get('/?lat=60&lng=0&nearest=1')
+
+        assert [polygon['id'] for polygon in resp.data['results']] == [
+            east.pk], 'Should order by the distance in meters'
+
+    def test_get_request_nearest_invalid(self):
+        resp = self.get('/?nearest=1')
+        assert 'nearest' in resp.data
+        assert resp.status_code == 400, 'Should return status 400 BAD REQUEST'
+
+        resp = self.get('/?lat=10&lng=10&nearest=0')
+        assert 'nearest' in resp.data
+        assert resp.status_code == 400, 'Should return status 400 BAD REQUEST'
+
+    def test_tolerance_chooses_coarsest_level(self):
+        view = self.tested_view()
+        view.request = view.initialize_request(
+            self.api_factory.get('/?tolerance=1'))
+        assert view.get_detail_level() == 'medium'
+
+
+class TestProviderPolygonBatchLocationView(TestDataCases):
+
+    api_factory = APIRequestFactory()
+    tested_view = views.ProviderPolygonBatchLocationView
+
+    def test_get_request_not_allowed(self):
+        req = self.api_factory.get('/')
+        resp = self.tested_view.as_view()(req)
+
+        assert resp.data['detail'] == 'Method "GET" not allowed.'
+        assert resp.status_code == 405
+
+    def test_post_request_matches_in_order(self):
+        obj = mixer.blend(
+            ProviderPolygon, geom=str(self.data_geometries_valid))
+        req = self.api_factory.post(
+            '/', {'points': [[10, 10], [60, 60]]}, format='json')
+        resp = self.tested_view.as_view()(req)
+
+        assert resp.status_code == 200, 'Should return status 200 OK'
+        results = resp.data['results']
+        assert [match['id'] for match in results[0]['polygons']] == [obj.pk]
+        assert results[1]['polygons'] == [], (
+            'Should not match any polygon for a point outside of them')
+
+    def test_post_request_invalid_point(self):
+        req = self.api_factory.post(
+            '/', {'points': [[10, 10, 10]]}, format='json')
+        resp = self.tested_view.as_view()(req)
+
+        assert 'Every point should be a [lat, lng] pair.' in (
+            resp.data['points'])
+        assert resp.status_code == 400, 'Should return status 400 BAD REQUEST'
+
+    @pytest.mark.parametrize('point', [
+        [True, 10], [10, False], ['nan', 10], [10, 'inf'], ['-Infinity', 10],
+    ])
+    def test_post_request_not_number(self, point):
+        req = self.api_factory.post('/', {'points': [point]}, format='json')
+        resp = self.tested_view.as_view()(req)
+
+        assert 'A valid number is required.' in resp.data['points']
+        assert resp.status_code == 400, 'Should return status 400 BAD REQUEST'
+
+
+class TestProviderPolygonPriceView(TestDataCases):
+
+    api_factory = APIRequestFactory()
+    tested_view = views.ProviderPolygonPriceView
+
+    def test_get_request_price_stats(self):
+        user = mixer.blend(User)
+        cheapest = mixer.blend(
+            ProviderPolygon, user=user, price=5,
+            geom=str(self.data_geometries_valid))
+        mixer.blend(
+            ProviderPolygon, user=user, price=15,
+            geom=str(self.data_geometries_valid))
+        req = self.api_factory.get('/?lat=10&lng=10')
+        resp = self.tested_view.as_view()(req)
+
+        assert resp.status_code == 200, 'Should return status 200 OK'
+        assert resp.data['min_price'] == '5.00'
+        assert resp.data['max_price'] == '15.00'
+        assert resp.data['providers_count'] == 1
+        assert resp.data['cheapest']['id'] == cheapest.pk
+        assert resp.data['cheapest']['provider_name'] == user.name
+
+    def test_get_request_location_missing(self):
+        req = self.api_factory.get('/?lat=10')
+        resp = self.tested_view.as_view()(req)
+
+        assert 'lng' in resp.data
+        assert resp.status_code == 400, 'Should return status 400 BAD REQUEST'
+
+    def test_post_request_stats_in_order(self):
+        obj = mixer.blend(
+            ProviderPolygon, price=5, geom=str(self.data_geometries_valid))
+        req = self.api_factory.post(
+            '/', {'points': [[60, 60], [10, 10]]}, format='json')
+        resp = self.tested_view.as_view()(req)
+
+        assert resp.status_code == 200, 'Should return status 200 OK'
+        results = resp.data['results']
+        assert results[0]['providers_count'] == 0
+        assert results[0]['cheapest'] is None
+        assert results[1]['providers_count'] == 1
+        assert results[1]['cheapest']['id'] == obj.pk
+
+
+class TestProviderPolygonExportView(TestDataCases):
+
+    api_factory = APIRequestFactory()
+    tested_view = views.ProviderPolygonExportView
+
+    def export(self, path):
+        resp = self.tested_view.as_view()(self.api_factory.get(path))
+        return resp, b''.join(resp.streaming_content).decode('utf-8')
+
+    def test_get_request_feature_collection(self):
+        obj = mixer.blend(
+            ProviderPolygon, geom=str(self.data_geometries_valid))
+        resp, content = self.export('/')
+        collection = json.loads(content)
+
+        assert resp['Content-Type'] == 'application/geo+json'
+        assert collection['type'] == 'FeatureCollection'
+        feature, = collection['features']
+        assert feature['id'] == obj.pk
+        assert feature['geometry'] == self.data_geometries_valid
+        assert feature['properties']['provider_name'] == obj.user.name
+
+    def test_get_request_ndjson(self):
+        mixer.cycle(3).blend(
+            ProviderPolygon, geom=str(self.data_geometries_valid))
+        resp, content = self.export('/?output=ndjson')
+        features = [json.loads(line) for line in content.splitlines()]
+
+        assert resp['Content-Type'] == 'application/x-ndjson'
+        assert len(features) == 3, 'Should write a feature per line'
+
+    def test_get_request_without_precomputed_geometry(self):
+        obj = mixer.blend(
+            ProviderPolygon, geom=str(self.data_geometries_valid))
+        ProviderPolygon.objects.filter(pk=obj.pk).update(geojson='')
+        _, content = self.export('/')
+        feature, = json.loads(content)['features']
+
+        assert feature['geometry'] == self.data_geometries_valid, (
+            'Should build the GeoJSON of the geometry')
+
+    def test_get_request_output_not_supported(self):
+        req = self.api_factory.get('/?output=csv')
+        resp = self.tested_view.as_view()(req)
+
+        assert 'output' in resp.data
+        assert resp.status_code == 400, 'Should return status 400 BAD REQUEST'
@@ -0,0 +1,172 @@
+"""Mapbox Vector Tiles of the polygons built by PostGIS.
+
+The polygons are stored as (lat, lng), so their coordinates are flipped to
+(lng, lat) before the projection to Web Mercator. The tiles are cached in the
+Django cache named by the BACKEND option of POLYGONS_TILE_CACHE, which must
+be shared by every process (the cache is disabled without it). A tile key
+holds the version of its ancestor tile at COARSE_ZOOM (or the version shared
+by the tiles with a lower zoom), a write of a polygon bumps the versions of
+the coarse tiles its bounding box overlaps and the low zoom version. The
+global version flushes every tile.
+"""
+import math
+
+from django.conf import settings
+from django.db import connections, router
+
+from moziotest.cache import bump_cache_version, get_shared_cache
+from moziotest.routers import use_primary
+
+EXTENT = 4096
+BUFFER = 64
+MAX_ZOOM = 22
+MERCATOR_BOUND = 20037508.342789244
+MAX_LATITUDE = 85.0511287798
+DEFAULTS = {
+    'BACKEND': None,
+    'TIMEOUT': 3600,
+    'COARSE_ZOOM': 6,
+    'MAX_INVALIDATED_TILES': 1000,
+}
+KEY_PREFIX = 'polygons:tile'
+GLOBAL_VERSION_KEY = KEY_PREFIX + ':version'
+LOW_ZOOM_VERSION_KEY = KEY_PREFIX + ':version:low'
+
+TILE_SQL = """
+    WITH bounds AS (SELECT ST_MakeEnvelope(%s, %s, %s, %s, 3857) AS geom)
+    SELECT ST_AsMVT(tile, 'polygons', {extent}, 'geom') FROM (
+        SELECT polygon.id, polygon.name, polygon.price::float8 AS price,
+            provider.name AS provider_name,
+            ST_AsMVTGeom(
+                ST_Transform(ST_ClipByBox2D(
+                    ST_FlipCoordinates(polygon.geom),
+                    ST_MakeEnvelope(
+                        -180, -{max_latitude}, 180, {max_latitude}, 4326)
+                ), 3857),
+                bounds.geom, {extent}, {buffer}, true
+            ) AS geom
+        FROM {polygon_table} AS polygon
+        JOIN {user_table} AS provider ON provider.id = polygon.user_id
+        CROSS JOIN bounds
+        WHERE polygon.geom && ST_FlipCoordinates(
+            ST_Transform(bounds.geom, 4326))
+    ) AS tile
+"""
+
+
+def get_setting(name):
+    config = getattr(settings, 'POLYGONS_TILE_CACHE', None) or {}
+    return config.get(name, DEFAULTS[name])
+
+
+def is_cache_enabled():
+    return bool(get_setting('BACKEND'))
+
+
+def is_valid_tile(z, x, y):
+    return z <= MAX_ZOOM and x < 2 ** z and y < 2 ** z
+
+
+def get_tile_bounds(z, x, y):
+    """Function to get the Web Mercator bounds of a tile
+
+    :return: tuple (xmin, ymin, xmax, ymax)
+    """
+    size = 2 * MERCATOR_BOUND / 2 ** z
+    return (
+        -MERCATOR_BOUND + x * size,
+        MERCATOR_BOUND - (y + 1) * size,
+        -MERCATOR_BOUND + (x + 1) * size,
+        MERCATOR_BOUND - y * size,
+    )
+
+
+def lnglat_to_tile(lng, lat, z):
+    lat = math.radians(max(-MAX_LATITUDE, min(MAX_LATITUDE, lat)))
+    lng = max(-180.0, min(180.0, lng))
+    count = 2 ** z
+    x = int((lng + 180.0) / 360.0 * count)
+    y = int((1.0 - math.log(math.tan(lat) + 1 / math.cos(lat)) / math.pi) /
+            2.0 * count)
+    return min(x, count - 1), min(y, count - 1)
+
+
+def render_tile(z, x, y):
+    # Imported here given the signals of the models import this module.
+    from users.models import User
+    from .models import ProviderPolygon
+    sql = TILE_SQL.format(
+        extent=EXTENT,
+        buffer=BUFFER,
+        max_latitude=MAX_LATITUDE,
+        polygon_table=ProviderPolygon._meta.db_table,
+        user_table=User._meta.db_table,
+    )
+    connection = connections[router.db_for_read(ProviderPolygon)]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, get_tile_bounds(z, x, y))
+        tile = cursor.fetchone()[0]
+    return bytes(tile) if tile is not None else b''
+
+
+def get_version_key(z, x, y):
+    coarse_zoom = get_setting('COARSE_ZOOM')
+    if z < coarse_zoom:
+        return LOW_ZOOM_VERSION_KEY
+    shift = z - coarse_zoom
+    return get_coarse_version_key(x >> shift, y >> shift)
+
+
+def get_coarse_version_key(x, y):
+    return '{}:version:{}:{}'.format(KEY_PREFIX, x, y)
+
+
+def get_cache_key(cache, z, x, y):
+    version_key = get_version_key(z, x, y)
+    versions = cache.get_many([GLOBAL_VERSION_KEY, version_key])
+    return '{}:{}:{}:{}:{}:{}'.format(
+        KEY_PREFIX, versions.get(GLOBAL_VERSION_KEY, 0),
+        versions.get(version_key, 0), z, x, y
+    )
+
+
+def get_tile(z, x, y):
+    """Function to get a tile from the cache, rendering it on a miss
+
+    :return: tile encoded as bytes, empty if it has no polygons
+    """
+    if not is_cache_enabled():
+        return render_tile(z, x, y)
+    cache = get_shared_cache(get_setting('BACKEND'))
+    key = get_cache_key(cache, z, x, y)
+    tile = cache.get(key)
+    if tile is None:
+        # The version may have been bumped by a write the replicas miss yet.
+        with use_primary():
+            tile = render_tile(z, x, y)
+        cache.set(key, tile, get_setting('TIMEOUT'))
+    return tile
+
+
+def invalidate_extent(extent):
+    """Function to invalidate the tiles of the bounding box of a polygon,
+    given as (min lat, min lng, max lat, max lng)
+    """
+    cache = get_shared_cache(get_setting('BACKEND'))
+    coarse_zoom = get_setting('COARSE_ZOOM')
+    min_lat, min_lng, max_lat, max_lng = extent
+    min_tile_x, max_tile_y = lnglat_to_tile(min_lng, min_lat, coarse_zoom)
+    max_tile_x, min_tile_y = lnglat_to_tile(max_lng, max_lat, coarse_zoom)
+    tiles_count = (max_tile_x - min_tile_x + 1) * (max_tile_y - min_tile_y + 1)
+    if tiles_count > get_setting('MAX_INVALIDATED_TILES'):
+        invalidate_all()
+        return
+    bump_cache_version(cache, LOW_ZOOM_VERSION_KEY)
+    for tile_x in range(min_tile_x, max_tile_x + 1):
+        for tile_y in range(min_tile_y, max_tile_y + 1):
+            bump_cache_version(cache, get_coarse_version_key(tile_x, tile_y))
+
+
+def invalidate_all():
+    bump_cache_version(
+        get_shared_cache(get_setting('BACKEND')), GLOBAL_VERSION_KEY)
@@ -0,0 +1,65 @@
+"""Reader of Polygon geometries encoded as Tiny WKB (TWKB).
+
+See https://github.com/TWKB/Specification, only the x y values of the
+points are kept, the Z and M dimensions are read and discarded.
+"""
+TWKB_POLYGON = 3
+
+BBOX_FLAG = 0x01
+SIZE_FLAG = 0x02
+EXTENDED_DIMENSIONS_FLAG = 0x08
+EMPTY_FLAG = 0x10
+
+
+def read_varint(data, offset):
+    result = shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        result |= (byte & 0x7f) << shift
+        if not byte & 0x80:
+            return result, offset
+        shift += 7
+
+
+def unzigzag(value):
+    return (value >> 1) ^ -(value & 1)
+
+
+def read_twkb_polygon(data):
+    """Function to decode a TWKB Polygon
+
+    :return: list of rings, every ring a list of (x, y) tuples
+    :except: ValueError if the data is not a well formed TWKB Polygon
+    """
+    data = bytearray(data)
+    try:
+        if data[0] & 0x0f != TWKB_POLYGON:
+            raise ValueError('Only TWKB Polygon geometries are supported.')
+        scale = 10.0 ** -unzigzag(data[0] >> 4)
+        metadata, offset, dimensions = data[1], 2, 2
+        if metadata & EXTENDED_DIMENSIONS_FLAG:
+            dimensions += bool(data[offset] & 0x01) + bool(data[offset] & 0x02)
+            offset += 1
+        if metadata & EMPTY_FLAG:
+            return []
+        if metadata & SIZE_FLAG:
+            _, offset = read_varint(data, offset)
+        if metadata & BBOX_FLAG:
+            for _ in range(2 * dimensions):
+                _, offset = read_varint(data, offset)
+        rings_count, offset = read_varint(data, offset)
+        position = [0] * dimensions
+        rings = []
+        for _ in range(rings_count):
+            points_count, offset = read_varint(data, offset)
+            ring = []
+            for _ in range(points_count):
+                for dimension in range(dimensions):
+                    delta, offset = read_varint(data, offset)
+                    position[dimension] += unzigzag(delta)
+                ring.append((position[0] * scale, position[1] * scale))
+            rings.append(ring)
+        return rings
+    except IndexError:
+        raise ValueError('Unexpected end of the TWKB data.')
@@ -1,8 +1,17 @@
 from django.conf.urls import url
 
-from .views import ProviderPolygonByLocationView
+from .views import (
+    ProviderPolygonByLocationView, ProviderPolygonBatchLocationView,
+    ProviderPolygonPriceView, ProviderPolygonExportView,
+    ProviderPolygonTileView
+)
 
 
 urlpatterns = [
     url(r'^$', ProviderPolygonByLocationView.as_view()),
+    url(r'^/batch$', ProviderPolygonBatchLocationView.as_view()),
+    url(r'^/prices$', ProviderPolygonPriceView.as_view()),
+    url(r'^/export$', ProviderPolygonExportView.as_view()),
+    url(r'^/(?P<z>\d+)/(?P<x>\d+)/(?P<y>\d+)\.mvt$',
+        ProviderPolygonTileView.as_view()),
 ]
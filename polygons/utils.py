@@ -1,9 +1,22 @@
-from django.contrib.gis.geos import GEOSGeometry
+import json
+from itertools import chain
+
+import numpy
+
+from django.contrib.gis.geos import LinearRing, Polygon
 
 
 def get_polygon_obj(polygon_data):
-    data = dict(polygon_data)
-    polygon_obj = GEOSGeometry(str(data), srid=4326)
+    """Function to get the Polygon of validated GeoJSON data, built by
+    GeometrySerializer or from the rings of coordinates (NumPy arrays or
+    lists of [x, y] values)
+
+    :return: Polygon with srid 4326
+    """
+    polygon_obj = polygon_data.get('polygon')
+    if polygon_obj is None:
+        rings = [LinearRing(ring) for ring in polygon_data['coordinates']]
+        polygon_obj = Polygon(*rings, srid=4326)
     return polygon_obj
 
 
@@ -14,8 +27,46 @@ def build_geometry_json_response(coords):
     }
 
 
-def lists_matches(list_x, list_y):
-    for value_x, value_y in zip(list_x, list_y):
-        if value_x is not value_y:
-            return False
-    return True
+def build_geojson(geom, tolerance=0):
+    """Function to encode a geometry, simplified by tolerance degrees if
+    given, as the GeoJSON served by the read endpoints
+
+    :return: JSON string
+    """
+    if tolerance:
+        geom = geom.simplify(tolerance, preserve_topology=True)
+    return json.dumps(
+        build_geometry_json_response(geom.coords), separators=(',', ':'))
+
+
+def parse_ring(ring):
+    """Function to parse a ring of coordinates into a contiguous array
+
+    :return: float64 array of shape (n, m), or None if the ring is not a
+    well formed matrix of finite integer values (booleans are not integers)
+    """
+    try:
+        if bool in set(map(type, chain.from_iterable(ring))):
+            return None
+        array = numpy.array(ring, dtype=numpy.float64)
+    except (TypeError, ValueError, OverflowError):
+        return None
+    if (array.ndim != 2 or not numpy.isfinite(array).all() or
+            (array != numpy.floor(array)).any()):
+        return None
+    return array
+
+
+def coordinates_in_range(ring):
+    """Function to check the coordinates of a ring are (lat, lng) values,
+    latitudes between -90 and 90 and longitudes between -180 and 180
+    """
+    return bool(
+        (numpy.abs(ring[:, 0]) <= 90).all() and
+        (numpy.abs(ring[:, 1]) <= 180).all()
+    )
+
+
+def rings_matches(ring):
+    """Function to check the first and last coordinates of a ring match"""
+    return numpy.array_equal(ring[0], ring[-1])
@@ -1,34 +1,346 @@
-from django.contrib.gis.geos import Point
+import math
+from operator import attrgetter
 
+from django.contrib.gis.geos import Point, Polygon
+from django.db import router
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
 from rest_framework.generics import ListAPIView
 from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from moziotest.pagination import IdCursorPagination
+from moziotest.routers import use_primary
 
+from . import location_cache, tiles
+from .export import FORMATS, get_export_queryset, iter_export
+from .lookups import (
+    find_polygons_by_points, get_prices_by_points, filter_by_distance,
+    find_nearest
+)
+from .mixins import DetailLevelMixin
 from .models import ProviderPolygon
-from .serializers import ProviderPolygonWithNameSerializer
+from .serializers import (
+    ProviderPolygonWithNameSerializer, ProviderPolygonWithDistanceSerializer,
+    LocationSerializer, LocationBatchSerializer
+)
+from .spatial_index import is_enabled, provider_polygon_index
+
+MAX_NEAREST = 100
 
 
-class ProviderPolygonByLocationView(ListAPIView):
+class ProviderPolygonByLocationView(DetailLevelMixin, ListAPIView):
     """Service to get the list of Polygons given a lat lng values by query
-    params, otherwise will return a list of all polygons with pagination
+    params, within radius meters of lat lng, the nearest=k polygons to lat lng
+    ordered by distance, or intersecting the bbox=minx,miny,maxx,maxy query
+    param, otherwise will return a list of all polygons with pagination. The
+    geometries are simplified by the detail or tolerance query params.
 
     :accepted methods:
         GET
     """
     serializer_class = ProviderPolygonWithNameSerializer
     permission_classes = (AllowAny,)
+    pagination_class = IdCursorPagination
+
+    def get_number_param(self, name):
+        """Method to get a query param as a finite float
+
+        :return: float or None if it was not received
+        :except: ValidationError if it is not a number
+        """
+        value = self.request.query_params.get(name, None)
+        if not value:
+            return None
+        try:
+            number = float(value)
+        except ValueError:
+            number = float('nan')
+        if math.isnan(number) or math.isinf(number):
+            raise ValidationError({name: ['A valid number is required.']})
+        return number
+
+    def get_radius(self):
+        radius = self.get_number_param('radius')
+        if radius is not None and radius <= 0:
+            raise ValidationError({'radius': [
+                'Ensure this value is greater than 0.'
+            ]})
+        return radius
+
+    def get_nearest(self):
+        """Method to get the number of nearest polygons requested
+
+        :return: int or None if it was not received
+        :except: ValidationError if it is not between 1 and MAX_NEAREST,
+        the lat lng values were not received or the bbox was received
+        """
+        nearest = self.request.query_params.get('nearest', None)
+        if not nearest:
+            return None
+        try:
+            nearest = int(nearest)
+        except ValueError:
+            nearest = 0
+        if not 1 <= nearest <= MAX_NEAREST:
+            raise ValidationError({'nearest': [
+                'Should be an integer between 1 and {}.'.format(MAX_NEAREST)
+            ]})
+        if self.get_location() is None:
+            raise ValidationError({'nearest': [
+                'The lat and lng params are required.'
+            ]})
+        if self.get_bbox() is not None:
+            raise ValidationError({'nearest': [
+                'Can not be combined with the bbox param.'
+            ]})
+        return nearest
+
+    def get_serializer_class(self):
+        if self.get_nearest() is not None:
+            return ProviderPolygonWithDistanceSerializer
+        return self.serializer_class
+
+    def get_bbox(self):
+        """Method to get the bbox query param
+
+        :return: tuple (minx, miny, maxx, maxy) or None if not received
+        :except: ValidationError if it is not 4 numbers with min <= max
+        """
+        bbox = self.request.query_params.get('bbox', None)
+        if not bbox:
+            return None
+        try:
+            min_x, min_y, max_x, max_y = [float(v) for v in bbox.split(',')]
+        except ValueError:
+            raise ValidationError({'bbox': [
+                'Should be 4 numbers as minx,miny,maxx,maxy.'
+            ]})
+        if min_x > max_x or min_y > max_y:
+            raise ValidationError({'bbox': [
+                'The min values should not be greater than the max values.'
+            ]})
+        return min_x, min_y, max_x, max_y
+
+    def get_location(self):
+        """Method to get the lat lng values of the query params
+
+        :return: tuple (lat, lng) or None if they were not received
+        """
+        lat = self.get_number_param('lat')
+        lng = self.get_number_param('lng')
+        if lat is None or lng is None:
+            return None
+        return lat, lng
+
+    @staticmethod
+    def is_uniform_cell(location):
+        """Method to know if every point of the cell of the location cache
+        which contains the location has the same polygons, i.e. every
+        polygon which intersects the cell contains it properly, so the
+        response can be cached for the cell
+
+        :return: bool
+        """
+        cell = Polygon.from_bbox(location_cache.get_cell_bounds(*location))
+        cell.srid = 4326
+        return not ProviderPolygon.objects.filter(
+            geom__intersects=cell).exclude(
+            geom__contains_properly=cell).exists()
 
     def get_queryset(self):
-        """Method to filter by a Point(lat, lng) and prefetching(JOIN) the
-        user owner of the polygon (provider)
-
-        :return: queryset to be used by ProviderPolygonWithNameSerializer
-        """
-        queryset = ProviderPolygon.objects.all().select_related(
-            'user').order_by('id')
-        query_params = self.request.query_params
-        lat = query_params.get('lat', None)
-        lng = query_params.get('lng', None)
-        if lat and lng:
-            point = Point(int(lat), int(lng))
-            return queryset.filter(geom__contains=point)
-        return queryset
+        """Method to filter by a bbox, by a distance to a Point(lat, lng), to
+        get the nearest polygons or by a Point(lat, lng), prefetching(JOIN)
+        the user owner of the polygon (provider). The point lookup is
+        answered by the in-process spatial index without hitting the database
+        if enabled
+
+        :return: queryset (or list of polygons) to be used by the serializer
+        """
+        queryset = self.defer_other_levels(
+            ProviderPolygon.objects.all().select_related(
+                'user').defer('geom').order_by('id'))
+        bbox = self.get_bbox()
+        if bbox is not None:
+            polygon = Polygon.from_bbox(bbox)
+            polygon.srid = 4326
+            return queryset.filter(geom__intersects=polygon)
+        location = self.get_location()
+        if location is None:
+            return queryset
+        point = Point(*location, srid=4326)
+        radius = self.get_radius()
+        if radius is not None:
+            queryset = filter_by_distance(queryset, point, radius)
+        nearest = self.get_nearest()
+        if nearest is not None:
+            return find_nearest(queryset, point, nearest)
+        if radius is not None:
+            return queryset
+        if is_enabled():
+            return provider_polygon_index.query_point(point)
+        return queryset.filter(geom__contains=point)
+
+    def list(self, request, *args, **kwargs):
+        """Rewriting method to serve the nearest polygons without pagination,
+        sorting their candidates by distance, and the location lookups from
+        the location cache if enabled, the responses are only cached for the
+        cells without polygon edges
+
+        :return: Page of polygons with status 200 OK
+        """
+        if self.get_nearest() is not None:
+            polygons = sorted(
+                self.get_queryset(), key=attrgetter('distance')
+            )[:self.get_nearest()]
+            serializer = self.get_serializer(polygons, many=True)
+            return Response({'results': serializer.data})
+        location = self.get_location()
+        point_lookup = (
+            location is not None and self.get_radius() is None and
+            self.get_bbox() is None
+        )
+        if not (point_lookup and location_cache.is_enabled()):
+            return super(ProviderPolygonByLocationView, self).list(
+                request, *args, **kwargs)
+        cursor = request.query_params.get(self.paginator.cursor_query_param)
+        key = location_cache.get_key(
+            location[0], location[1], cursor, self.get_detail_level())
+        data = location_cache.get_response(key)
+        if data is None:
+            # Refilled from the primary, see moziotest/routers.py
+            with use_primary():
+                response = super(ProviderPolygonByLocationView, self).list(
+                    request, *args, **kwargs)
+                if self.is_uniform_cell(location):
+                    location_cache.set_response(key, response.data)
+            return response
+        return Response(data)
+
+
+class ProviderPolygonBatchLocationView(APIView):
+    """Service to get the polygons which contain every point of a batch of
+    points received in the body as {"points": [[lat, lng], ...]}
+
+    :accepted methods:
+        POST
+    """
+    permission_classes = (AllowAny,)
+
+    def post(self, request, *args, **kwargs):
+        """Method to resolve all the points in a single lookup
+
+        :return: The matched polygons (id, price, provider_name) of every
+        point, in the same order they were received, with status 200 OK
+        :except: Message error with status 400 BAD REQUEST
+        """
+        serializer = LocationBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        points = serializer.validated_data['points']
+        matches = find_polygons_by_points(points)
+        return Response({
+            'results': [
+                {'lat': lat, 'lng': lng, 'polygons': polygons}
+                for (lat, lng), polygons in zip(points, matches)
+            ]
+        })
+
+
+class ProviderPolygonPriceView(APIView):
+    """Service to get the price statistics (min_price, max_price,
+    providers_count and the cheapest polygon) of the polygons which contain a
+    point given by the lat lng query params, or every point of a batch
+    received in the body as {"points": [[lat, lng], ...]}
+
+    :accepted methods:
+        GET
+        POST
+    """
+    permission_classes = (AllowAny,)
+
+    def get(self, request, *args, **kwargs):
+        """Method to get the price statistics of a point
+
+        :return: The statistics of the point with status 200 OK
+        :except: Message error with status 400 BAD REQUEST
+        """
+        serializer = LocationSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        lat = serializer.validated_data['lat']
+        lng = serializer.validated_data['lng']
+        stats = get_prices_by_points([(lat, lng)])[0]
+        return Response(dict(stats, lat=lat, lng=lng))
+
+    def post(self, request, *args, **kwargs):
+        """Method to get the price statistics of all the points in a single
+        lookup
+
+        :return: The statistics of every point, in the same order they were
+        received, with status 200 OK
+        :except: Message error with status 400 BAD REQUEST
+        """
+        serializer = LocationBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        points = serializer.validated_data['points']
+        return Response({
+            'results': [
+                dict(stats, lat=lat, lng=lng)
+                for (lat, lng), stats in zip(
+                    points, get_prices_by_points(points))
+            ]
+        })
+
+
+class ProviderPolygonExportView(APIView):
+    """Service to stream all the polygons as a GeoJSON FeatureCollection, or
+    as newline delimited features with ?output=ndjson
+
+    :accepted methods:
+        GET
+    """
+    permission_classes = (AllowAny,)
+
+    def get(self, request, *args, **kwargs):
+        output_format = request.query_params.get('output', 'geojson')
+        if output_format not in FORMATS:
+            return Response(
+                {'output': ['Should be one of: {}.'.format(
+                    ', '.join(sorted(FORMATS)))]},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        # The rows are read after the request is processed by the
+        # middlewares, so the database is chosen now.
+        queryset = get_export_queryset().using(
+            router.db_for_read(ProviderPolygon))
+        return StreamingHttpResponse(
+            iter_export(output_format, queryset),
+            content_type=FORMATS[output_format]
+        )
+
+
+class ProviderPolygonTileView(APIView):
+    """Service to get the polygons of a tile as a Mapbox Vector Tile, with
+    the name, price and provider_name of every polygon as attributes
+
+    :accepted methods:
+        GET
+    """
+    permission_classes = (AllowAny,)
+
+    def get(self, request, z, x, y, *args, **kwargs):
+        """Method to get the tile from the cache, or build it by PostGIS
+
+        :return: The encoded tile with status 200 OK
+        :except: Not found message error with status 404 NOT FOUND if the
+        tile is out of the range of the zoom
+        """
+        z, x, y = int(z), int(x), int(y)
+        if not tiles.is_valid_tile(z, x, y):
+            raise Http404
+        return HttpResponse(
+            tiles.get_tile(z, x, y),
+            content_type='application/vnd.mapbox-vector-tile'
+        )
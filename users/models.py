@@ -1,9 +1,13 @@
 from django.db import models
 from django.contrib.auth.models import AbstractBaseUser, UserManager
 from django.conf import settings
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 
-from .signals import create_auth_token
+from rest_framework.authtoken.models import Token
+
+from .signals import (
+    create_auth_token, invalidate_token_cache, invalidate_user_token_cache
+)
 
 
 class User(AbstractBaseUser):
@@ -30,3 +34,21 @@ post_save.connect(
     sender=User,
     dispatch_uid="users.models.user_post_save"
 )
+
+
+# Funcs to invalidate the cached token authentication.
+post_save.connect(
+    invalidate_token_cache,
+    sender=Token,
+    dispatch_uid="users.models.token_post_save"
+)
+post_delete.connect(
+    invalidate_token_cache,
+    sender=Token,
+    dispatch_uid="users.models.token_post_delete"
+)
+post_save.connect(
+    invalidate_user_token_cache,
+    sender=User,
+    dispatch_uid="users.models.user_post_save_token_cache"
+)
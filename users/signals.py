@@ -1,6 +1,20 @@
 from rest_framework.authtoken.models import Token
 
+from moziotest.authentication import invalidate_token
+
 
 def create_auth_token(sender, instance=None, created=False, **kwargs):
     if created:
         Token.objects.create(user=instance)
+
+
+def invalidate_token_cache(sender, instance=None, **kwargs):
+    invalidate_token(instance.key)
+
+
+def invalidate_user_token_cache(sender, instance=None, created=False,
+                                **kwargs):
+    if not created:
+        for key in Token.objects.filter(user=instance).values_list(
+                'key', flat=True):
+            invalidate_token(key)
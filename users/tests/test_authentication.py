@@ -0,0 +1,73 @@
+"""Testing cached token authentication"""
+
+import pytest
+from mixer.backend.django import mixer
+
+from django.core.cache import caches
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+
+from moziotest import authentication
+
+from ..models import User
+
+pytestmark = pytest.mark.django_db
+
+
+class TestCachedTokenAuthentication(object):
+
+    @pytest.fixture(autouse=True)
+    def reset_cache(self):
+        authentication._local_cache = None
+        yield
+        authentication._local_cache = None
+
+    def authenticate(self, key):
+        return authentication.CachedTokenAuthentication(
+            ).authenticate_credentials(key)
+
+    def test_second_lookup_without_queries(self):
+        user = mixer.blend(User)
+        self.authenticate(user.auth_token.key)
+        with CaptureQueriesContext(connection) as queries:
+            cached_user, _ = self.authenticate(user.auth_token.key)
+        assert len(queries) == 0, 'Should not hit the database'
+        assert cached_user.pk == user.pk
+
+    def test_user_update_invalidates_cache(self):
+        user = mixer.blend(User, name='John Doe')
+        self.authenticate(user.auth_token.key)
+        user.name = 'Jane Doe'
+        user.save()
+        cached_user, _ = self.authenticate(user.auth_token.key)
+        assert cached_user.name == 'Jane Doe'
+
+    def test_token_delete_invalidates_cache(self):
+        user = mixer.blend(User)
+        key = user.auth_token.key
+        self.authenticate(key)
+        user.auth_token.delete()
+        with pytest.raises(AuthenticationFailed):
+            self.authenticate(key)
+
+    def test_lookups_get_own_user(self):
+        user = mixer.blend(User, name='John Doe')
+        first_user, _ = self.authenticate(user.auth_token.key)
+        first_user.name = 'Jane Doe'
+        second_user, _ = self.authenticate(user.auth_token.key)
+        assert second_user.name == 'John Doe', (
+            'Should not share the cached user between requests')
+
+    def test_shared_cache_without_local_tier(self, settings):
+        settings.AUTH_TOKEN_CACHE = {'BACKEND': 'default'}
+        caches['default'].clear()
+        user = mixer.blend(User)
+        key = user.auth_token.key
+        self.authenticate(key)
+        assert len(authentication.get_local_cache()) == 0, (
+            'Should not keep a local entry the other processes can not drop')
+        Token.objects.filter(key=key).delete()
+        with pytest.raises(AuthenticationFailed):
+            self.authenticate(key)
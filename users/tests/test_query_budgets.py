@@ -0,0 +1,255 @@
+"""Testing query budgets"""
+
+import pytest
+from mixer.backend.django import mixer
+
+from rest_framework.test import force_authenticate, APIRequestFactory
+
+from moziotest.query_budget import (
+    QueryBudgetExceeded, assert_max_queries, get_query_shape
+)
+from polygons.models import ProviderPolygon
+from polygons.tests.test_serializers import (
+    TestDataCases as PolygonDataCases
+)
+
+from .. import views
+from ..models import User
+from .test_serializers import TestDataCases
+
+pytestmark = pytest.mark.django_db
+
+# Budgets of the endpoints, they hold for any number of rows.
+READ_BUDGET = 3
+WRITE_BUDGET = 5
+DELETE_BUDGET = 10
+# Number of rows of the tests, PAGE_SIZE is 20.
+SIZES = (1, 25)
+
+
+class TestQueryBudget(object):
+
+    def blend_polygons(self, size):
+        return mixer.cycle(size).blend(
+            ProviderPolygon,
+            geom=str(PolygonDataCases.data_geometries_valid)
+        )
+
+    def test_query_shape_without_literals(self):
+        shape = get_query_shape(
+            'SELECT "name" FROM "users_user" WHERE "id" = 12 '
+            'AND "email" = \'it\'\'s\' AND "id" IN (1, 2, 3)')
+
+        assert shape == (
+            'SELECT "name" FROM "users_user" WHERE "id" = ? '
+            'AND "email" = ? AND "id" IN (?)')
+
+    def test_query_shape_keeps_identifiers(self):
+        assert get_query_shape('SELECT T2."id" FROM t T2') == (
+            'SELECT T2."id" FROM t T2')
+
+    def test_queries_within_budget(self):
+        self.blend_polygons(3)
+
+        with assert_max_queries(1) as recorder:
+            list(ProviderPolygon.objects.select_related('user'))
+
+        assert len(recorder) == 1
+
+    def test_queries_over_budget(self):
+        with pytest.raises(QueryBudgetExceeded):
+            with assert_max_queries(1):
+                User.objects.count()
+                ProviderPolygon.objects.count()
+
+    def test_detects_n_plus_one(self):
+        self.blend_polygons(3)
+
+        with pytest.raises(QueryBudgetExceeded) as error:
+            with assert_max_queries():
+                [polygon.user.name
+                 for polygon in ProviderPolygon.objects.all()]
+
+        assert 'N+1' in str(error.value)
+
+    def test_fixture(self, query_budget):
+        with query_budget(2) as recorder:
+            User.objects.count()
+
+        assert len(recorder) == 1
+
+
+class TestUserViewQueries(TestDataCases):
+
+    api_factory = APIRequestFactory()
+    tested_view = views.UserView
+
+    @pytest.mark.parametrize('size', SIZES)
+    def test_get_request(self, size, query_budget):
+        mixer.cycle(size).blend(User)
+
+        with query_budget(READ_BUDGET):
+            resp = self.tested_view.as_view()(self.api_factory.get('/'))
+
+        assert resp.status_code == 200, 'Should return status 200 OK'
+
+    def test_post_request(self, query_budget):
+        with query_budget(WRITE_BUDGET):
+            resp = self.tested_view.as_view()(
+                self.api_factory.post('/', self.data_valid))
+
+        assert resp.status_code == 201, 'Should return status 201 CREATED'
+
+
+class TestUserDetailViewQueries(TestDataCases):
+
+    api_factory = APIRequestFactory()
+    tested_view = views.UserDetailView
+
+    def test_get_request(self, query_budget):
+        mixer.blend(User, pk=1)
+
+        with query_budget(READ_BUDGET):
+            resp = self.tested_view.as_view()(self.api_factory.get('/'), pk=1)
+
+        assert resp.status_code == 200, 'Should return status 200 OK'
+
+    def test_get_request_fetches_served_level(self, query_budget):
+        _, polygon = self.blend_polygon()
+
+        with query_budget(READ_BUDGET) as recorder:
+            resp = self.tested_view.as_view()(
+                self.api_factory.get('/?detail=low'), pk_user=1, pk=polygon.pk)
+        resp.render()
+
+        assert resp.status_code == 200, 'Should return status 200 OK'
+        select = next(
+            sql for sql in recorder.queries if '"geojson_low"' in sql)
+        for column in ('"geom"', '"geojson"', '"geojson_medium"'):
+            assert column not in select, (
+                'Should not fetch the columns of the other levels')
+
+    def test_patch_request(self, query_budget):
+        user = mixer.blend(User, pk=1)
+        req = self.api_factory.patch('/', data={'name': 'John Doe'})
+        force_authenticate(req, user)
+
+        with query_budget(WRITE_BUDGET):
+            resp = self.tested_view.as_view()(req, pk=1)
+
+        assert resp.status_code == 200, 'Should return status 200 OK'
+
+    @pytest.mark.parametrize('size', SIZES)
+    def test_delete_request(self, size, query_budget):
+        user = mixer.blend(User, pk=1)
+        mixer.cycle(size).blend(
+            ProviderPolygon, user=user,
+            geom=str(PolygonDataCases.data_geometries_valid)
+        )
+        req = self.api_factory.delete('/')
+        force_authenticate(req, user)
+
+        with query_budget(DELETE_BUDGET):
+            resp = self.tested_view.as_view()(req, pk=1)
+
+        assert resp.status_code == 204, 'Should return status 204 NO CONTENT'
+
+
+class TestProviderPolygonViewQueries(PolygonDataCases):
+
+    api_factory = APIRequestFactory()
+    tested_view = views.ProviderPolygonView
+
+    @pytest.mark.parametrize('size', SIZES)
+    @pytest.mark.parametrize('detail', ('full', 'low'))
+    def test_get_request(self, size, detail, query_budget):
+        user = mixer.blend(User, pk=1)
+        mixer.cycle(size).blend(
+            ProviderPolygon, user=user, geom=str(self.data_geometries_valid))
+        req = self.api_factory.get('/', {'detail': detail})
+
+        with query_budget(READ_BUDGET):
+            resp = self.tested_view.as_view()(req, pk=1)
+
+        assert resp.status_code == 200, 'Should return status 200 OK'
+        assert len(resp.data['results']) == min(size, 20)
+
+    def test_post_request(self, query_budget):
+        user = mixer.blend(User, pk=1)
+        req = self.api_factory.post('/', {
+            'name': 'Downtown', 'price': '10.50',
+            'geometry': self.data_geometries_valid
+        }, format='json')
+        force_authenticate(req, user)
+
+        with query_budget(WRITE_BUDGET):
+            resp = self.tested_view.as_view()(req, pk=1)
+
+        assert resp.status_code == 201, 'Should return status 201 CREATED'
+
+
+class TestProviderPolygonDetailViewQueries(PolygonDataCases):
+
+    api_factory = APIRequestFactory()
+    tested_view = views.ProviderPolygonDetailView
+
+    def blend_polygon(self):
+        user = mixer.blend(User, pk=1)
+        polygon = mixer.blend(
+            ProviderPolygon, user=user, geom=str(self.data_geometries_valid))
+        return user, polygon
+
+    def test_get_request(self, query_budget):
+        _, polygon = self.blend_polygon()
+
+        with query_budget(READ_BUDGET):
+            resp = self.tested_view.as_view()(
+                self.api_factory.get('/'), pk_user=1, pk=polygon.pk)
+
+        assert resp.status_code == 200, 'Should return status 200 OK'
+
+    def test_patch_request(self, query_budget):
+        user, polygon = self.blend_polygon()
+        req = self.api_factory.patch('/', {
+            'geometry': self.data_geometries_valid
+        }, format='json')
+        force_authenticate(req, user)
+
+        with query_budget(WRITE_BUDGET):
+            resp = self.tested_view.as_view()(req, pk_user=1, pk=polygon.pk)
+
+        assert resp.status_code == 200, 'Should return status 200 OK'
+
+    def test_delete_request(self, query_budget):
+        user, polygon = self.blend_polygon()
+        req = self.api_factory.delete('/')
+        force_authenticate(req, user)
+
+        with query_budget(WRITE_BUDGET):
+            resp = self.tested_view.as_view()(req, pk_user=1, pk=polygon.pk)
+
+        assert resp.status_code == 204, 'Should return status 204 NO CONTENT'
+
+
+class TestProviderPolygonBulkViewQueries(PolygonDataCases):
+
+    api_factory = APIRequestFactory()
+    tested_view = views.ProviderPolygonBulkView
+
+    @pytest.mark.parametrize('size', SIZES)
+    def test_post_request(self, size, query_budget):
+        user = mixer.blend(User, pk=1)
+        feature = {
+            'type': 'Feature',
+            'properties': {'name': 'Downtown', 'price': '10.50'},
+            'geometry': self.data_geometries_valid,
+        }
+        req = self.api_factory.post(
+            '/', {'features': [feature] * size}, format='json')
+        force_authenticate(req, user)
+
+        with query_budget(WRITE_BUDGET):
+            resp = self.tested_view.as_view()(req, pk=1)
+
+        assert resp.status_code == 201, 'Should return status 201 CREATED'
+        assert resp.data['created'] == size
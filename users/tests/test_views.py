@@ -6,6 +6,13 @@ from mixer.backend.django import mixer
 from django.test import RequestFactory
 from rest_framework.test import force_authenticate, APIRequestFactory
 
+from django.contrib.gis.geos import GEOSGeometry
+
+from polygons.models import ProviderPolygon
+from polygons.tests.test_serializers import (
+    TestDataCases as PolygonDataCases
+)
+
 from .. import views
 from ..models import User
 from .test_serializers import TestDataCases
@@ -56,6 +63,24 @@ class TestUserView(TestDataCases):
         assert isinstance(resp.data['results'], list), (
             'Should return a list of users in the results key')
 
+    def test_get_request_cursor_pagination(self):
+        mixer.cycle(25).blend(User)
+        req = self.factory.get('/')
+        resp = self.tested_view.as_view()(req)
+
+        assert 'count' not in resp.data, 'Should not count the users'
+        first_page = [user['id'] for user in resp.data['results']]
+        assert len(first_page) == 20
+        assert first_page == sorted(first_page, reverse=True)
+
+        req = self.factory.get(resp.data['next'])
+        resp = self.tested_view.as_view()(req)
+        second_page = [user['id'] for user in resp.data['results']]
+        assert len(second_page) == 5
+        assert max(second_page) < min(first_page), (
+            'Should continue after the last user of the first page')
+        assert resp.data['next'] is None
+
     def test_post_request_successful(self):
         req = self.factory.post('/', self.data_valid)
         resp = self.tested_view.as_view()(req)
@@ -164,6 +189,29 @@ class TestUserDetailView(TestDataCases):
         assert resp.status_code == 200, 'Should return status 200 OK'
         assert isinstance(resp.data, dict)
 
+    def test_get_request_not_modified(self):
+        mixer.blend(User, pk=1)
+        resp = self.tested_view.as_view()(self.factory.get('/'), pk=1)
+        assert resp.has_header('ETag')
+        assert resp.has_header('Last-Modified')
+
+        req = self.factory.get('/', HTTP_IF_NONE_MATCH=resp['ETag'])
+        resp_not_modified = self.tested_view.as_view()(req, pk=1)
+        assert resp_not_modified.status_code == 304, (
+            'Should return status 304 NOT MODIFIED')
+        assert resp_not_modified['ETag'] == resp['ETag']
+
+    def test_get_request_modified(self):
+        user = mixer.blend(User, pk=1)
+        resp = self.tested_view.as_view()(self.factory.get('/'), pk=1)
+        user.name = 'Jane Doe'
+        user.save()
+
+        req = self.factory.get('/', HTTP_IF_NONE_MATCH=resp['ETag'])
+        resp_modified = self.tested_view.as_view()(req, pk=1)
+        assert resp_modified.status_code == 200, 'Should return status 200 OK'
+        assert resp_modified['ETag'] != resp['ETag']
+
     def test_get_request_allow_any_user_not_found(self):
         mixer.blend(User, pk=1)
         req = self.factory.get('/')
@@ -242,3 +290,157 @@ class TestUserDetailView(TestDataCases):
         assert 'John Doe' == resp.data['name'], (
             'The name should be updated from Peter Parker to John Doe')
         assert resp.status_code == 200, 'Should return status 200 OK'
+
+
+class TestProviderPolygonBulkView(PolygonDataCases):
+
+    api_factory = APIRequestFactory()
+    tested_view = views.ProviderPolygonBulkView
+
+    def feature(self, geometry):
+        return {
+            'type': 'Feature',
+            'properties': {'name': 'Downtown', 'price': '10.50'},
+            'geometry': geometry,
+        }
+
+    def test_post_request_not_account_owner(self):
+        mixer.blend(User, pk=1)
+        user = mixer.blend(User, pk=2)
+        req = self.api_factory.post('/', {'features': []}, format='json')
+        force_authenticate(req, user)
+        resp = self.tested_view.as_view()(req, pk=1)
+
+        assert resp.status_code == 403, 'Should return status 403 FORBIDDEN'
+
+    def test_post_request_feature_collection(self):
+        user = mixer.blend(User, pk=1)
+        data = {
+            'type': 'FeatureCollection',
+            'features': [
+                self.feature(self.data_geometries_valid),
+                self.feature(self.data_geometries_type_not_polygon),
+            ]
+        }
+        req = self.api_factory.post('/', data, format='json')
+        force_authenticate(req, user)
+        resp = self.tested_view.as_view()(req, pk=1)
+
+        assert resp.status_code == 201, 'Should return status 201 CREATED'
+        assert resp.data['created'] == 1
+        assert resp.data['rejected'] == 1
+        assert resp.data['errors'][0]['row'] == 2
+        polygon = ProviderPolygon.objects.get(user=user)
+        assert polygon.geojson, 'Should precompute the GeoJSON of the polygon'
+
+    def test_post_request_single_feature(self):
+        user = mixer.blend(User, pk=1)
+        req = self.api_factory.post(
+            '/', self.feature(self.data_geometries_valid), format='json')
+        force_authenticate(req, user)
+        resp = self.tested_view.as_view()(req, pk=1)
+
+        assert resp.status_code == 201, 'Should return status 201 CREATED'
+        assert resp.data['created'] == 1
+
+    def test_post_request_malformed_rows(self):
+        user = mixer.blend(User, pk=1)
+        wkb = GEOSGeometry(str(self.data_geometries_valid)).hex.decode()
+        body = 'Downtown\t10.50\t{}\nUptown\t{}\n'.format(wkb, wkb)
+        req = self.api_factory.post(
+            '/', body, content_type='text/tab-separated-values')
+        force_authenticate(req, user)
+        resp = self.tested_view.as_view()(req, pk=1)
+
+        assert resp.status_code == 201, 'Should return status 201 CREATED'
+        assert resp.data['created'] == 1
+        assert resp.data['rejected'] == 1, (
+            'Should reject the row without three columns')
+        assert resp.data['errors'][0]['row'] == 2
+
+    @pytest.mark.parametrize('body', (
+        '5', '"abc"', '{"features": "abc"}', '{"type": "FeatureCollection"}'
+    ))
+    def test_post_request_not_features(self, body):
+        user = mixer.blend(User, pk=1)
+        req = self.api_factory.post(
+            '/', body, content_type='application/json')
+        force_authenticate(req, user)
+        resp = self.tested_view.as_view()(req, pk=1)
+
+        assert resp.status_code == 400, 'Should return status 400 BAD REQUEST'
+        assert 'non_field_errors' in resp.data
+        assert not ProviderPolygon.objects.exists()
+
+
+class TestProviderPolygonView(PolygonDataCases):
+
+    api_factory = APIRequestFactory()
+    tested_view = views.ProviderPolygonView
+
+    # Square (0 0, 0 50, 50 50, 50 0, 0 0) encoded as TWKB with precision 0.
+    twkb_square = bytes(bytearray([
+        0x03, 0x00, 0x01, 0x05, 0x00, 0x00, 0x00, 0x64, 0x64, 0x00, 0x00,
+        0x63, 0x63, 0x00
+    ]))
+
+    def post_binary(self, body, content_type):
+        user = mixer.blend(User, pk=1)
+        req = self.api_factory.post(
+            '/?name=Downtown&price=10.50', body, content_type=content_type)
+        force_authenticate(req, user)
+        return self.tested_view.as_view()(req, pk=1)
+
+    def test_post_request_wkb_body(self):
+        wkb = GEOSGeometry(str(self.data_geometries_valid)).wkb
+        resp = self.post_binary(bytes(wkb), 'application/wkb')
+
+        assert resp.status_code == 201, 'Should return status 201 CREATED'
+        polygon = ProviderPolygon.objects.get(pk=resp.data['id'])
+        assert polygon.name == 'Downtown'
+        assert polygon.geom.coords[0][2] == (50, 50)
+
+    def test_post_request_wkb_body_not_polygon(self):
+        wkb = GEOSGeometry('POINT (10 10)').wkb
+        resp = self.post_binary(bytes(wkb), 'application/wkb')
+
+        assert resp.status_code == 400, 'Should return status 400 BAD REQUEST'
+        assert 'type' in resp.data['geometry']
+
+    def test_post_request_twkb_body(self):
+        resp = self.post_binary(self.twkb_square, 'application/twkb')
+
+        assert resp.status_code == 201, 'Should return status 201 CREATED'
+        polygon = ProviderPolygon.objects.get(pk=resp.data['id'])
+        assert polygon.geom.coords[0][1] == (0, 50)
+
+    def test_post_request_wrong_twkb_body(self):
+        resp = self.post_binary(self.twkb_square[:6], 'application/twkb')
+
+        assert resp.status_code == 400, 'Should return status 400 BAD REQUEST'
+
+    def test_get_request_not_modified(self):
+        user = mixer.blend(User, pk=1)
+        mixer.blend(
+            ProviderPolygon, user=user, geom=str(self.data_geometries_valid))
+        resp = self.tested_view.as_view()(self.api_factory.get('/'), pk=1)
+        assert resp.has_header('ETag')
+
+        req = self.api_factory.get('/', HTTP_IF_NONE_MATCH=resp['ETag'])
+        resp_not_modified = self.tested_view.as_view()(req, pk=1)
+        assert resp_not_modified.status_code == 304, (
+            'Should return status 304 NOT MODIFIED')
+
+    def test_get_request_modified_by_delete(self):
+        user = mixer.blend(User, pk=1)
+        polygon = mixer.blend(
+            ProviderPolygon, user=user, geom=str(self.data_geometries_valid))
+        mixer.blend(
+            ProviderPolygon, user=user, geom=str(self.data_geometries_valid))
+        resp = self.tested_view.as_view()(self.api_factory.get('/'), pk=1)
+        polygon.delete()
+
+        req = self.api_factory.get('/', HTTP_IF_NONE_MATCH=resp['ETag'])
+        resp_modified = self.tested_view.as_view()(req, pk=1)
+        assert resp_modified.status_code == 200, 'Should return status 200 OK'
+        assert len(resp_modified.data['results']) == 1
@@ -1,25 +1,38 @@
 from rest_framework.generics import (
     ListCreateAPIView, RetrieveUpdateDestroyAPIView
 )
-from rest_framework.permissions import AllowAny
+from rest_framework.parsers import JSONParser
+from rest_framework.permissions import SAFE_METHODS, AllowAny
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.views import APIView
 from rest_framework import status
 
 from .models import User
 from .serializers import CreateUserSerializer, UserSerializer
 
+from moziotest.conditional import ConditionalGetMixin
+from moziotest.pagination import DescendingIdCursorPagination
+from moziotest.renderers import RawJSON
+from moziotest.routers import use_primary
 from moziotest.permissions import (
     IsOwnerAccountOrReadOnly, IsOwnerObjectOrReadOnly
 )
 
+from polygons import provider_cache
+from polygons.importer import features_from_geojson, import_polygons
+from polygons.mixins import DetailLevelMixin
 from polygons.models import ProviderPolygon
+from polygons.parsers import (
+    GeoJSONParser, NDJSONParser, WKBRowsParser, WKBParser, TWKBParser
+)
 from polygons.serializers import (
     ProviderPolygonSerializerToWrite, ProviderPolygonSerializer
 )
 
 
-class UserView(ListCreateAPIView):
-    """Service to create and list users
+class UserView(ConditionalGetMixin, ListCreateAPIView):
+    """Service to create and list users, the list is sent with an ETag
 
     :accepted_methods:
         POST
@@ -28,6 +41,7 @@ class UserView(ListCreateAPIView):
     queryset = User.objects.all().order_by('-id')
     serializer_class = CreateUserSerializer
     permission_classes = (AllowAny,)
+    pagination_class = DescendingIdCursorPagination
 
     def create(self, request, *args, **kwargs):
         """Rewriting create method to add the token value to the response
@@ -46,9 +60,9 @@ class UserView(ListCreateAPIView):
         )
 
 
-class UserDetailView(RetrieveUpdateDestroyAPIView):
+class UserDetailView(ConditionalGetMixin, RetrieveUpdateDestroyAPIView):
     """Service to update and delete a user if this is owner, get request
-    is allowed to any user.
+    is allowed to any user and sent with ETag and Last-Modified headers.
 
     :accepted methods:
         GET
@@ -61,9 +75,14 @@ class UserDetailView(RetrieveUpdateDestroyAPIView):
     permission_classes = (IsOwnerAccountOrReadOnly,)
 
 
-class ProviderPolygonView(ListCreateAPIView):
+class ProviderPolygonView(ConditionalGetMixin, DetailLevelMixin,
+                          ListCreateAPIView):
     """Service to add a polygon instance to a user if this is owner, get
-    request is allowed to any user
+    request is allowed to any user and sent with an ETag. The geometry could
+    be sent as a WKB or TWKB body (application/wkb, application/twkb) with
+    the name and price by query params, the listed geometries are simplified
+    by the detail or tolerance query params. The rendered pages are cached by
+    the version of the polygons of the user if the provider cache is enabled.
 
     :accepted methods:
         POST
@@ -71,6 +90,10 @@ class ProviderPolygonView(ListCreateAPIView):
     """
     serializer_class = ProviderPolygonSerializer
     permission_classes = (IsOwnerAccountOrReadOnly,)
+    parser_classes = api_settings.DEFAULT_PARSER_CLASSES + [
+        WKBParser, TWKBParser
+    ]
+    pagination_class = DescendingIdCursorPagination
 
     def create(self, request, *args, **kwargs):
         """Rewriting create method to pass by context the user which is doing
@@ -93,18 +116,55 @@ class ProviderPolygonView(ListCreateAPIView):
             headers=headers
         )
 
+    def get_validators(self, request):
+        """Rewriting method to build the ETag from the version of the
+        polygons of the user in the provider cache if enabled, so the cached
+        pages are served without hitting the database
+
+        :return: tuple (etag, None)
+        """
+        if not provider_cache.is_enabled():
+            return super(ProviderPolygonView, self).get_validators(request)
+        version = provider_cache.get_version(self.kwargs['pk'])
+        return self.build_etag(request, version), None
+
+    def list(self, request, *args, **kwargs):
+        """Rewriting method to serve the rendered pages from the provider
+        cache if enabled
+
+        :return: Page of polygons with status 200 OK
+        """
+        if not provider_cache.is_enabled():
+            return super(ProviderPolygonView, self).list(
+                request, *args, **kwargs)
+        key = provider_cache.get_key(
+            self.kwargs['pk'], request.build_absolute_uri())
+        page = provider_cache.get_page(key)
+        if page is None:
+            # Refilled from the primary database, a lagging replica would
+            # cache stale polygons under the new version.
+            with use_primary():
+                response = super(ProviderPolygonView, self).list(
+                    request, *args, **kwargs)
+            page = provider_cache.set_page(key, response.data)
+        return Response(RawJSON(page))
+
     def get_queryset(self):
         """Method to filter Polygons by user and order from newer to older
 
         :return: queryset to be used by ProviderPolygonSerializer
         """
-        return ProviderPolygon.objects.filter(
-            user=self.kwargs['pk']).order_by('-id')
+        return self.defer_other_levels(ProviderPolygon.objects.filter(
+            user=self.kwargs['pk']).defer('geom').order_by('-id'))
 
 
-class ProviderPolygonDetailView(RetrieveUpdateDestroyAPIView):
+class ProviderPolygonDetailView(ConditionalGetMixin, DetailLevelMixin,
+                                RetrieveUpdateDestroyAPIView):
     """Service to update and delete a polygon of a user if this is owner,
-    get request is allowed to any user.
+    get request is allowed to any user and sent with ETag and Last-Modified
+    headers. The geometry could be sent as a WKB or TWKB body as in
+    ProviderPolygonView, the geometry is simplified by the detail or
+    tolerance query params.
 
     :accepted methods:
         GET
@@ -114,6 +174,9 @@ class ProviderPolygonDetailView(RetrieveUpdateDestroyAPIView):
     """
     serializer_class = ProviderPolygonSerializerToWrite
     permission_classes = (IsOwnerObjectOrReadOnly,)
+    parser_classes = api_settings.DEFAULT_PARSER_CLASSES + [
+        WKBParser, TWKBParser
+    ]
 
     def retrieve(self, request, *args, **kwargs):
         """Rewriting method to use another serializer(to read)
@@ -122,12 +185,44 @@ class ProviderPolygonDetailView(RetrieveUpdateDestroyAPIView):
         :except: Not found message error with status 404 NOT FOUND
         """
         instance = self.get_object()
-        serializer = ProviderPolygonSerializer(instance)
+        serializer = ProviderPolygonSerializer(
+            instance, context=self.get_serializer_context())
         return Response(serializer.data)
 
     def get_queryset(self):
-        """Method to filter Polygon by user
+        """Method to filter Polygon by user, the reads only fetch the
+        GeoJSON of the level of detail served
 
         :return: queryset to be filtered after by pk of Polygon
         """
-        return ProviderPolygon.objects.filter(user=self.kwargs['pk_user'])
+        queryset = ProviderPolygon.objects.filter(user=self.kwargs['pk_user'])
+        if self.request.method not in SAFE_METHODS:
+            return queryset
+        return self.defer_other_levels(queryset.defer('geom'))
+
+
+class ProviderPolygonBulkView(APIView):
+    """Service to import many polygons to a user if this is owner, as a
+    GeoJSON FeatureCollection, NDJSON features (application/x-ndjson) or
+    "name<TAB>price<TAB>hex WKB" rows (text/tab-separated-values)
+
+    :accepted methods:
+        POST
+    """
+    permission_classes = (IsOwnerAccountOrReadOnly,)
+    parser_classes = (
+        JSONParser, GeoJSONParser, NDJSONParser, WKBRowsParser
+    )
+
+    def post(self, request, *args, **kwargs):
+        """Method to validate every feature and insert the valid ones
+
+        :return: Report of the created and rejected rows with status 201
+        CREATED
+        :except: Message error with status 400 BAD REQUEST if the body can not
+        be parsed or has no features, if the user is not owner will receive a
+        message error with status 403 FORBIDDEN
+        """
+        report = import_polygons(
+            features_from_geojson(request.data), request.user)
+        return Response(report.as_dict(), status=status.HTTP_201_CREATED)